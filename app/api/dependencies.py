@@ -5,17 +5,20 @@ from app.core.config import Settings, get_settings
 from app.logging.audit import PredictionAuditLogger
 from app.ml.dataset_builder import DatasetBuilder
 from app.ml.inference import InferenceEngine
+from app.ml.model_cache import ModelCache
 from app.ml.registry import ModelRegistry
 from app.ml.trainer import Trainer
+from app.monitoring.accuracy import LiveAccuracyJob
 from app.monitoring.drift import DriftDetector
 from app.monitoring.freshness import FreshnessTracker
 from app.monitoring.metrics import LatencyTracker
+from app.monitoring.timing import StageTimingTracker
 from app.services.control_plane import AsyncTrainingManager
 from app.services.feature_service import FeatureService
 
 
 @lru_cache
-def _get_market_data_client() -> MarketDataClient:
+def get_market_data_client() -> MarketDataClient:
     settings: Settings = get_settings()
     return MarketDataClient(settings=settings)
 
@@ -24,7 +27,7 @@ def _get_market_data_client() -> MarketDataClient:
 def get_feature_service() -> FeatureService:
     settings: Settings = get_settings()
     return FeatureService(
-        market_data_client=_get_market_data_client(),
+        market_data_client=get_market_data_client(),
         settings=settings,
     )
 
@@ -35,15 +38,50 @@ def get_model_registry() -> ModelRegistry:
     return ModelRegistry(root_dir=settings.model_registry_dir)
 
 
+@lru_cache
+def get_model_cache() -> ModelCache:
+    settings = get_settings()
+    return ModelCache(registry=get_model_registry(), max_entries=settings.model_cache_size)
+
+
 @lru_cache
 def get_audit_logger() -> PredictionAuditLogger:
     settings = get_settings()
-    return PredictionAuditLogger(log_file=settings.audit_log_file, limit=settings.audit_log_limit)
+    return PredictionAuditLogger(
+        log_file=settings.audit_log_file,
+        limit=settings.audit_log_limit,
+        buffered=settings.audit_log_buffered,
+        queue_size=settings.audit_log_queue_size,
+        batch_size=settings.audit_log_batch_size,
+        flush_interval_seconds=settings.audit_log_flush_interval_seconds,
+        fsync=settings.audit_log_fsync,
+        overflow=settings.audit_log_overflow,
+        segment_max_bytes=settings.audit_log_segment_max_bytes,
+        segment_max_age_seconds=settings.audit_log_segment_max_age_seconds,
+        compress_segments=settings.audit_log_compress_segments,
+        frame_cache_bytes=settings.audit_log_frame_cache_bytes,
+    )
+
+
+@lru_cache
+def get_live_accuracy_job() -> LiveAccuracyJob:
+    settings = get_settings()
+    return LiveAccuracyJob(
+        audit_logger=get_audit_logger(),
+        market_data_client=get_market_data_client(),
+        output_file=settings.live_accuracy_file,
+        concurrency=settings.live_accuracy_concurrency,
+    )
 
 
 @lru_cache
 def get_latency_tracker() -> LatencyTracker:
-    return LatencyTracker()
+    return LatencyTracker(retention_minutes=get_settings().latency_retention_minutes)
+
+
+@lru_cache
+def get_stage_tracker() -> StageTimingTracker:
+    return StageTimingTracker(retention_minutes=get_settings().latency_retention_minutes)
 
 
 @lru_cache
@@ -54,7 +92,12 @@ def get_freshness_tracker() -> FreshnessTracker:
 @lru_cache
 def get_drift_detector() -> DriftDetector:
     settings = get_settings()
-    return DriftDetector(threshold=settings.drift_threshold)
+    return DriftDetector(
+        threshold=settings.drift_threshold,
+        window_size=settings.drift_window_size,
+        psi_threshold=settings.drift_psi_threshold,
+        ks_threshold=settings.drift_ks_threshold,
+    )
 
 
 @lru_cache
@@ -68,6 +111,10 @@ def get_inference_engine() -> InferenceEngine:
         latency_tracker=get_latency_tracker(),
         freshness_tracker=get_freshness_tracker(),
         drift_detector=get_drift_detector(),
+        model_cache=get_model_cache(),
+        batch_concurrency=settings.batch_max_concurrency,
+        batch_window_ms=settings.inference_batch_window_ms,
+        batch_max_size=settings.inference_batch_max_size,
     )
 
 
@@ -81,15 +128,19 @@ def get_training_manager() -> AsyncTrainingManager:
     return AsyncTrainingManager(trainer=get_trainer(), settings=get_settings())
 
 
-def reset_runtime_state() -> None:
+def reset_runtime_state(keep_audit_logger: bool = False) -> None:
     get_training_manager.cache_clear()
     get_trainer.cache_clear()
     get_inference_engine.cache_clear()
     get_drift_detector.cache_clear()
     get_freshness_tracker.cache_clear()
     get_latency_tracker.cache_clear()
-    get_audit_logger.cache_clear()
+    get_stage_tracker.cache_clear()
+    get_live_accuracy_job.cache_clear()
+    if not keep_audit_logger:
+        get_audit_logger.cache_clear()
+    get_model_cache.cache_clear()
     get_model_registry.cache_clear()
     get_feature_service.cache_clear()
-    _get_market_data_client.cache_clear()
+    get_market_data_client.cache_clear()
     get_settings.cache_clear()
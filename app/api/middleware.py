@@ -1,31 +1,192 @@
 from __future__ import annotations
 
+import sys
 import time
-from collections import defaultdict, deque
+import uuid
+from collections import OrderedDict
+from collections.abc import Callable
+from dataclasses import dataclass
 
-from fastapi import Request
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+from app.monitoring.prometheus import (
+    RATE_LIMIT_DECISION_SECONDS,
+    RATE_LIMIT_DECISIONS,
+    RATE_LIMIT_EVICTIONS,
+    RATE_LIMIT_KEYS,
+    RATE_LIMIT_STATE_BYTES,
+)
+from app.monitoring.timing import StageTimingTracker, begin_request, end_request
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    def __init__(self, app, max_requests: int, window_seconds: int) -> None:
-        super().__init__(app)
-        self._max_requests = max_requests
-        self._window_seconds = window_seconds
-        self._calls: dict[str, deque[float]] = defaultdict(deque)
+DEFAULT_ROUTE_CLASS = "default"
+ROUTE_CLASSES = {
+    "predict": "predict",
+    # Audit history reads are dashboard polling; they must not spend the tokens of real predictions.
+    "predictions": "monitoring",
+    "admin": "admin",
+    "monitoring": "monitoring",
+    "metrics": "monitoring",
+}
+# One bucket: the [tokens, last_seen] list, its two floats and an IPv4-sized client key.
+_BUCKET_BYTES = sys.getsizeof([0.0, 0.0]) + 2 * sys.getsizeof(0.0) + sys.getsizeof("255.255.255.255")
 
-    async def dispatch(self, request: Request, call_next):
-        now = time.monotonic()
-        client = request.client.host if request.client else "unknown"
-        key = f"{client}:{request.url.path}"
-        bucket = self._calls[key]
 
-        while bucket and now - bucket[0] > self._window_seconds:
-            bucket.popleft()
+@dataclass(frozen=True)
+class RateLimit:
+    requests: int
+    window_seconds: float
 
-        if len(bucket) >= self._max_requests:
-            return JSONResponse(status_code=429, content={"error": "rate_limited", "status": 429})
+    @property
+    def refill_per_second(self) -> float:
+        return self.requests / self.window_seconds
 
-        bucket.append(now)
-        return await call_next(request)
+
+def route_class(path: str, api_prefix: str = "") -> str:
+    if api_prefix and path.startswith(api_prefix):
+        path = path[len(api_prefix) :]
+    if path.startswith("/predict/batch"):
+        return "batch"
+    return ROUTE_CLASSES.get(path.strip("/").split("/", 1)[0], DEFAULT_ROUTE_CLASS)
+
+
+class TokenBucketLimiter:
+    """Per-(route class, client) token buckets holding two floats each.
+
+    A bucket refills ``requests`` tokens over ``window_seconds`` and starts full. Buckets live in
+    one LRU-ordered dict per route class, so a bucket untouched for a full window (which is
+    therefore full again) is evicted from the head in amortized O(1) without changing any
+    decision. ``max_keys`` caps each class outright; evicting a live bucket only resets it to full.
+    Every shortest window, all classes are swept so idle buckets of quiet classes go too.
+    """
+
+    def __init__(self, limits: dict[str, RateLimit], max_keys: int = 100_000) -> None:
+        self._limits = limits
+        self._max_keys = max(1, max_keys)
+        self._buckets: dict[str, OrderedDict[str, list[float]]] = {route: OrderedDict() for route in limits}
+        self._sweep_interval = min((limit.window_seconds for limit in limits.values()), default=0.0)
+        self._next_sweep = 0.0
+        self.evictions = 0
+
+    def allow(self, route: str, client: str, now: float | None = None) -> tuple[bool, float]:
+        """Take one token; returns (allowed, seconds until a token is available)."""
+        now = time.monotonic() if now is None else now
+        limit = self._limits[route]
+        buckets = self._buckets[route]
+        state = buckets.get(client)
+        if state is None:
+            if len(buckets) >= self._max_keys:
+                buckets.popitem(last=False)
+                self.evictions += 1
+            state = buckets[client] = [float(limit.requests), now]
+        else:
+            buckets.move_to_end(client)
+            state[0] = min(float(limit.requests), state[0] + (now - state[1]) * limit.refill_per_second)
+            state[1] = now
+        if now >= self._next_sweep:
+            self._next_sweep = now + self._sweep_interval
+            for name, idle in self._buckets.items():
+                self._evict_idle(idle, self._limits[name], now)
+        else:
+            self._evict_idle(buckets, limit, now)
+
+        if state[0] >= 1.0:
+            state[0] -= 1.0
+            return True, 0.0
+        return False, (1.0 - state[0]) / limit.refill_per_second
+
+    def keys(self, route: str) -> int:
+        return len(self._buckets[route])
+
+    def state_bytes(self) -> int:
+        """Approximate memory held by bucket state, estimated in O(route classes)."""
+        return sum(sys.getsizeof(buckets) + len(buckets) * _BUCKET_BYTES for buckets in self._buckets.values())
+
+    def _evict_idle(self, buckets: OrderedDict[str, list[float]], limit: RateLimit, now: float) -> None:
+        while buckets:
+            client, state = next(iter(buckets.items()))
+            if now - state[1] < limit.window_seconds:
+                return
+            del buckets[client]
+            self.evictions += 1
+
+
+class RateLimitMiddleware:
+    """Token-bucket limiting per client and route class; classes missing from ``limits`` use ``default``."""
+
+    def __init__(self, app: ASGIApp, limits: dict[str, RateLimit], api_prefix: str = "", max_keys: int = 100_000) -> None:
+        self.app = app
+        self._limits = limits
+        self._api_prefix = api_prefix
+        self._limiter = TokenBucketLimiter(self._limits, max_keys=max_keys)
+        self._decisions = {
+            route: (RATE_LIMIT_DECISIONS.labels(route, "allowed"), RATE_LIMIT_DECISIONS.labels(route, "limited"))
+            for route in self._limits
+        }
+        for route in self._limits:
+            RATE_LIMIT_KEYS.labels(route).set_function(lambda route=route: self._limiter.keys(route))
+        RATE_LIMIT_EVICTIONS.set_function(lambda: self._limiter.evictions)
+        RATE_LIMIT_STATE_BYTES.set_function(self._limiter.state_bytes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        route = route_class(scope["path"], self._api_prefix)
+        if route not in self._limits:
+            route = DEFAULT_ROUTE_CLASS
+        client = scope["client"][0] if scope.get("client") else "unknown"
+        allowed, retry_after = self._limiter.allow(route, client)
+        RATE_LIMIT_DECISION_SECONDS.inc(time.perf_counter() - started)
+        allowed_counter, limited_counter = self._decisions[route]
+        if not allowed:
+            limited_counter.inc()
+            response = JSONResponse(
+                status_code=429,
+                content={"error": "rate_limited", "status": 429},
+                headers={"Retry-After": str(max(1, round(retry_after)))},
+            )
+            await response(scope, receive, send)
+            return
+        allowed_counter.inc()
+        await self.app(scope, receive, send)
+
+
+class RequestContextMiddleware:
+    """Assigns ``request.state.request_id`` (from X-Request-ID or a new UUID) and echoes it back.
+
+    With ``stage_tracker`` set, each request also gets a StageTimings context whose stages are
+    sent as a Server-Timing header and recorded once the response has started.
+    """
+
+    def __init__(self, app: ASGIApp, stage_tracker: Callable[[], StageTimingTracker] | None = None) -> None:
+        self.app = app
+        self._stage_tracker = stage_tracker
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_id = next((value.decode("latin-1") for name, value in scope["headers"] if name == b"x-request-id"), None)
+        request_id = request_id or str(uuid.uuid4())
+        scope.setdefault("state", {})["request_id"] = request_id
+        timings, token = begin_request() if self._stage_tracker is not None else (None, None)
+
+        async def send_with_context(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["X-Request-ID"] = request_id
+                if timings is not None and timings.stages:
+                    headers["Server-Timing"] = timings.server_timing_header()
+                    self._stage_tracker().record(timings)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_context)
+        finally:
+            if token is not None:
+                end_request(token)
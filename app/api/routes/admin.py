@@ -1,11 +1,22 @@
+import asyncio
 import logging
+from pathlib import Path
 
 from fastapi import APIRouter, Depends, HTTPException
 
-from app.api.dependencies import get_audit_logger, get_model_registry, get_training_manager, reset_runtime_state
+from app.api.dependencies import (
+    get_audit_logger,
+    get_live_accuracy_job,
+    get_market_data_client,
+    get_model_registry,
+    get_training_manager,
+    reset_runtime_state,
+)
 from app.api.security import require_admin_api_key
+from app.core.config import get_settings
 from app.logging.audit import PredictionAuditLogger
 from app.ml.registry import ModelRegistry
+from app.monitoring.accuracy import LiveAccuracyJob
 from app.services.control_plane import AsyncTrainingManager
 
 router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin_api_key)])
@@ -36,13 +47,30 @@ async def activate(version: str, registry: ModelRegistry = Depends(get_model_reg
 
 @router.post("/reload")
 async def reload_runtime() -> dict:
-    reset_runtime_state()
+    # Swap in fresh instances first; requests already holding the old client finish before it closes.
+    # A second logger on the same audit file would race the old writer's offsets and segment numbers,
+    # so the audit logger is kept unless the reloaded settings point it at another file.
+    previous_client, previous_audit_logger = get_market_data_client(), get_audit_logger()
+    get_settings.cache_clear()
+    keep_audit_logger = Path(get_settings().audit_log_file) == previous_audit_logger.log_file
+    reset_runtime_state(keep_audit_logger=keep_audit_logger)
+    await get_market_data_client().start()
+    await previous_client.aclose_when_idle()
+    if not keep_audit_logger:
+        await asyncio.to_thread(previous_audit_logger.close)
     logger.info("admin_action", extra={"action": "reload"})
     return {"action": "reload", "status": "ok"}
 
 
 @router.delete("/audit/clear")
 async def clear_audit(audit_logger: PredictionAuditLogger = Depends(get_audit_logger)) -> dict:
-    audit_logger.clear()
+    await asyncio.to_thread(audit_logger.clear)
     logger.info("admin_action", extra={"action": "audit_clear"})
     return {"action": "audit_clear", "status": "ok"}
+
+
+@router.post("/accuracy/run")
+async def run_live_accuracy(job: LiveAccuracyJob = Depends(get_live_accuracy_job)) -> dict:
+    payload = await job.run()
+    logger.info("admin_action", extra={"action": "accuracy_run", "resolved": payload["resolved"]})
+    return {"action": "accuracy_run", "status": "ok", "predictions": payload["predictions"], "resolved": payload["resolved"]}
@@ -1,6 +1,10 @@
+import time
+
 from fastapi import APIRouter, Depends, Query
 
-from app.api.dependencies import get_feature_service
+from app.api.dependencies import get_feature_service, get_latency_tracker
+from app.api.responses import FastJSONResponse
+from app.monitoring.metrics import LatencyTracker
 from app.schemas.error import ErrorResponse
 from app.schemas.features import FeaturesResponse
 from app.services.feature_service import FeatureService
@@ -17,5 +21,10 @@ async def get_features(
     symbol: str = Query(min_length=1),
     lookback: int | None = Query(default=None, ge=1),
     service: FeatureService = Depends(get_feature_service),
-) -> FeaturesResponse:
-    return await service.build_features(symbol=symbol.upper(), lookback=lookback)
+    latency_tracker: LatencyTracker = Depends(get_latency_tracker),
+) -> FastJSONResponse:
+    start = time.perf_counter()
+    feature_set = await service.build_feature_set(symbol=symbol.upper(), lookback=lookback)
+    response = FastJSONResponse(feature_set.to_payload())
+    latency_tracker.record((time.perf_counter() - start) * 1000, endpoint="features")
+    return response
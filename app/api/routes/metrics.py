@@ -0,0 +1,49 @@
+from collections.abc import Callable
+from typing import Any
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from app.api.dependencies import get_audit_logger, get_feature_service, get_model_cache
+from app.monitoring.prometheus import (
+    AUDIT_QUEUE_DEPTH,
+    CACHE_ENTRIES,
+    CACHE_HITS,
+    CACHE_MISSES,
+    CANDLE_FETCHES,
+    CONTENT_TYPE,
+    REGISTRY,
+)
+
+router = APIRouter(tags=["monitoring"])
+
+
+def _reader(component: Callable[[], Any], read: Callable[[Any], float]) -> Callable[[], float]:
+    # Resolved through the cached dependency on every render, so a reload is picked up immediately.
+    return lambda: read(component())
+
+
+def _bind_runtime_metrics() -> None:
+    """Point each series at the totals its component already keeps; read at render time, never copied."""
+    CACHE_ENTRIES.labels("models").set_function(_reader(get_model_cache, lambda cache: len(cache.snapshot()["cached_versions"])))
+    CACHE_HITS.labels("models").set_function(_reader(get_model_cache, lambda cache: cache.snapshot()["hits"]))
+    CACHE_MISSES.labels("models").set_function(_reader(get_model_cache, lambda cache: cache.snapshot()["misses"]))
+    for field, series in (("entries", CACHE_ENTRIES), ("hits", CACHE_HITS), ("misses", CACHE_MISSES)):
+        series.labels("fundamentals").set_function(
+            _reader(get_feature_service, lambda service, field=field: service.cache_stats()["fundamentals"][field])
+        )
+    CACHE_ENTRIES.labels("candles").set_function(_reader(get_feature_service, lambda service: service.cache_stats()["candles"]["series"]))
+    for kind in ("full", "delta"):
+        CANDLE_FETCHES.labels(kind).set_function(
+            _reader(get_feature_service, lambda service, kind=kind: service.cache_stats()["candles"][f"{kind}_fetches"])
+        )
+    AUDIT_QUEUE_DEPTH.set_function(_reader(get_audit_logger, lambda audit_logger: audit_logger.queue_depth()))
+
+
+_bind_runtime_metrics()
+
+
+@router.get("/metrics", response_class=PlainTextResponse)
+async def metrics() -> PlainTextResponse:
+    # Rendered on the event loop: the candle cache is loop-owned and must not be iterated from the threadpool.
+    return PlainTextResponse(REGISTRY.render(), media_type=CONTENT_TYPE)
@@ -1,20 +1,37 @@
 from fastapi import APIRouter, Depends
 
 from app.api.dependencies import (
+    get_audit_logger,
     get_drift_detector,
+    get_feature_service,
     get_freshness_tracker,
+    get_inference_engine,
     get_latency_tracker,
+    get_live_accuracy_job,
+    get_stage_tracker,
+    get_model_cache,
     get_model_registry,
 )
+from app.logging.audit import PredictionAuditLogger
+from app.ml.inference import InferenceEngine
+from app.ml.model_cache import ModelCache
 from app.ml.registry import ModelRegistry
+from app.monitoring.accuracy import LiveAccuracyJob
 from app.monitoring.drift import DriftDetector
 from app.monitoring.freshness import FreshnessTracker
 from app.monitoring.metrics import LatencyTracker
+from app.monitoring.timing import StageTimingTracker
+from app.services.feature_service import FeatureService
 from app.schemas.ml import (
+    AuditWriterStatsResponse,
+    BatchingStatsResponse,
+    CacheStatsResponse,
     DriftStatusResponse,
     FreshnessResponse,
     LatencyResponse,
+    LiveAccuracyResponse,
     MonitoringHistoryResponse,
+    StageTimingResponse,
 )
 
 router = APIRouter(tags=["monitoring"])
@@ -25,8 +42,10 @@ async def drift_status(
     registry: ModelRegistry = Depends(get_model_registry),
     detector: DriftDetector = Depends(get_drift_detector),
 ) -> DriftStatusResponse:
-    baseline = registry.get_training_feature_stats()
-    return DriftStatusResponse.model_validate(detector.evaluate(baseline))
+    baseline = registry.get_training_feature_baseline()
+    return DriftStatusResponse.model_validate(
+        detector.evaluate(baseline["training_feature_stats"], histograms=baseline["training_feature_histograms"])
+    )
 
 
 @router.get("/monitoring/history", response_model=MonitoringHistoryResponse)
@@ -50,3 +69,31 @@ async def freshness(
 @router.get("/monitoring/latency", response_model=LatencyResponse)
 async def latency(tracker: LatencyTracker = Depends(get_latency_tracker)) -> LatencyResponse:
     return LatencyResponse.model_validate(tracker.snapshot())
+
+
+@router.get("/monitoring/stages", response_model=StageTimingResponse)
+async def stage_timings(tracker: StageTimingTracker = Depends(get_stage_tracker)) -> StageTimingResponse:
+    return StageTimingResponse.model_validate(tracker.snapshot())
+
+
+@router.get("/monitoring/cache", response_model=CacheStatsResponse)
+async def cache_stats(
+    model_cache: ModelCache = Depends(get_model_cache),
+    feature_service: FeatureService = Depends(get_feature_service),
+) -> CacheStatsResponse:
+    return CacheStatsResponse(caches={"models": model_cache.snapshot(), **feature_service.cache_stats()})
+
+
+@router.get("/monitoring/batching", response_model=BatchingStatsResponse)
+async def batching_stats(engine: InferenceEngine = Depends(get_inference_engine)) -> BatchingStatsResponse:
+    return BatchingStatsResponse.model_validate(engine.batching_stats())
+
+
+@router.get("/monitoring/audit", response_model=AuditWriterStatsResponse)
+async def audit_writer_stats(audit_logger: PredictionAuditLogger = Depends(get_audit_logger)) -> AuditWriterStatsResponse:
+    return AuditWriterStatsResponse.model_validate(audit_logger.snapshot())
+
+
+@router.get("/monitoring/accuracy", response_model=LiveAccuracyResponse)
+async def live_accuracy(job: LiveAccuracyJob = Depends(get_live_accuracy_job)) -> LiveAccuracyResponse:
+    return LiveAccuracyResponse.model_validate(job.load() or {})
@@ -4,6 +4,7 @@ from typing import Any
 from fastapi import APIRouter, Depends, HTTPException, Query
 
 from app.api.dependencies import get_audit_logger, get_inference_engine
+from app.api.responses import FastJSONResponse
 from app.logging.audit import PredictionAuditLogger
 from app.ml.inference import InferenceEngine
 from app.schemas.error import ErrorResponse
@@ -30,9 +31,6 @@ def _legacy_prediction_to_label(prediction: Any) -> str:
 
 
 def _normalize_predict_payload(payload: dict[str, Any], exchange: str) -> dict[str, Any]:
-    if "probability_up" in payload and "inference_latency_ms" in payload:
-        return payload
-
     confidence = float(payload.get("confidence", 0.0))
     prediction_raw = payload.get("prediction", "HOLD")
     prediction_label = _legacy_prediction_to_label(prediction_raw)
@@ -82,35 +80,41 @@ async def predict(
     exchange: str = Query(default="NASDAQ"),
     version: str | None = Query(default=None),
     engine: InferenceEngine = Depends(get_inference_engine),
-) -> PredictResponse:
+) -> FastJSONResponse:
     try:
         payload = await _predict_with_compat(engine=engine, symbol=symbol.upper(), exchange=exchange.upper(), version=version)
     except FileNotFoundError as exc:
         raise HTTPException(status_code=404, detail=str(exc)) from exc
+    if "probability_up" in payload and "inference_latency_ms" in payload:
+        # InferenceEngine output already matches PredictResponse; build it once and skip validation.
+        return FastJSONResponse(PredictResponse.model_construct(**payload))
     normalized = _normalize_predict_payload(payload=payload, exchange=exchange.upper())
-    return PredictResponse.model_validate(normalized)
+    return FastJSONResponse(PredictResponse.model_validate(normalized))
 
 
 @router.post("/predict/batch", response_model=BatchPredictResponse)
 async def predict_batch(
     request: BatchPredictRequest,
+    exchange: str = Query(default="NASDAQ"),
     version: str | None = Query(default=None),
     engine: InferenceEngine = Depends(get_inference_engine),
 ) -> BatchPredictResponse:
+    symbols = [symbol.upper() for symbol in request.symbols]
+    payloads = await engine.predict_batch(symbols=symbols, exchange=exchange.upper(), version=version)
+
     results: list[BatchPredictionItem] = []
-    for symbol in request.symbols:
-        try:
-            payload = await _predict_with_compat(engine=engine, symbol=symbol.upper(), exchange="NASDAQ", version=version)
-            results.append(
-                BatchPredictionItem(
-                    symbol=symbol.upper(),
-                    prediction=_legacy_prediction_to_label(payload.get("prediction", "HOLD")),
-                    confidence=payload.get("confidence"),
-                    version=payload.get("model_version") or payload.get("version"),
-                )
+    for symbol, payload in zip(symbols, payloads):
+        if "error" in payload:
+            results.append(BatchPredictionItem(symbol=symbol, error=payload["error"]))
+            continue
+        results.append(
+            BatchPredictionItem(
+                symbol=symbol,
+                prediction=_legacy_prediction_to_label(payload.get("prediction", "HOLD")),
+                confidence=payload.get("confidence"),
+                version=payload.get("model_version") or payload.get("version"),
             )
-        except Exception as exc:
-            results.append(BatchPredictionItem(symbol=symbol.upper(), error=str(exc)))
+        )
     return BatchPredictResponse(items=results)
 
 
@@ -120,3 +124,24 @@ async def recent_predictions(
     audit_logger: PredictionAuditLogger = Depends(get_audit_logger),
 ) -> PredictionAuditResponse:
     return PredictionAuditResponse(entries=audit_logger.get_recent(limit=limit))
+
+
+@router.get("/predictions", response_model=PredictionAuditResponse)
+def predictions_in_range(
+    start: datetime | None = Query(default=None),
+    end: datetime | None = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=10000),
+    audit_logger: PredictionAuditLogger = Depends(get_audit_logger),
+) -> PredictionAuditResponse:
+    return PredictionAuditResponse(entries=audit_logger.query(start=start, end=end, limit=limit))
+
+
+@router.get("/predictions/{request_id}", response_model=PredictionAuditResponse)
+def prediction_by_request_id(
+    request_id: str,
+    audit_logger: PredictionAuditLogger = Depends(get_audit_logger),
+) -> PredictionAuditResponse:
+    record = audit_logger.find(request_id)
+    if record is None:
+        raise HTTPException(status_code=404, detail=f"Prediction {request_id} not found")
+    return PredictionAuditResponse(entries=[record])
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import math
+import time
+from collections import OrderedDict
+from typing import Any
+
+from app.schemas.p1 import Candle, CandleResponse
+
+CandleKey = tuple[str, str, str]
+
+
+class CandleCache:
+    """Per-(symbol, exchange, interval) store of already-validated candle history.
+
+    A delta must restate the last cached bar; if upstream's open for that bar differs (a split or
+    other back-adjustment), the series is dropped and refetched in full. Series older than
+    ``revalidate_seconds`` since their last full fetch are refetched too, so revisions further
+    back in history are picked up eventually.
+    """
+
+    def __init__(self, max_series: int, max_candles: int, revalidate_seconds: float = 0.0) -> None:
+        self._max_series = max(1, max_series)
+        self._max_candles = max(1, max_candles)
+        self._revalidate_seconds = max(0.0, revalidate_seconds)
+        self._series: OrderedDict[CandleKey, CandleResponse] = OrderedDict()
+        self._fetched_at: dict[CandleKey, float] = {}
+        self._generations: dict[CandleKey, int] = {}
+        self._full_fetches = 0
+        self._delta_fetches = 0
+        self._resets = 0
+        self._revalidations = 0
+
+    def get(self, key: CandleKey) -> CandleResponse | None:
+        series = self._series.get(key)
+        if series is not None:
+            self._series.move_to_end(key)
+        return series
+
+    def generation(self, key: CandleKey) -> int | None:
+        """Changes whenever ``key`` is refetched in full, i.e. whenever its cached history may have been revised."""
+        return self._generations.get(key)
+
+    def expired(self, key: CandleKey) -> bool:
+        """True when ``key`` is cached but due for a full refetch."""
+        fetched_at = self._fetched_at.get(key)
+        if not self._revalidate_seconds or fetched_at is None or time.monotonic() - fetched_at < self._revalidate_seconds:
+            return False
+        self._revalidations += 1
+        return True
+
+    def replace(self, key: CandleKey, response: CandleResponse) -> CandleResponse:
+        self._full_fetches += 1
+        self._fetched_at[key] = time.monotonic()
+        self._generations[key] = self._full_fetches
+        return self._store(key, response, list(response.candles))
+
+    def merge(self, key: CandleKey, delta: CandleResponse) -> CandleResponse | None:
+        """Append a delta fetched from the last cached timestamp; returns None when it does not line up."""
+        self._delta_fetches += 1
+        cached = self._series.get(key)
+        if cached is None:
+            return None
+        if not delta.candles:
+            return self._store(key, delta, list(cached.candles))
+
+        first = delta.candles[0]
+        kept: list[Candle] = [candle for candle in cached.candles if candle.timestamp < first.timestamp]
+        overlap = cached.candles[len(kept)] if len(kept) < len(cached.candles) else None
+        if overlap is None or overlap.timestamp != first.timestamp or not self._same_bar(overlap, first):
+            self._resets += 1
+            self.invalidate(key)
+            return None
+        return self._store(key, delta, kept + list(delta.candles))
+
+    def invalidate(self, key: CandleKey | None = None) -> None:
+        if key is None:
+            self._series.clear()
+            self._fetched_at.clear()
+            self._generations.clear()
+        else:
+            self._series.pop(key, None)
+            self._fetched_at.pop(key, None)
+            self._generations.pop(key, None)
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "series": len(self._series),
+            "max_series": self._max_series,
+            "max_candles": self._max_candles,
+            "candles": sum(len(series.candles) for series in self._series.values()),
+            "full_fetches": self._full_fetches,
+            "delta_fetches": self._delta_fetches,
+            "resets": self._resets,
+            "revalidations": self._revalidations,
+        }
+
+    @staticmethod
+    def _same_bar(cached: Candle, upstream: Candle) -> bool:
+        # The open is fixed once a bar starts, even while it is still forming; adjustments rescale it.
+        return math.isclose(cached.open, upstream.open, rel_tol=1e-9, abs_tol=1e-9)
+
+    def _store(self, key: CandleKey, template: CandleResponse, candles: list[Candle]) -> CandleResponse:
+        series = template.model_copy(update={"candles": candles[-self._max_candles:]})
+        self._series[key] = series
+        self._series.move_to_end(key)
+        while len(self._series) > self._max_series:
+            evicted, _ = self._series.popitem(last=False)
+            self._fetched_at.pop(evicted, None)
+            self._generations.pop(evicted, None)
+        return series
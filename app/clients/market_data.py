@@ -2,6 +2,7 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from collections.abc import Mapping
 from datetime import datetime, timedelta, timezone
 from typing import Any
@@ -9,8 +10,10 @@ from typing import Any
 import httpx
 from pydantic import ValidationError
 
+from app.clients.candle_cache import CandleCache
 from app.core.config import Settings
 from app.exceptions import DataValidationError, UpstreamServiceError
+from app.monitoring.prometheus import UPSTREAM_ERRORS, UPSTREAM_LATENCY, UPSTREAM_REQUESTS, UPSTREAM_RETRIES
 from app.schemas.p1 import (
     CandleResponse,
     CompanyResponse,
@@ -34,8 +37,63 @@ RETRYABLE_CODES = {"EXCHANGE_UNAVAILABLE", "RATE_LIMITED", "STALE_DATA", "PARTIA
 
 
 class MarketDataClient:
-    def __init__(self, settings: Settings) -> None:
+    def __init__(self, settings: Settings, http_client: httpx.AsyncClient | None = None) -> None:
         self._settings = settings
+        self._http_client = http_client
+        self._owns_http_client = http_client is None
+        self._in_flight = 0
+        self._candle_cache = CandleCache(
+            max_series=settings.candle_cache_max_series,
+            max_candles=max(settings.candle_cache_max_candles, settings.max_lookback),
+            revalidate_seconds=settings.candle_cache_revalidate_seconds,
+        )
+
+    async def __aenter__(self) -> "MarketDataClient":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        await self.aclose()
+
+    async def start(self) -> None:
+        self._client()
+
+    async def aclose(self) -> None:
+        if self._http_client is not None and self._owns_http_client:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    async def aclose_when_idle(self, timeout: float | None = None) -> None:
+        """Close once no upstream call is in flight, or after ``timeout`` (default: the worst-case retry budget)."""
+        if timeout is None:
+            attempts = self._settings.market_data_retry_attempts
+            timeout = attempts * self._settings.market_data_timeout_seconds
+            timeout += self._settings.market_data_retry_backoff_seconds * attempts * (attempts - 1) / 2
+        deadline = time.monotonic() + timeout
+        while self._in_flight and time.monotonic() < deadline:
+            await asyncio.sleep(0.05)
+        await self.aclose()
+
+    def _client(self) -> httpx.AsyncClient:
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = self._build_http_client()
+            self._owns_http_client = True
+        return self._http_client
+
+    def _build_http_client(self) -> httpx.AsyncClient:
+        limits = httpx.Limits(
+            max_connections=self._settings.market_data_max_connections,
+            max_keepalive_connections=self._settings.market_data_max_keepalive_connections,
+            keepalive_expiry=self._settings.market_data_keepalive_expiry_seconds,
+        )
+        http2 = self._settings.market_data_http2
+        if http2:
+            try:
+                import h2  # noqa: F401
+            except ImportError:
+                logger.warning("http2_unavailable", extra={"reason": "h2 package is not installed"})
+                http2 = False
+        return httpx.AsyncClient(timeout=self._settings.market_data_timeout_seconds, limits=limits, http2=http2)
 
     async def get_quote(self, symbol: str, exchange: str) -> QuoteResponse:
         payload = await self._get_with_retry("/quote", {"symbol": symbol, "exchange": exchange})
@@ -80,17 +138,38 @@ class MarketDataClient:
 
     async def get_candles(self, symbol: str, lookback: int, exchange: str = "NASDAQ") -> CandleResponse:
         end = datetime.now(tz=timezone.utc)
-        start = end - timedelta(days=max(lookback * 3, 30))
-        response = await self.get_historical(symbol=symbol, exchange=exchange, start=start, end=end, interval="1d")
+        key = (symbol, exchange, "1d")
+        response: CandleResponse | None = None
+
+        cached = self._candle_cache.get(key)
+        if cached is not None and len(cached.candles) >= lookback and not self._candle_cache.expired(key):
+            # Refetch from the last cached candle (inclusive) so a still-forming bar is revised.
+            delta = await self.get_historical(
+                symbol=symbol, exchange=exchange, start=cached.candles[-1].timestamp, end=end, interval="1d"
+            )
+            response = self._candle_cache.merge(key, delta)
+
+        if response is None:
+            start = end - timedelta(days=max(lookback * 3, 30))
+            fetched = await self.get_historical(symbol=symbol, exchange=exchange, start=start, end=end, interval="1d")
+            response = self._candle_cache.replace(key, fetched)
+
         if len(response.candles) < lookback:
             raise DataValidationError(
                 error="insufficient_upstream_data",
                 details={"symbol": symbol, "requested_lookback": lookback, "received_candles": len(response.candles)},
                 status_code=422,
             )
-        response.candles = response.candles[-lookback:]
-        return response
+        return response.model_copy(update={"candles": response.candles[-lookback:]})
+
+    def cached_candles(self, symbol: str, exchange: str = "NASDAQ") -> CandleResponse | None:
+        return self._candle_cache.get((symbol, exchange, "1d"))
 
+    def candle_generation(self, symbol: str, exchange: str = "NASDAQ") -> int | None:
+        return self._candle_cache.generation((symbol, exchange, "1d"))
+
+    def candle_cache_stats(self) -> dict[str, Any]:
+        return self._candle_cache.snapshot()
 
     def _normalize_endpoint_payload(self, path: str, payload: dict[str, Any]) -> dict[str, Any]:
         if not isinstance(payload, dict):
@@ -136,33 +215,43 @@ class MarketDataClient:
             ) from exc
 
     async def _get_with_retry(self, path: str, params: Mapping[str, str]) -> dict[str, Any]:
+        self._in_flight += 1
+        try:
+            return await self._get_with_retry_attempts(path, params)
+        finally:
+            self._in_flight -= 1
+
+    async def _get_with_retry_attempts(self, path: str, params: Mapping[str, str]) -> dict[str, Any]:
         attempts = self._settings.market_data_retry_attempts
-        timeout = self._settings.market_data_timeout_seconds
         backoff = self._settings.market_data_retry_backoff_seconds
         base_url = str(self._settings.market_data_base_url).rstrip("/")
         url = f"{base_url}{path}"
+        client = self._client()
 
         last_exc: Exception | None = None
-        async with httpx.AsyncClient(timeout=timeout) as client:
-            for attempt in range(1, attempts + 1):
-                try:
-                    response = await client.get(url, params=params)
-                    payload = response.json()
-                    if response.status_code >= 400:
-                        self._raise_upstream_error(payload)
-                    return payload
-                except UpstreamServiceError as exc:
-                    last_exc = exc
-                    retryable = exc.error in RETRYABLE_CODES
-                    if attempt < attempts and retryable:
-                        await asyncio.sleep(backoff * attempt)
-                        continue
-                    raise
-                except (httpx.HTTPError, ValueError) as exc:
-                    last_exc = exc
-                    logger.warning("upstream_request_failed", extra={"attempt": attempt, "url": url, "params": dict(params), "error": str(exc)})
-                    if attempt < attempts:
-                        await asyncio.sleep(backoff * attempt)
+        for attempt in range(1, attempts + 1):
+            started = time.perf_counter()
+            try:
+                response = await client.get(url, params=params)
+                payload = response.json()
+                if response.status_code >= 400:
+                    self._raise_upstream_error(payload)
+                self._record_attempt(path, started, "ok")
+                return payload
+            except UpstreamServiceError as exc:
+                last_exc = exc
+                retryable = exc.error in RETRYABLE_CODES
+                self._record_attempt(path, started, "error", code=exc.error, retrying=attempt < attempts and retryable)
+                if attempt < attempts and retryable:
+                    await asyncio.sleep(backoff * attempt)
+                    continue
+                raise
+            except (httpx.HTTPError, ValueError) as exc:
+                last_exc = exc
+                self._record_attempt(path, started, "error", code=exc.__class__.__name__, retrying=attempt < attempts)
+                logger.warning("upstream_request_failed", extra={"attempt": attempt, "url": url, "params": dict(params), "error": str(exc)})
+                if attempt < attempts:
+                    await asyncio.sleep(backoff * attempt)
 
         raise UpstreamServiceError(
             error="EXCHANGE_UNAVAILABLE",
@@ -170,6 +259,15 @@ class MarketDataClient:
             status_code=503,
         ) from last_exc
 
+    @staticmethod
+    def _record_attempt(path: str, started: float, outcome: str, code: str | None = None, retrying: bool = False) -> None:
+        UPSTREAM_LATENCY.labels(path).observe(time.perf_counter() - started)
+        UPSTREAM_REQUESTS.labels(path, outcome).inc()
+        if code is not None:
+            UPSTREAM_ERRORS.labels(path, code).inc()
+        if retrying:
+            UPSTREAM_RETRIES.labels(path).inc()
+
     def _raise_upstream_error(self, payload: Any) -> None:
         if isinstance(payload, dict):
             try:
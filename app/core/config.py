@@ -12,6 +12,9 @@ class Settings(BaseSettings):
     env: Literal["development", "staging", "production"] = Field(default="development", alias="ENV")
     app_env: str = Field(default="local", alias="APP_ENV")
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
+    log_async: bool = Field(default=False, alias="LOG_ASYNC")
+    log_queue_size: int = Field(default=10000, alias="LOG_QUEUE_SIZE")
+    log_event_rate_limit: int = Field(default=0, alias="LOG_EVENT_RATE_LIMIT")
     api_prefix: str = Field(default="/api/v1", alias="API_PREFIX")
     cors_allow_origins: str = Field(default="*", alias="CORS_ALLOW_ORIGINS")
     cors_allow_methods: str = Field(default="*", alias="CORS_ALLOW_METHODS")
@@ -22,17 +25,49 @@ class Settings(BaseSettings):
     market_data_retry_attempts: int = Field(default=3, alias="MARKET_DATA_RETRY_ATTEMPTS")
     market_data_retry_backoff_seconds: float = Field(default=0.5, alias="MARKET_DATA_RETRY_BACKOFF_SECONDS")
     market_data_candle_interval: str = Field(default="1m", alias="MARKET_DATA_CANDLE_INTERVAL")
+    market_data_max_connections: int = Field(default=100, alias="MARKET_DATA_MAX_CONNECTIONS")
+    market_data_max_keepalive_connections: int = Field(default=20, alias="MARKET_DATA_MAX_KEEPALIVE_CONNECTIONS")
+    market_data_keepalive_expiry_seconds: float = Field(default=30.0, alias="MARKET_DATA_KEEPALIVE_EXPIRY_SECONDS")
+    market_data_http2: bool = Field(default=False, alias="MARKET_DATA_HTTP2")
+    candle_cache_max_series: int = Field(default=512, alias="CANDLE_CACHE_MAX_SERIES")
+    candle_cache_max_candles: int = Field(default=3000, alias="CANDLE_CACHE_MAX_CANDLES")
+    candle_cache_revalidate_seconds: float = Field(default=86400.0, alias="CANDLE_CACHE_REVALIDATE_SECONDS")
 
     default_lookback: int = Field(default=100, alias="DEFAULT_LOOKBACK")
     max_lookback: int = Field(default=1000, alias="MAX_LOOKBACK")
     ma_window: int = Field(default=14, alias="MA_WINDOW")
     vol_window: int = Field(default=14, alias="VOL_WINDOW")
+    streaming_features_enabled: bool = Field(default=False, alias="STREAMING_FEATURES_ENABLED")
+    streaming_features_max_symbols: int = Field(default=5000, alias="STREAMING_FEATURES_MAX_SYMBOLS")
+    fundamentals_cache_ttl_seconds: float = Field(default=3600.0, alias="FUNDAMENTALS_CACHE_TTL_SECONDS")
+    fundamentals_cache_max_entries: int = Field(default=2048, alias="FUNDAMENTALS_CACHE_MAX_ENTRIES")
 
     model_registry_dir: str = Field(default="artifacts/models", alias="MODEL_REGISTRY_DIR")
     inference_lookback: int = Field(default=120, alias="INFERENCE_LOOKBACK")
+    model_cache_size: int = Field(default=4, alias="MODEL_CACHE_SIZE")
+    batch_max_concurrency: int = Field(default=16, alias="BATCH_MAX_CONCURRENCY")
+    inference_batch_window_ms: float = Field(default=0.0, alias="INFERENCE_BATCH_WINDOW_MS")
+    inference_batch_max_size: int = Field(default=64, alias="INFERENCE_BATCH_MAX_SIZE")
+    latency_retention_minutes: int = Field(default=60, alias="LATENCY_RETENTION_MINUTES")
+    stage_timing_enabled: bool = Field(default=True, alias="STAGE_TIMING_ENABLED")
     drift_threshold: float = Field(default=0.25, alias="DRIFT_THRESHOLD")
+    drift_window_size: int = Field(default=100, alias="DRIFT_WINDOW_SIZE")
+    drift_psi_threshold: float = Field(default=0.2, alias="DRIFT_PSI_THRESHOLD")
+    drift_ks_threshold: float = Field(default=0.2, alias="DRIFT_KS_THRESHOLD")
     audit_log_limit: int = Field(default=100, alias="AUDIT_LOG_LIMIT")
     audit_log_file: str = Field(default="artifacts/predictions/audit.log", alias="AUDIT_LOG_FILE")
+    audit_log_buffered: bool = Field(default=True, alias="AUDIT_LOG_BUFFERED")
+    audit_log_queue_size: int = Field(default=10000, alias="AUDIT_LOG_QUEUE_SIZE")
+    audit_log_batch_size: int = Field(default=256, alias="AUDIT_LOG_BATCH_SIZE")
+    audit_log_flush_interval_seconds: float = Field(default=0.05, alias="AUDIT_LOG_FLUSH_INTERVAL_SECONDS")
+    audit_log_fsync: Literal["none", "batch"] = Field(default="none", alias="AUDIT_LOG_FSYNC")
+    audit_log_overflow: Literal["block", "drop"] = Field(default="block", alias="AUDIT_LOG_OVERFLOW")
+    audit_log_segment_max_bytes: int = Field(default=64 * 1024 * 1024, alias="AUDIT_LOG_SEGMENT_MAX_BYTES")
+    audit_log_segment_max_age_seconds: float = Field(default=86400.0, alias="AUDIT_LOG_SEGMENT_MAX_AGE_SECONDS")
+    audit_log_compress_segments: bool = Field(default=False, alias="AUDIT_LOG_COMPRESS_SEGMENTS")
+    audit_log_frame_cache_bytes: int = Field(default=256 * 1024 * 1024, alias="AUDIT_LOG_FRAME_CACHE_BYTES")
+    live_accuracy_file: str = Field(default="artifacts/monitoring/live_accuracy.json", alias="LIVE_ACCURACY_FILE")
+    live_accuracy_concurrency: int = Field(default=8, alias="LIVE_ACCURACY_CONCURRENCY")
     admin_api_key: str = Field(default="changeme-admin-key", alias="ADMIN_API_KEY")
     train_symbols: str = Field(default="AAPL,MSFT", alias="TRAIN_SYMBOLS")
     train_lookback: int = Field(default=252, alias="TRAIN_LOOKBACK")
@@ -41,6 +76,10 @@ class Settings(BaseSettings):
     train_cv_folds: int = Field(default=3, alias="TRAIN_CV_FOLDS")
     rate_limit_requests: int = Field(default=120, alias="RATE_LIMIT_REQUESTS")
     rate_limit_window_seconds: int = Field(default=60, alias="RATE_LIMIT_WINDOW_SECONDS")
+    rate_limit_classes: str = Field(
+        default="predict=120/60,batch=30/60,admin=30/60,monitoring=600/60", alias="RATE_LIMIT_CLASSES"
+    )
+    rate_limit_max_keys: int = Field(default=100_000, alias="RATE_LIMIT_MAX_KEYS")
 
     @property
     def resolved_log_level(self) -> str:
@@ -56,6 +95,21 @@ class Settings(BaseSettings):
     def resolved_train_symbols(self) -> list[str]:
         return [symbol.strip().upper() for symbol in self.train_symbols.split(",") if symbol.strip()]
 
+    @property
+    def resolved_rate_limits(self) -> dict[str, tuple[int, float]]:
+        """``{route_class: (requests, window_seconds)}``; ``default`` comes from RATE_LIMIT_REQUESTS/WINDOW."""
+        limits = {"default": (self.rate_limit_requests, float(self.rate_limit_window_seconds))}
+        for item in self.rate_limit_classes.split(","):
+            if "=" not in item:
+                continue
+            name, spec = (part.strip() for part in item.split("=", 1))
+            requests, _, window = spec.partition("/")
+            limits[name] = (int(requests), float(window or self.rate_limit_window_seconds))
+        for name, (requests, window) in limits.items():
+            if requests <= 0 or window <= 0:
+                raise ValueError(f"Rate limit class '{name}' needs positive requests and window, got {requests}/{window:g}")
+        return limits
+
     @property
     def resolved_cors_allow_origins(self) -> list[str]:
         if self.cors_allow_origins.strip() == "*":
@@ -1,12 +1,26 @@
+import copy
 import json
 import logging
+import logging.handlers
+import queue
+import threading
 from datetime import datetime, timezone
 
+from app.monitoring.prometheus import LOG_RECORDS_DROPPED
+
 _RESERVED_LOG_RECORD_FIELDS = {
     "name", "msg", "args", "levelname", "levelno", "pathname", "filename", "module",
     "exc_info", "exc_text", "stack_info", "lineno", "funcName", "created", "msecs",
     "relativeCreated", "thread", "threadName", "processName", "process", "message", "asctime",
+    "taskName",
 }
+_MAX_RATE_LIMITED_EVENTS = 1024
+
+_listener: logging.handlers.QueueListener | None = None
+_stream_handler: logging.Handler | None = None
+_front: logging.Handler | None = None
+_filters: list[logging.Filter] = []
+_queue_size = 0
 
 
 class JsonFormatter(logging.Formatter):
@@ -14,7 +28,7 @@ class JsonFormatter(logging.Formatter):
 
     def format(self, record: logging.LogRecord) -> str:
         payload = {
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": datetime.fromtimestamp(record.created, timezone.utc).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -33,10 +47,113 @@ class JsonFormatter(logging.Formatter):
         return json.dumps(payload, default=str)
 
 
-def configure_logging(level: str) -> None:
+class EventRateLimitFilter(logging.Filter):
+    """Passes at most ``per_second`` records per (logger, event) each second below ERROR.
+
+    The first record of the next window carries ``suppressed``, the number dropped in between.
+    """
+
+    def __init__(self, per_second: int) -> None:
+        super().__init__()
+        self._per_second = per_second
+        self._events: dict[tuple[str, object], list[float]] = {}
+        self._lock = threading.Lock()
+        self._dropped = LOG_RECORDS_DROPPED.labels("rate_limited")
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self._per_second <= 0 or record.levelno >= logging.ERROR:
+            return True
+        key = (record.name, record.msg)
+        with self._lock:
+            state = self._events.get(key)
+            if state is None or record.created - state[0] >= 1.0:
+                if state is None and len(self._events) >= _MAX_RATE_LIMITED_EVENTS:
+                    self._events.clear()
+                if state is not None and state[2]:
+                    record.suppressed = int(state[2])
+                self._events[key] = [record.created, 1, 0]
+                return True
+            if state[1] < self._per_second:
+                state[1] += 1
+                return True
+            state[2] += 1
+        self._dropped.inc()
+        return False
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """Enqueues records without formatting them; a full queue drops the record and counts it."""
+
+    def __init__(self, log_queue: queue.Queue) -> None:
+        super().__init__(log_queue)
+        self.dropped = 0
+        self._dropped = LOG_RECORDS_DROPPED.labels("queue_full")
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Only resolve %-args now (they may be mutated later); JSON formatting happens on the listener thread.
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+            self._dropped.inc()
+
+
+def configure_logging(level: str, async_logging: bool = False, queue_size: int = 10000, event_rate_limit: int = 0) -> None:
+    """Log JSON lines to stderr; ``async_logging`` lets ``start_logging`` move formatting and writes to a background thread."""
+    global _stream_handler, _queue_size
+    shutdown_logging()
     root = logging.getLogger()
     root.handlers.clear()
-    handler = logging.StreamHandler()
-    handler.setFormatter(JsonFormatter())
-    root.addHandler(handler)
+    _filters.clear()
+    if event_rate_limit > 0:
+        _filters.append(EventRateLimitFilter(event_rate_limit))
+    _stream_handler = logging.StreamHandler()
+    _stream_handler.setFormatter(JsonFormatter())
+    _queue_size = max(1, queue_size) if async_logging else 0
+    _install(_stream_handler)
     root.setLevel(level.upper())
+
+
+def start_logging() -> None:
+    """Start the background listener in this process; records stay synchronous until then.
+
+    Called from the app lifespan rather than at import, so a forked worker never inherits a queue nobody drains.
+    """
+    global _listener
+    if _listener is not None or not _queue_size or _stream_handler is None:
+        return
+    log_queue: queue.Queue = queue.Queue(maxsize=_queue_size)
+    _listener = logging.handlers.QueueListener(log_queue, _stream_handler, respect_handler_level=True)
+    _listener.start()
+    _install(NonBlockingQueueHandler(log_queue))
+
+
+def shutdown_logging() -> None:
+    """Drain and stop the background listener; records are written synchronously until the next start."""
+    global _listener
+    listener, _listener = _listener, None
+    if listener is None:
+        return
+    listener.stop()
+    if _stream_handler is not None:
+        _install(_stream_handler)
+
+
+def _install(handler: logging.Handler) -> None:
+    # The rate limiter sits on whichever handler is front-most, so a record is only counted once.
+    global _front
+    root = logging.getLogger()
+    if _front is not None:
+        root.removeHandler(_front)
+        for log_filter in _filters:
+            _front.removeFilter(log_filter)
+    for log_filter in _filters:
+        handler.addFilter(log_filter)
+    root.addHandler(handler)
+    _front = handler
@@ -1,30 +1,100 @@
 from __future__ import annotations
 
+from collections.abc import Callable
+from typing import Any
+
+import numpy as np
 import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
 
 from app.exceptions import DataValidationError
 from app.schemas.features import FeatureRow
 from app.schemas.p1 import Candle, FundamentalsPayload
 
+FEATURE_COLUMNS = ["close", "simple_return", "moving_average", "rolling_volatility", "return_5d", "zscore_20", "drawdown", "fund_pe_ratio", "fund_pb_ratio", "fund_market_cap"]
+ZSCORE_WINDOW = 20
 
-def compute_features(candles: list[Candle], ma_window: int, vol_window: int, fundamentals: FundamentalsPayload | None = None) -> list[FeatureRow]:
-    frame = pd.DataFrame([c.model_dump() for c in candles])
-    frame = frame.sort_values("timestamp", kind="mergesort").reset_index(drop=True)
 
-    frame["simple_return"] = frame["close"].pct_change().fillna(0.0)
-    frame["moving_average"] = frame["close"].rolling(window=ma_window, min_periods=1).mean()
-    frame["rolling_volatility"] = frame["close"].pct_change().rolling(window=vol_window, min_periods=1).std().fillna(0.0)
-    frame["return_5d"] = frame["close"].pct_change(periods=5).fillna(0.0)
-    frame["zscore_20"] = ((frame["close"] - frame["close"].rolling(20, min_periods=1).mean()) / frame["close"].rolling(20, min_periods=1).std().replace(0, 1)).fillna(0.0)
-    running_max = frame["close"].cummax().replace(0, 1)
-    frame["drawdown"] = ((frame["close"] / running_max) - 1.0).fillna(0.0)
+def _mean_rows(block: np.ndarray) -> np.ndarray:
+    # Constant windows return the exact value (as pandas does) instead of a sum/n rounding artefact.
+    constant = (block == block[:, :1]).all(axis=1)
+    return np.where(constant, block[:, 0], block.mean(axis=1))
+
+
+def _std_rows(block: np.ndarray) -> np.ndarray:
+    if block.shape[1] < 2:
+        return np.full(block.shape[0], np.nan)
+    constant = (block == block[:, :1]).all(axis=1)
+    return np.where(constant, 0.0, block.std(axis=1, ddof=1))
+
+
+def _rolling(values: np.ndarray, window: int, reduce_rows: Callable[[np.ndarray], np.ndarray]) -> np.ndarray:
+    """rolling(window, min_periods=1) where every window is reduced as one contiguous row.
+
+    Reducing identical contiguous rows keeps the full-series and tail-only paths bit-for-bit equal.
+    """
+    out = np.empty(len(values))
+    for idx in range(min(window - 1, len(values))):
+        out[idx] = reduce_rows(values[None, : idx + 1])[0]
+    if len(values) >= window:
+        out[window - 1:] = reduce_rows(np.ascontiguousarray(sliding_window_view(values, window)))
+    return out
+
 
+def _tail(values: np.ndarray, window: int, reduce_rows: Callable[[np.ndarray], np.ndarray]) -> float:
+    return float(reduce_rows(values[None, -window:])[0])
+
+
+def _fill_nan(values: np.ndarray) -> np.ndarray:
+    return np.where(np.isnan(values), 0.0, values)
+
+
+def _closes(candles: list[Candle]) -> np.ndarray:
+    if any(candles[idx].timestamp < candles[idx - 1].timestamp for idx in range(1, len(candles))):
+        candles = sorted(candles, key=lambda candle: candle.timestamp)
+    return np.fromiter((c.close for c in candles), dtype=float, count=len(candles))
+
+
+def fundamental_features(fundamentals: FundamentalsPayload | None) -> dict[str, float]:
     pe = fundamentals.pe_ratio if fundamentals else None
     pb = fundamentals.pb_ratio if fundamentals else None
     mcap = fundamentals.market_cap if fundamentals else None
-    frame["fund_pe_ratio"] = pe if pe is not None else 0.0
-    frame["fund_pb_ratio"] = pb if pb is not None else 0.0
-    frame["fund_market_cap"] = mcap if mcap is not None else 0.0
+    return {
+        "fund_pe_ratio": float(pe) if pe is not None else 0.0,
+        "fund_pb_ratio": float(pb) if pb is not None else 0.0,
+        "fund_market_cap": float(mcap) if mcap is not None else 0.0,
+    }
+
+
+def compute_feature_frame(candles: list[Candle], ma_window: int, vol_window: int, fundamentals: FundamentalsPayload | None = None) -> pd.DataFrame:
+    timestamps = sorted(c.timestamp for c in candles)
+    closes = _closes(candles)
+    count = len(closes)
+
+    simple_return = np.zeros(count)
+    simple_return[1:] = closes[1:] / closes[:-1] - 1.0
+    rolling_volatility = np.zeros(count)
+    rolling_volatility[1:] = _fill_nan(_rolling(simple_return[1:], vol_window, _std_rows))
+    return_5d = np.zeros(count)
+    return_5d[5:] = closes[5:] / closes[:-5] - 1.0
+    zscore_std = _rolling(closes, ZSCORE_WINDOW, _std_rows)
+    zscore_20 = _fill_nan((closes - _rolling(closes, ZSCORE_WINDOW, _mean_rows)) / np.where(zscore_std == 0, 1.0, zscore_std))
+    running_max = np.maximum.accumulate(closes) if count else closes
+    running_max = np.where(running_max == 0, 1.0, running_max)
+
+    frame = pd.DataFrame(
+        {
+            "timestamp": timestamps,
+            "close": closes,
+            "simple_return": simple_return,
+            "moving_average": _rolling(closes, ma_window, _mean_rows),
+            "rolling_volatility": rolling_volatility,
+            "return_5d": return_5d,
+            "zscore_20": zscore_20,
+            "drawdown": closes / running_max - 1.0,
+            **fundamental_features(fundamentals),
+        }
+    )
 
     completeness = 1.0 - (frame.isna().sum().sum() / max(frame.size, 1))
     if completeness < 0.98:
@@ -34,22 +104,53 @@ def compute_features(candles: list[Candle], ma_window: int, vol_window: int, fun
             status_code=422,
         )
 
-    feature_rows: list[FeatureRow] = []
-    for row in frame.fillna(0.0).itertuples(index=False):
-        feature_rows.append(
-            FeatureRow(
-                timestamp=row.timestamp,
-                close=float(row.close),
-                simple_return=float(row.simple_return),
-                moving_average=float(row.moving_average),
-                rolling_volatility=float(row.rolling_volatility),
-                return_5d=float(row.return_5d),
-                zscore_20=float(row.zscore_20),
-                drawdown=float(row.drawdown),
-                fund_pe_ratio=float(row.fund_pe_ratio),
-                fund_pb_ratio=float(row.fund_pb_ratio),
-                fund_market_cap=float(row.fund_market_cap),
-            )
+    frame[FEATURE_COLUMNS] = frame[FEATURE_COLUMNS].fillna(0.0)
+    return frame
+
+
+def compute_latest_features(candles: list[Candle], ma_window: int, vol_window: int, fundamentals: FundamentalsPayload | None = None) -> dict[str, float]:
+    """Last row of compute_feature_frame, evaluated over the trailing windows only."""
+    if not candles:
+        raise DataValidationError(error="insufficient_upstream_data", details={"received_candles": 0}, status_code=422)
+    closes = _closes(candles)
+    if not np.isfinite(closes).all():
+        raise DataValidationError(
+            error="feature_completeness_below_threshold",
+            details={"required": 0.98, "message": "non-finite close prices"},
+            status_code=422,
         )
 
-    return feature_rows
+    count = len(closes)
+    close = closes[-1]
+    first_return = max(1, count - vol_window)
+    returns = closes[first_return:] / closes[first_return - 1:-1] - 1.0
+    zscore_std = _tail(closes, ZSCORE_WINDOW, _std_rows)
+    running_max = closes.max() or 1.0
+
+    features = {
+        "close": float(close),
+        "simple_return": float(close / closes[-2] - 1.0) if count >= 2 else 0.0,
+        "moving_average": _tail(closes, ma_window, _mean_rows),
+        "rolling_volatility": _tail(returns, vol_window, _std_rows) if count >= 2 else 0.0,
+        "return_5d": float(close / closes[-6] - 1.0) if count >= 6 else 0.0,
+        "zscore_20": float((close - _tail(closes, ZSCORE_WINDOW, _mean_rows)) / (zscore_std or 1.0)),
+        "drawdown": float(close / running_max - 1.0),
+        **fundamental_features(fundamentals),
+    }
+    return {key: 0.0 if np.isnan(value) else value for key, value in features.items()}
+
+
+def feature_records(frame: pd.DataFrame) -> list[dict[str, Any]]:
+    """FeatureRow-shaped plain dicts for serializing straight to JSON without building models."""
+    timestamps = pd.DatetimeIndex(frame["timestamp"]).to_pydatetime()
+    values = frame[FEATURE_COLUMNS].to_numpy(dtype=float).tolist()
+    return [{"timestamp": timestamp, **dict(zip(FEATURE_COLUMNS, row))} for timestamp, row in zip(timestamps, values)]
+
+
+def feature_rows(frame: pd.DataFrame) -> list[FeatureRow]:
+    values = frame[FEATURE_COLUMNS].to_numpy(dtype=float).tolist()
+    return [FeatureRow(timestamp=timestamp, **dict(zip(FEATURE_COLUMNS, row))) for timestamp, row in zip(frame["timestamp"], values)]
+
+
+def compute_features(candles: list[Candle], ma_window: int, vol_window: int, fundamentals: FundamentalsPayload | None = None) -> list[FeatureRow]:
+    return feature_rows(compute_feature_frame(candles, ma_window, vol_window, fundamentals))
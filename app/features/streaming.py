@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import math
+from collections import OrderedDict, deque
+from collections.abc import Hashable
+from datetime import datetime
+from typing import Any
+
+from app.features.engineering import ZSCORE_WINDOW
+from app.schemas.p1 import Candle
+
+
+def _welford_add(mean: float, m2: float, count: int, value: float) -> tuple[float, float, int]:
+    count += 1
+    delta = value - mean
+    mean += delta / count
+    return mean, m2 + delta * (value - mean), count
+
+
+def _welford_remove(mean: float, m2: float, count: int, value: float) -> tuple[float, float, int]:
+    count -= 1
+    if count == 0:
+        return 0.0, 0.0, 0
+    new_mean = mean - (value - mean) / count
+    return new_mean, m2 - (value - mean) * (value - new_mean), count
+
+
+class _WindowStats:
+    """Sliding-window mean/std with O(1) updates and pandas rolling(min_periods=1) semantics."""
+
+    def __init__(self, size: int) -> None:
+        self._size = max(1, size)
+        self._values: deque[float] = deque()
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._same_run = 0
+
+    def push(self, value: float) -> None:
+        self._mean, self._m2, self._same_run = self._next(value)
+        if len(self._values) == self._size:
+            self._values.popleft()
+        self._values.append(value)
+
+    def peek(self, value: float) -> tuple[float, float]:
+        """(mean, std) of the window as it would be after pushing ``value``."""
+        mean, m2, same_run = self._next(value)
+        count = min(len(self._values) + 1, self._size)
+        if same_run >= count:
+            return value, 0.0 if count > 1 else math.nan
+        if count < 2:
+            return mean, math.nan
+        return mean, math.sqrt(max(m2, 0.0) / (count - 1))
+
+    def _next(self, value: float) -> tuple[float, float, int]:
+        mean, m2, count = self._mean, self._m2, len(self._values)
+        if count == self._size:
+            mean, m2, count = _welford_remove(mean, m2, count, self._values[0])
+        mean, m2, _ = _welford_add(mean, m2, count, value)
+        same_run = self._same_run + 1 if self._values and self._values[-1] == value else 1
+        return mean, m2, same_run
+
+
+class _WindowMax:
+    """Sliding-window maximum backed by a monotonic deque (amortized O(1))."""
+
+    def __init__(self, size: int) -> None:
+        self._size = max(1, size)
+        self._index = 0
+        self._candidates: deque[tuple[int, float]] = deque()
+
+    def push(self, value: float) -> None:
+        while self._candidates and self._candidates[-1][1] <= value:
+            self._candidates.pop()
+        self._candidates.append((self._index, value))
+        if self._candidates[0][0] <= self._index - self._size:
+            self._candidates.popleft()
+        self._index += 1
+
+    def peek(self, value: float) -> float:
+        oldest_kept = self._index - self._size + 1
+        for index, candidate in self._candidates:
+            if index >= oldest_kept:
+                return max(candidate, value)
+        return value
+
+
+class SymbolFeatureState:
+    """Running feature state for one series.
+
+    Once ``lookback`` exceeds every feature window, ``peek``/``push`` agree with the last row of
+    compute_feature_frame over the trailing ``lookback`` candles.
+    """
+
+    def __init__(self, ma_window: int, vol_window: int, lookback: int) -> None:
+        self._moving_average = _WindowStats(ma_window)
+        self._volatility = _WindowStats(vol_window)
+        self._zscore = _WindowStats(ZSCORE_WINDOW)
+        self._running_max = _WindowMax(lookback)
+        self._recent_closes: deque[float] = deque(maxlen=5)
+        self._latest: dict[str, float] | None = None
+        self.last_timestamp: datetime | None = None
+        self.generation: int | None = None
+
+    def peek(self, close: float) -> dict[str, float]:
+        previous = self._recent_closes[-1] if self._recent_closes else None
+        simple_return = close / previous - 1.0 if previous is not None else 0.0
+        moving_average, _ = self._moving_average.peek(close)
+        _, volatility = self._volatility.peek(simple_return) if previous is not None else (0.0, math.nan)
+        zscore_mean, zscore_std = self._zscore.peek(close)
+        zscore = (close - zscore_mean) / (zscore_std or 1.0)
+        running_max = self._running_max.peek(close) or 1.0
+        return {
+            "close": close,
+            "simple_return": simple_return,
+            "moving_average": moving_average,
+            "rolling_volatility": 0.0 if math.isnan(volatility) else volatility,
+            "return_5d": close / self._recent_closes[0] - 1.0 if len(self._recent_closes) == 5 else 0.0,
+            "zscore_20": 0.0 if math.isnan(zscore) else zscore,
+            "drawdown": close / running_max - 1.0,
+        }
+
+    def push(self, timestamp: datetime, close: float) -> dict[str, float]:
+        features = self.peek(close)
+        if self._recent_closes:
+            self._volatility.push(features["simple_return"])
+        self._moving_average.push(close)
+        self._zscore.push(close)
+        self._running_max.push(close)
+        self._recent_closes.append(close)
+        self._latest = features
+        self.last_timestamp = timestamp
+        return features
+
+    def latest(self) -> dict[str, float] | None:
+        return dict(self._latest) if self._latest is not None else None
+
+
+class StreamingFeatureEngine:
+    """Per-symbol SymbolFeatureState registry with LRU eviction; each new closed candle costs O(1)."""
+
+    def __init__(self, ma_window: int, vol_window: int, max_symbols: int) -> None:
+        self._ma_window = ma_window
+        self._vol_window = vol_window
+        self._max_symbols = max(1, max_symbols)
+        self._states: OrderedDict[Hashable, SymbolFeatureState] = OrderedDict()
+        self._updates = 0
+        self._reseeds = 0
+
+    def ingest(self, key: Hashable, candles: list[Candle], lookback: int, generation: int | None = None) -> SymbolFeatureState:
+        """Push the closed candles newer than the state.
+
+        The state is re-seeded when the history does not overlap it, or when ``generation`` (the
+        candle cache's refetch counter) changed, since the bars it was built from may have been revised.
+        """
+        state = self._state(key, lookback)
+        revised = state.generation != generation
+        if state.last_timestamp is not None and (revised or (candles and candles[0].timestamp > state.last_timestamp)):
+            self._reseeds += 1
+            state = SymbolFeatureState(self._ma_window, self._vol_window, lookback)
+            self._states[(key, lookback)] = state
+        state.generation = generation
+        for candle in candles:
+            if state.last_timestamp is None or candle.timestamp > state.last_timestamp:
+                self._updates += 1
+                state.push(candle.timestamp, candle.close)
+        return state
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "symbols": len(self._states),
+            "max_symbols": self._max_symbols,
+            "updates": self._updates,
+            "reseeds": self._reseeds,
+        }
+
+    def _state(self, key: Hashable, lookback: int) -> SymbolFeatureState:
+        state_key = (key, lookback)
+        state = self._states.get(state_key)
+        if state is None:
+            state = SymbolFeatureState(self._ma_window, self._vol_window, lookback)
+            self._states[state_key] = state
+            while len(self._states) > self._max_symbols:
+                self._states.popitem(last=False)
+        self._states.move_to_end(state_key)
+        return state
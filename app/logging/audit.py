@@ -1,17 +1,99 @@
 from __future__ import annotations
 
+import asyncio
+import io
 import json
+import logging
+import queue
+import threading
+import time
 import uuid
+from collections import OrderedDict, deque
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+import pandas as pd
+
+from app.logging.segments import SegmentedAuditLog
+from app.monitoring.prometheus import AUDIT_DROPPED, AUDIT_WRITE_ERRORS, AUDIT_WRITE_LATENCY, AUDIT_WRITTEN
+
+logger = logging.getLogger(__name__)
+
+FSYNC_POLICIES = ("none", "batch")
+OVERFLOW_POLICIES = ("block", "drop")
+
+
+class _Barrier:
+    def __init__(self, stop: bool = False) -> None:
+        self.done = threading.Event()
+        self.stop = stop
+
 
 class PredictionAuditLogger:
-    def __init__(self, log_file: str, limit: int) -> None:
+    """Appends one JSON line per prediction.
+
+    With ``buffered`` (the default) records go through a bounded queue to a background thread that
+    group-commits up to ``batch_size`` lines per write, waiting at most ``flush_interval_seconds``
+    for a batch to fill. When the queue is full, ``overflow="block"`` applies back-pressure to the
+    caller and ``overflow="drop"`` discards the record and counts it. ``log_prediction`` blocks the
+    calling thread; code on the event loop uses ``log_prediction_async``, which waits in a worker
+    thread instead. After ``close`` further records are refused (counted as dropped).
+    """
+
+    def __init__(
+        self,
+        log_file: str,
+        limit: int,
+        *,
+        buffered: bool = True,
+        queue_size: int = 10000,
+        batch_size: int = 256,
+        flush_interval_seconds: float = 0.05,
+        fsync: str = "none",
+        overflow: str = "block",
+        segment_max_bytes: int = 0,
+        segment_max_age_seconds: float = 0.0,
+        compress_segments: bool = False,
+        frame_cache_bytes: int = 256 * 1024 * 1024,
+    ) -> None:
+        if fsync not in FSYNC_POLICIES:
+            raise ValueError(f"fsync must be one of {FSYNC_POLICIES}")
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"overflow must be one of {OVERFLOW_POLICIES}")
         self._log_file = Path(log_file)
-        self._log_file.parent.mkdir(parents=True, exist_ok=True)
+        self._segments = SegmentedAuditLog(
+            self._log_file,
+            max_bytes=segment_max_bytes,
+            max_age_seconds=segment_max_age_seconds,
+            compress=compress_segments,
+        )
         self._limit = limit
+        self._buffered = buffered
+        self._batch_size = max(1, batch_size)
+        self._flush_interval_seconds = max(0.0, flush_interval_seconds)
+        self._fsync = fsync
+        self._overflow = overflow
+        self._queue: queue.Queue[tuple[str, dict[str, Any]] | _Barrier] = queue.Queue(maxsize=max(1, queue_size))
+        self._file_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._writer: threading.Thread | None = None
+        self._closed = False
+        self._written = 0
+        self._dropped = 0
+        self._batches = 0
+        self._write_errors = 0
+        self._recent: deque[dict[str, Any]] = deque(maxlen=max(1, limit))
+        self._recent_lock = threading.Lock()
+        self._frame_cache_bytes = max(0, frame_cache_bytes)
+        self._sealed_frames: OrderedDict[tuple[str, int, int, tuple[str, ...]], tuple[pd.DataFrame, int]] = OrderedDict()
+        self._sealed_frames_bytes = 0
+        self._frames_lock = threading.Lock()
+        self._load_recent()
+
+    @property
+    def log_file(self) -> Path:
+        return self._log_file
 
     @staticmethod
     def new_request_id() -> str:
@@ -25,26 +107,255 @@ class PredictionAuditLogger:
         prediction: float,
         latency_ms: float,
         request_id: str | None = None,
+        symbol: str | None = None,
+        exchange: str | None = None,
     ) -> dict[str, Any]:
+        record, entry = self._build_entry(
+            model_version=model_version,
+            features=features,
+            prediction=prediction,
+            latency_ms=latency_ms,
+            request_id=request_id,
+            symbol=symbol,
+            exchange=exchange,
+        )
+        if self._refused():
+            return record
+        if not self._buffered:
+            self._write_lines([entry])
+        elif not self._try_enqueue(entry):
+            if self._overflow == "drop":
+                self._count_drop()
+                return record
+            self._queue.put(entry)
+        self._remember(record)
+        return record
+
+    async def log_prediction_async(self, **fields: Any) -> dict[str, Any]:
+        """``log_prediction`` for the event loop: disk writes and back-pressure wait in a worker thread."""
+        record, entry = self._build_entry(**fields)
+        if self._refused():
+            return record
+        if not self._buffered:
+            await asyncio.to_thread(self._write_lines, [entry])
+        elif not self._try_enqueue(entry):
+            if self._overflow == "drop":
+                self._count_drop()
+                return record
+            await asyncio.to_thread(self._queue.put, entry)
+        self._remember(record)
+        return record
+
+    def flush(self) -> None:
+        """Block until every record queued before this call has been written."""
+        if self._buffered and self._writer is not None and self._writer.is_alive():
+            barrier = _Barrier()
+            self._queue.put(barrier)
+            barrier.done.wait()
+
+    def close(self) -> None:
+        with self._start_lock:
+            self._closed = True
+            writer, self._writer = self._writer, None
+        if writer is not None and writer.is_alive():
+            barrier = _Barrier(stop=True)
+            self._queue.put(barrier)
+            barrier.done.wait()
+            writer.join()
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "buffered": self._buffered,
+            "closed": self._closed,
+            "queued": self.queue_depth(),
+            "queue_capacity": self._queue.maxsize,
+            "written": self._written,
+            "dropped": self._dropped,
+            "batches": self._batches,
+            "write_errors": self._write_errors,
+            "fsync": self._fsync,
+            "overflow": self._overflow,
+            "segments": self._segments.snapshot(),
+        }
+
+    def clear(self) -> None:
+        self.flush()
+        with self._file_lock:
+            self._segments.clear()
+        with self._recent_lock:
+            self._recent.clear()
+
+    def get_recent(self, limit: int | None = None) -> list[dict[str, Any]]:
+        resolved_limit = min(limit or self._limit, self._limit)
+        if resolved_limit <= 0:
+            return []
+        with self._recent_lock:
+            start = max(0, len(self._recent) - resolved_limit)
+            return [self._recent[idx] for idx in range(start, len(self._recent))]
+
+    def find(self, request_id: str) -> dict[str, Any] | None:
+        self.flush()
+        with self._file_lock:
+            return self._segments.find(request_id)
+
+    def query(self, start: datetime | None = None, end: datetime | None = None, limit: int | None = None) -> list[dict[str, Any]]:
+        self.flush()
+        with self._file_lock:
+            return self._segments.query(start=start, end=end, limit=limit)
+
+    def read_frame(self, columns: list[str]) -> pd.DataFrame:
+        """Bulk-load ``columns`` from every segment, oldest first.
+
+        Sealed segments are immutable, so their parsed columns are kept in an LRU of at most
+        ``frame_cache_bytes`` and only the active segment and evicted segments are re-parsed on
+        later calls. The file lock is held just long enough to snapshot the active segment, so the
+        writer is not stalled while parsing.
+        """
+        self.flush()
+        with self._file_lock:
+            *sealed, active = self._segments.segment_paths()
+            active_bytes = active.read_bytes() if active.exists() else b""
+
+        frames = []
+        for path in sealed:
+            try:
+                stat = path.stat()
+            except FileNotFoundError:
+                continue
+            key = (path.name, stat.st_size, stat.st_mtime_ns, tuple(columns))
+            frame = self._cached_frame(key)
+            if frame is None:
+                frame = self._parse_frame(path, columns)
+                self._cache_frame(key, frame)
+            frames.append(frame)
+        if active_bytes.strip():
+            frames.append(self._parse_frame(io.BytesIO(active_bytes), columns))
+        if not frames:
+            return pd.DataFrame(columns=columns)
+        return pd.concat(frames, ignore_index=True)
+
+    def _cached_frame(self, key: tuple[str, int, int, tuple[str, ...]]) -> pd.DataFrame | None:
+        with self._frames_lock:
+            cached = self._sealed_frames.get(key)
+            if cached is None:
+                return None
+            self._sealed_frames.move_to_end(key)
+            return cached[0]
+
+    def _cache_frame(self, key: tuple[str, int, int, tuple[str, ...]], frame: pd.DataFrame) -> None:
+        size = int(frame.memory_usage(index=True, deep=True).sum())
+        with self._frames_lock:
+            for stale in [cached for cached in self._sealed_frames if cached[0] == key[0]]:
+                self._sealed_frames_bytes -= self._sealed_frames.pop(stale)[1]
+            if size > self._frame_cache_bytes:
+                return
+            self._sealed_frames[key] = (frame, size)
+            self._sealed_frames_bytes += size
+            while self._sealed_frames_bytes > self._frame_cache_bytes:
+                self._sealed_frames_bytes -= self._sealed_frames.popitem(last=False)[1][1]
+
+    @staticmethod
+    def _parse_frame(source: Path | io.BytesIO, columns: list[str]) -> pd.DataFrame:
+        frame = pd.read_json(source, lines=True, compression="infer", convert_dates=False, dtype=False)
+        return frame.reindex(columns=columns)
+
+    def _load_recent(self) -> None:
+        for line in self._segments.tail_lines(self._recent.maxlen or 0):
+            try:
+                self._recent.append(json.loads(line))
+            except json.JSONDecodeError:
+                logger.warning("audit_line_unreadable", extra={"log_file": str(self._log_file)})
+
+    def _build_entry(
+        self,
+        *,
+        model_version: str,
+        features: dict[str, float],
+        prediction: float,
+        latency_ms: float,
+        request_id: str | None = None,
+        symbol: str | None = None,
+        exchange: str | None = None,
+    ) -> tuple[dict[str, Any], tuple[str, dict[str, Any]]]:
         record = {
             "request_id": request_id or self.new_request_id(),
+            "symbol": symbol,
+            "exchange": exchange,
             "model_version": model_version,
             "features": features,
             "prediction": prediction,
             "timestamp": datetime.now(timezone.utc).isoformat(),
             "latency_ms": latency_ms,
         }
-        with self._log_file.open("a", encoding="utf-8") as fh:
-            fh.write(json.dumps(record, default=str) + "\n")
-        return record
+        return record, (json.dumps(record, default=str) + "\n", record)
 
+    def _refused(self) -> bool:
+        if not self._closed:
+            return False
+        self._count_drop()
+        logger.warning("audit_logger_closed")
+        return True
 
-    def clear(self) -> None:
-        if self._log_file.exists():
-            self._log_file.write_text("", encoding="utf-8")
-    def get_recent(self, limit: int | None = None) -> list[dict[str, Any]]:
-        resolved_limit = min(limit or self._limit, self._limit)
-        if not self._log_file.exists():
-            return []
-        lines = self._log_file.read_text(encoding="utf-8").splitlines()
-        return [json.loads(line) for line in lines[-resolved_limit:] if line.strip()]
+    def _try_enqueue(self, entry: tuple[str, dict[str, Any]]) -> bool:
+        self._ensure_writer()
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            return False
+        return True
+
+    def _count_drop(self) -> None:
+        self._dropped += 1
+        AUDIT_DROPPED.inc()
+
+    def _remember(self, record: dict[str, Any]) -> None:
+        with self._recent_lock:
+            self._recent.append(record)
+
+    def _ensure_writer(self) -> None:
+        if self._writer is not None:
+            return
+        with self._start_lock:
+            # A closed logger never restarts its writer; a second one would race the first on the same files.
+            if self._writer is None and not self._closed:
+                self._writer = threading.Thread(target=self._run_writer, name="audit-log-writer", daemon=True)
+                self._writer.start()
+
+    def _run_writer(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self._flush_interval_seconds
+            while len(batch) < self._batch_size and not isinstance(batch[-1], _Barrier):
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+
+            entries = [item for item in batch if not isinstance(item, _Barrier)]
+            if entries:
+                try:
+                    self._write_lines(entries)
+                except Exception:
+                    self._write_errors += 1
+                    AUDIT_WRITE_ERRORS.inc()
+                    logger.exception("audit_write_failed", extra={"records": len(entries)})
+
+            stop = False
+            for item in batch:
+                if isinstance(item, _Barrier):
+                    stop = stop or item.stop
+                    item.done.set()
+            if stop:
+                return
+
+    def _write_lines(self, entries: list[tuple[str, dict[str, Any]]]) -> None:
+        started = time.perf_counter()
+        with self._file_lock:
+            self._segments.append(entries, fsync=self._fsync == "batch")
+        AUDIT_WRITE_LATENCY.observe(time.perf_counter() - started)
+        AUDIT_WRITTEN.inc(len(entries))
+        self._written += len(entries)
+        self._batches += 1
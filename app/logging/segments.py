@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+import gzip
+import json
+import logging
+import os
+import re
+import shutil
+import time
+from collections import OrderedDict
+from collections.abc import Iterator
+from dataclasses import asdict, dataclass, field
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import IO, Any
+
+logger = logging.getLogger(__name__)
+
+INDEX_SUFFIX = ".idx.json"
+TAIL_BLOCK_SIZE = 64 * 1024
+# Active files at least this large (or max_bytes, when set) are sealed on startup without being parsed.
+LEGACY_SEAL_BYTES = 64 * 1024 * 1024
+# Sealed request-id indexes kept in memory for find().
+INDEX_CACHE_SEGMENTS = 4
+
+
+def read_tail_lines(path: Path, count: int, block_size: int = TAIL_BLOCK_SIZE) -> list[str]:
+    """Return the last ``count`` non-empty lines of ``path``, reading fixed-size blocks backwards from EOF."""
+    if count <= 0 or not path.exists():
+        return []
+    with path.open("rb") as fh:
+        position = fh.seek(0, os.SEEK_END)
+        buffer = b""
+        while position > 0 and buffer.count(b"\n") <= count:
+            step = min(block_size, position)
+            position -= step
+            fh.seek(position)
+            buffer = fh.read(step) + buffer
+    lines = [line for line in buffer.split(b"\n") if line.strip()]
+    if position > 0:
+        lines = lines[1:]
+    return [line.decode("utf-8") for line in lines[-count:]]
+
+
+def _parse_timestamp(value: str) -> datetime:
+    return _as_utc(datetime.fromisoformat(value))
+
+
+def _as_utc(value: datetime) -> datetime:
+    return value if value.tzinfo is not None else value.replace(tzinfo=timezone.utc)
+
+
+@dataclass
+class SegmentIndex:
+    """Sidecar summary of one audit segment; ``request_ids`` maps each id to its line's byte offset."""
+
+    segment: str
+    records: int = 0
+    min_timestamp: str | None = None
+    max_timestamp: str | None = None
+    model_versions: dict[str, int] = field(default_factory=dict)
+    request_ids: dict[str, int] = field(default_factory=dict)
+
+    def add(self, record: dict[str, Any], offset: int) -> None:
+        self.records += 1
+        timestamp = record.get("timestamp")
+        if timestamp:
+            if self.min_timestamp is None or _parse_timestamp(timestamp) < _parse_timestamp(self.min_timestamp):
+                self.min_timestamp = timestamp
+            if self.max_timestamp is None or _parse_timestamp(timestamp) > _parse_timestamp(self.max_timestamp):
+                self.max_timestamp = timestamp
+        version = str(record.get("model_version"))
+        self.model_versions[version] = self.model_versions.get(version, 0) + 1
+        if record.get("request_id"):
+            self.request_ids[record["request_id"]] = offset
+
+    def overlaps(self, start: datetime | None, end: datetime | None) -> bool:
+        if self.min_timestamp is None or self.max_timestamp is None:
+            return False
+        if start is not None and _parse_timestamp(self.max_timestamp) < start:
+            return False
+        if end is not None and _parse_timestamp(self.min_timestamp) > end:
+            return False
+        return True
+
+    def summary(self) -> dict[str, Any]:
+        return {key: value for key, value in asdict(self).items() if key != "request_ids"}
+
+
+class SegmentedAuditLog:
+    """Append-only JSON-lines log split into sealed, optionally gzipped segments with sidecar indexes.
+
+    The active segment is ``path`` itself; sealed segments are ``<path>.<seq>`` (``.gz`` when
+    compressed) next to ``<path>.<seq>.idx.json``. Callers serialize access.
+
+    The constructor parses the active segment to rebuild its index, so it belongs on a worker
+    thread. An oversized active file (e.g. one written before rotation existed) is sealed as is
+    instead, and sealed segments without a readable index are indexed on the first find/query.
+    """
+
+    def __init__(self, path: Path, max_bytes: int = 0, max_age_seconds: float = 0.0, compress: bool = False) -> None:
+        self._path = path
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        self._max_bytes = max(0, max_bytes)
+        self._max_age_seconds = max(0.0, max_age_seconds)
+        self._compress = compress
+        self._unindexed: set[str] = set()
+        self._loaded_indexes: OrderedDict[str, dict[str, int]] = OrderedDict()
+        self._sealed: list[SegmentIndex] = self._load_sealed()
+        self._active = SegmentIndex(segment=self._path.name)
+        self._active_size = 0
+        self._active_opened_at: float | None = None
+        self._rotations = 0
+        self._scan_active()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def append(self, entries: list[tuple[str, dict[str, Any]]], fsync: bool = False) -> None:
+        if not entries:
+            return
+        if self._should_rotate():
+            self.rotate()
+        with self._path.open("ab") as fh:
+            # Offsets come from the file's real end, not a counter, so another writer cannot skew them.
+            self._active_size = fh.seek(0, os.SEEK_END)
+            for line, record in entries:
+                encoded = line.encode("utf-8")
+                fh.write(encoded)
+                self._active.add(record, self._active_size)
+                self._active_size += len(encoded)
+            if fsync:
+                fh.flush()
+                os.fsync(fh.fileno())
+        if self._active_opened_at is None:
+            self._active_opened_at = time.time()
+
+    def rotate(self) -> None:
+        if self._active_size == 0:
+            return
+        sealed_path = self._path.with_name(f"{self._path.name}.{self._next_sequence():06d}")
+        self._active.segment = f"{sealed_path.name}.gz" if self._compress else sealed_path.name
+        # Index first: a crash before the rename leaves an index without a segment, which is ignored;
+        # one after it leaves a complete segment (still plain if compression had not finished).
+        self._write_index(self._active)
+        os.replace(self._path, sealed_path)
+        if self._compress:
+            partial = Path(f"{sealed_path}.gz.tmp")
+            with sealed_path.open("rb") as source, gzip.open(partial, "wb") as target:
+                shutil.copyfileobj(source, target)
+            os.replace(partial, f"{sealed_path}.gz")
+            sealed_path.unlink()
+        self._sealed.append(SegmentIndex(**{**asdict(self._active), "request_ids": {}}))
+        self._active = SegmentIndex(segment=self._path.name)
+        self._active_size = 0
+        self._active_opened_at = None
+        self._rotations += 1
+
+    def find(self, request_id: str) -> dict[str, Any] | None:
+        """Look ``request_id`` up by index; an offset that no longer holds it triggers a rescan of that segment."""
+        if request_id in self._active.request_ids:
+            record = self._read_at(self._path, self._active.request_ids[request_id], request_id)
+            if record is None:
+                self._rescan_active()
+                offset = self._active.request_ids.get(request_id)
+                record = self._read_at(self._path, offset, request_id) if offset is not None else None
+            if record is not None:
+                return record
+        self._index_pending()
+        for position in reversed(range(len(self._sealed))):
+            segment = self._sealed[position].segment
+            offset = self._request_ids(segment).get(request_id)
+            if offset is None:
+                continue
+            record = self._read_at(self._path.with_name(segment), offset, request_id)
+            if record is None:
+                offset = self._reindex(position).request_ids.get(request_id)
+                record = self._read_at(self._path.with_name(segment), offset, request_id) if offset is not None else None
+            if record is not None:
+                return record
+        return None
+
+    def query(self, start: datetime | None = None, end: datetime | None = None, limit: int | None = None) -> list[dict[str, Any]]:
+        """Records with ``start <= timestamp <= end``, oldest first, reading only overlapping segments."""
+        start = _as_utc(start) if start is not None else None
+        end = _as_utc(end) if end is not None else None
+        self._index_pending()
+        results: list[dict[str, Any]] = []
+        for index in [*self._sealed, self._active]:
+            if not index.overlaps(start, end):
+                continue
+            for record in self._iter_records(self._path.with_name(index.segment)):
+                timestamp = _parse_timestamp(record["timestamp"])
+                if (start is None or timestamp >= start) and (end is None or timestamp <= end):
+                    results.append(record)
+                    if limit is not None and len(results) >= limit:
+                        return results
+        return results
+
+    def segment_paths(self) -> list[Path]:
+        """Segment files oldest first, ending with the active one."""
+        return [*(self._path.with_name(summary.segment) for summary in self._sealed), self._path]
+
+    def tail_segments(self) -> Iterator[Path]:
+        """Segment files newest first, starting with the active one."""
+        yield self._path
+        for summary in reversed(self._sealed):
+            yield self._path.with_name(summary.segment)
+
+    def tail_lines(self, count: int) -> list[str]:
+        """Last ``count`` lines across segments, newest segment first, without reading whole files."""
+        lines: list[str] = []
+        for path in self.tail_segments():
+            needed = count - len(lines)
+            if needed <= 0:
+                break
+            if path.suffix == ".gz":
+                with gzip.open(path, "rb") as fh:
+                    chunk = [raw.decode("utf-8").rstrip("\n") for raw in fh if raw.strip()][-needed:]
+            else:
+                chunk = read_tail_lines(path, needed)
+            lines = chunk + lines
+        return lines
+
+    def clear(self) -> None:
+        for summary in self._sealed:
+            self._path.with_name(summary.segment).unlink(missing_ok=True)
+            self._index_path(summary.segment).unlink(missing_ok=True)
+        self._sealed = []
+        self._unindexed.clear()
+        self._loaded_indexes.clear()
+        self._path.write_bytes(b"")
+        self._active = SegmentIndex(segment=self._path.name)
+        self._active_size = 0
+        self._active_opened_at = None
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "active": {**self._active.summary(), "bytes": self._active_size},
+            "sealed": [summary.summary() for summary in self._sealed],
+            "rotations": self._rotations,
+            "max_bytes": self._max_bytes,
+            "max_age_seconds": self._max_age_seconds,
+            "compress": self._compress,
+        }
+
+    def _should_rotate(self) -> bool:
+        if self._max_bytes and self._active_size >= self._max_bytes:
+            return True
+        if self._max_age_seconds and self._active_opened_at is not None:
+            return time.time() - self._active_opened_at >= self._max_age_seconds
+        return False
+
+    def _scan_active(self) -> None:
+        if not self._path.exists():
+            return
+        if self._path.stat().st_size >= (self._max_bytes or LEGACY_SEAL_BYTES):
+            sealed_path = self._path.with_name(f"{self._path.name}.{self._next_sequence():06d}")
+            os.replace(self._path, sealed_path)
+            self._sealed.append(SegmentIndex(segment=sealed_path.name))
+            self._unindexed.add(sealed_path.name)
+            logger.warning("audit_segment_sealed_unindexed", extra={"segment": str(sealed_path)})
+            return
+        self._active_size = self._scan(self._path, self._active)
+        if self._active.min_timestamp is not None:
+            self._active_opened_at = _parse_timestamp(self._active.min_timestamp).timestamp()
+
+    def _scan(self, path: Path, index: SegmentIndex) -> int:
+        """Add every record of ``path`` to ``index``; returns the bytes read."""
+        size = 0
+        with self._open(path) as fh:
+            for raw in fh:
+                if raw.strip():
+                    try:
+                        index.add(json.loads(raw), size)
+                    except json.JSONDecodeError:
+                        logger.warning("audit_line_unreadable", extra={"log_file": str(path)})
+                size += len(raw)
+        return size
+
+    def _load_sealed(self) -> list[SegmentIndex]:
+        """Sealed segments oldest first, discovered from the segment files rather than their indexes."""
+        files: dict[int, Path] = {}
+        for path in self._path.parent.glob(f"{self._path.name}.*"):
+            sequence = self._sequence(path.name)
+            if not sequence:
+                continue
+            existing = files.get(sequence)
+            if existing is not None:
+                # Compression completed but the plain copy was not removed yet.
+                plain, path = (existing, path) if path.suffix == ".gz" else (path, existing)
+                plain.unlink(missing_ok=True)
+            files[sequence] = path
+
+        summaries = []
+        for _, path in sorted(files.items()):
+            try:
+                payload = json.loads(self._index_path(path.name).read_text(encoding="utf-8"))
+                summaries.append(SegmentIndex(**{**payload, "segment": path.name, "request_ids": {}}))
+            except (OSError, json.JSONDecodeError, TypeError):
+                logger.warning("audit_index_unreadable", extra={"segment": str(path)})
+                summaries.append(SegmentIndex(segment=path.name))
+                self._unindexed.add(path.name)
+        return summaries
+
+    def _index_pending(self) -> None:
+        """Index segments sealed without a usable index; runs once per such segment."""
+        if not self._unindexed:
+            return
+        for position, summary in enumerate(self._sealed):
+            if summary.segment in self._unindexed:
+                self._reindex(position)
+
+    def _reindex(self, position: int) -> SegmentIndex:
+        """Rebuild a sealed segment's index from its file and persist it."""
+        segment = self._sealed[position].segment
+        index = SegmentIndex(segment=segment)
+        self._scan(self._path.with_name(segment), index)
+        self._write_index(index)
+        self._sealed[position] = SegmentIndex(**{**asdict(index), "request_ids": {}})
+        self._loaded_indexes.pop(segment, None)
+        self._unindexed.discard(segment)
+        return index
+
+    def _rescan_active(self) -> None:
+        self._active = SegmentIndex(segment=self._path.name)
+        self._active_size = self._scan(self._path, self._active) if self._path.exists() else 0
+
+    def _request_ids(self, segment: str) -> dict[str, int]:
+        request_ids = self._loaded_indexes.get(segment)
+        if request_ids is None:
+            request_ids = self._load_index(segment).request_ids
+            self._loaded_indexes[segment] = request_ids
+            while len(self._loaded_indexes) > INDEX_CACHE_SEGMENTS:
+                self._loaded_indexes.popitem(last=False)
+        else:
+            self._loaded_indexes.move_to_end(segment)
+        return request_ids
+
+    def _load_index(self, segment: str) -> SegmentIndex:
+        return SegmentIndex(**json.loads(self._index_path(segment).read_text(encoding="utf-8")))
+
+    def _write_index(self, index: SegmentIndex) -> None:
+        index_path = self._index_path(index.segment)
+        tmp_path = index_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(asdict(index)), encoding="utf-8")
+        os.replace(tmp_path, index_path)
+
+    def _next_sequence(self) -> int:
+        return (self._sequence(self._sealed[-1].segment) if self._sealed else 0) + 1
+
+    def _index_path(self, segment: str) -> Path:
+        return self._path.with_name(f"{self._path.name}.{self._sequence(segment):06d}{INDEX_SUFFIX}")
+
+    def _sequence(self, segment: str) -> int:
+        match = re.fullmatch(re.escape(self._path.name) + r"\.(\d+)(\.gz)?", segment)
+        return int(match.group(1)) if match else 0
+
+    @staticmethod
+    def _open(path: Path) -> IO[bytes]:
+        return gzip.open(path, "rb") if path.suffix == ".gz" else path.open("rb")
+
+    def _read_at(self, path: Path, offset: int, request_id: str) -> dict[str, Any] | None:
+        """The record at ``offset`` if it is ``request_id``'s; None when the index no longer matches the file."""
+        try:
+            with self._open(path) as fh:
+                fh.seek(offset)
+                record = json.loads(fh.readline())
+        except (OSError, EOFError, ValueError):
+            return None
+        return record if isinstance(record, dict) and record.get("request_id") == request_id else None
+
+    def _iter_records(self, path: Path) -> Iterator[dict[str, Any]]:
+        if not path.exists():
+            return
+        with self._open(path) as fh:
+            for raw in fh:
+                if raw.strip():
+                    yield json.loads(raw)
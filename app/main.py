@@ -1,27 +1,51 @@
+import asyncio
 import logging
-import uuid
+from contextlib import asynccontextmanager
 
 from fastapi import FastAPI, HTTPException, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.responses import JSONResponse
 
-from app.api.middleware import RateLimitMiddleware
+from app.api.dependencies import get_audit_logger, get_market_data_client, get_stage_tracker
+from app.api.middleware import RateLimit, RateLimitMiddleware, RequestContextMiddleware
 from app.api.routes.admin import router as admin_router
 from app.api.routes.features import router as features_router
 from app.api.routes.health import router as health_router
+from app.api.routes.metrics import router as metrics_router
 from app.api.routes.models import router as models_router
 from app.api.routes.monitoring import router as monitoring_router
 from app.api.routes.predict import router as predict_router
 from app.core.config import get_settings
-from app.core.logging import configure_logging
+from app.core.logging import configure_logging, shutdown_logging, start_logging
 from app.exceptions import ServiceError
+from app.monitoring.prometheus import SERVICE_ERRORS
 from app.schemas.api import ApiErrorResponse
 
 settings = get_settings()
-configure_logging(settings.resolved_log_level)
+configure_logging(
+    settings.resolved_log_level,
+    async_logging=settings.log_async,
+    queue_size=settings.log_queue_size,
+    event_rate_limit=settings.log_event_rate_limit,
+)
 logger = logging.getLogger(__name__)
 
-app = FastAPI(title=settings.app_name)
+
+@asynccontextmanager
+async def lifespan(_: FastAPI):
+    start_logging()
+    await get_market_data_client().start()
+    # Opening the audit log rebuilds the active segment's index; do it now, off the event loop.
+    await asyncio.to_thread(get_audit_logger)
+    try:
+        yield
+    finally:
+        await get_market_data_client().aclose()
+        await asyncio.to_thread(get_audit_logger().close)
+        shutdown_logging()
+
+
+app = FastAPI(title=settings.app_name, lifespan=lifespan)
 app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.resolved_cors_allow_origins,
@@ -30,21 +54,14 @@ app.add_middleware(
 )
 app.add_middleware(
     RateLimitMiddleware,
-    max_requests=settings.rate_limit_requests,
-    window_seconds=settings.rate_limit_window_seconds,
+    limits={route: RateLimit(*limit) for route, limit in settings.resolved_rate_limits.items()},
+    api_prefix=settings.api_prefix,
+    max_keys=settings.rate_limit_max_keys,
 )
-
-
-@app.middleware("http")
-async def request_context_middleware(request: Request, call_next):
-    request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
-    request.state.request_id = request_id
-    response = await call_next(request)
-    response.headers["X-Request-ID"] = request_id
-    return response
-
+app.add_middleware(RequestContextMiddleware, stage_tracker=get_stage_tracker if settings.stage_timing_enabled else None)
 
 app.include_router(health_router)
+app.include_router(metrics_router)
 app.include_router(features_router)
 app.include_router(features_router, prefix=settings.api_prefix)
 app.include_router(predict_router)
@@ -59,6 +76,7 @@ app.include_router(admin_router, prefix=settings.api_prefix)
 
 @app.exception_handler(ServiceError)
 async def service_error_handler(request: Request, exc: ServiceError) -> JSONResponse:
+    SERVICE_ERRORS.labels(exc.error).inc()
     logger.error(
         "service_error",
         extra={"error": exc.error, "details": exc.details, "status": exc.status_code, "request_id": request.state.request_id},
@@ -2,6 +2,7 @@
 
 from app.ml.dataset_builder import DatasetBuildResult, DatasetBuilder
 from app.ml.inference import InferenceEngine
+from app.ml.model_cache import ModelCache
 from app.ml.registry import ModelRegistry
 from app.ml.trainer import TrainingConfig, Trainer
 
@@ -9,6 +10,7 @@ __all__ = [
     "DatasetBuildResult",
     "DatasetBuilder",
     "InferenceEngine",
+    "ModelCache",
     "ModelRegistry",
     "TrainingConfig",
     "Trainer",
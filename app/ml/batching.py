@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import asyncio
+import contextvars
+import time
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass
+from typing import Any, Generic, TypeVar
+
+from app.exceptions import ServiceError
+from app.monitoring.timing import StageTimings, begin_request, current_timings
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+@dataclass
+class _Pending(Generic[T]):
+    item: T
+    future: asyncio.Future
+    enqueued_at: float
+    timings: StageTimings | None = None
+
+
+class MicroBatcher(Generic[T, R]):
+    """Collects concurrent submissions for up to ``window_ms`` (or ``max_batch_size`` items) and
+    evaluates them with one ``handler`` call.
+
+    The handler returns one result per item, in order; a BaseException in that list is raised to
+    the corresponding caller only. Stage timings recorded while the batch runs are added to every
+    caller's own timings.
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[list[T]], Awaitable[Sequence[R | BaseException]]],
+        window_ms: float,
+        max_batch_size: int,
+    ) -> None:
+        self._handler = handler
+        self._window_seconds = max(0.0, window_ms) / 1000
+        self._max_batch_size = max(1, max_batch_size)
+        self._pending: list[_Pending[T]] = []
+        self._timer: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task] = set()
+        self._batches = 0
+        self._items = 0
+        self._largest_batch = 0
+        self._size_triggered = 0
+        self._queue_wait_total_ms = 0.0
+        self._queue_wait_max_ms = 0.0
+
+    async def submit(self, item: T) -> R:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append(_Pending(item=item, future=future, enqueued_at=time.perf_counter(), timings=current_timings()))
+        if len(self._pending) >= self._max_batch_size:
+            self._size_triggered += 1
+            self._flush()
+        elif self._timer is None:
+            self._timer = loop.call_later(self._window_seconds, self._flush)
+        return await future
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "window_ms": self._window_seconds * 1000,
+            "max_batch_size": self._max_batch_size,
+            "queued": len(self._pending),
+            "in_flight_batches": len(self._running),
+            "batches": self._batches,
+            "requests": self._items,
+            "avg_batch_size": self._items / self._batches if self._batches else 0.0,
+            "largest_batch": self._largest_batch,
+            "size_triggered_flushes": self._size_triggered,
+            "avg_queue_wait_ms": self._queue_wait_total_ms / self._items if self._items else 0.0,
+            "max_queue_wait_ms": self._queue_wait_max_ms,
+        }
+
+    def _flush(self) -> None:
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        batch = [pending for pending in batch if not pending.future.done()]
+        if not batch:
+            return
+        # A fresh context keeps the shared batch from being attributed to whichever caller flushed it;
+        # _run merges its stage timings into every caller instead.
+        task = asyncio.get_running_loop().create_task(self._run(batch), context=contextvars.Context())
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+        task.add_done_callback(lambda done: self._fail_unresolved(batch, done))
+
+    @staticmethod
+    def _fail_unresolved(batch: list[_Pending[T]], task: asyncio.Task) -> None:
+        """Fail callers whose futures the batch task left unresolved (it was cancelled or crashed)."""
+        error = None if task.cancelled() else task.exception()
+        for pending in batch:
+            if not pending.future.done():
+                pending.future.set_exception(
+                    error or ServiceError(error="batch_cancelled", details="Micro-batch stopped before completing", status_code=503)
+                )
+
+    async def _run(self, batch: list[_Pending[T]]) -> None:
+        dispatched_at = time.perf_counter()
+        for pending in batch:
+            waited_ms = (dispatched_at - pending.enqueued_at) * 1000
+            self._queue_wait_total_ms += waited_ms
+            self._queue_wait_max_ms = max(self._queue_wait_max_ms, waited_ms)
+        self._batches += 1
+        self._items += len(batch)
+        self._largest_batch = max(self._largest_batch, len(batch))
+        timings = begin_request()[0] if any(pending.timings is not None for pending in batch) else None
+
+        try:
+            results: Sequence[R | BaseException] = await self._handler([pending.item for pending in batch])
+        except Exception as exc:
+            results = [exc] * len(batch)
+
+        for pending, result in zip(batch, results):
+            if timings is not None and pending.timings is not None:
+                pending.timings.merge(timings)
+            if pending.future.done():
+                continue
+            if isinstance(result, BaseException):
+                pending.future.set_exception(result)
+            else:
+                pending.future.set_result(result)
@@ -5,10 +5,8 @@ from typing import Iterable
 
 import pandas as pd
 
-from app.schemas.features import FeaturesResponse
-from app.services.feature_service import FeatureService
-
-FEATURE_COLUMNS = ["close", "simple_return", "moving_average", "rolling_volatility", "return_5d", "zscore_20", "drawdown", "fund_pe_ratio", "fund_pb_ratio", "fund_market_cap"]
+from app.features.engineering import FEATURE_COLUMNS
+from app.services.feature_service import FeatureService, FeatureSet
 
 
 @dataclass
@@ -25,15 +23,15 @@ class DatasetBuilder:
         frames: list[pd.DataFrame] = []
 
         for symbol in symbols:
-            response: FeaturesResponse = await self._feature_service.build_features(
+            feature_set: FeatureSet = await self._feature_service.build_feature_set(
                 symbol=symbol.upper(), lookback=lookback
             )
-            frame = pd.DataFrame([item.model_dump() for item in response.features])
+            frame = feature_set.frame.copy()
             if frame.empty:
                 continue
 
             frame = frame.sort_values("timestamp", kind="mergesort").reset_index(drop=True)
-            frame["symbol"] = response.symbol
+            frame["symbol"] = feature_set.symbol
             frame["target_next_return"] = frame["simple_return"].shift(-1)
             frame = frame.dropna(subset=["target_next_return"]).reset_index(drop=True)
             frames.append(frame)
@@ -1,20 +1,38 @@
 from __future__ import annotations
 
+import asyncio
 import time
+from dataclasses import dataclass
 from datetime import datetime, timezone
+from typing import Any
 
 import numpy as np
 
-from app.exceptions import DataValidationError
+from app.core.concurrency import gather_or_cancel
+from app.exceptions import DataValidationError, ServiceError
 from app.logging.audit import PredictionAuditLogger
+from app.ml.batching import MicroBatcher
 from app.ml.dataset_builder import FEATURE_COLUMNS
+from app.ml.model_cache import ModelCache
 from app.ml.registry import ModelRegistry
 from app.monitoring.drift import DriftDetector
 from app.monitoring.freshness import FreshnessTracker
 from app.monitoring.metrics import LatencyTracker
+from app.monitoring.prometheus import INFERENCE_LATENCY, PREDICTIONS
+from app.monitoring.timing import stage, timed
 from app.services.feature_service import FeatureService
 
 
+@dataclass(frozen=True)
+class InferenceRequest:
+    symbol: str
+    exchange: str
+    lookback: int | None
+    version: str | None
+    started_at: float
+    endpoint: str = "predict"
+
+
 class InferenceEngine:
     def __init__(
         self,
@@ -25,6 +43,10 @@ class InferenceEngine:
         latency_tracker: LatencyTracker,
         freshness_tracker: FreshnessTracker,
         drift_detector: DriftDetector,
+        model_cache: ModelCache | None = None,
+        batch_concurrency: int = 16,
+        batch_window_ms: float = 0.0,
+        batch_max_size: int = 64,
     ) -> None:
         self._feature_service = feature_service
         self._registry = registry
@@ -33,49 +55,222 @@ class InferenceEngine:
         self._latency_tracker = latency_tracker
         self._freshness_tracker = freshness_tracker
         self._drift_detector = drift_detector
+        self._model_cache = model_cache or ModelCache(registry=registry)
+        self._batch_concurrency = max(1, batch_concurrency)
+        self._deduplicated_lookups = 0
+        self._endpoint_metrics = {
+            endpoint: (PREDICTIONS.labels(endpoint), INFERENCE_LATENCY.labels(endpoint)) for endpoint in ("predict", "predict_batch")
+        }
+        self._batcher: MicroBatcher[InferenceRequest, dict] | None = None
+        if batch_window_ms > 0:
+            self._batcher = MicroBatcher(self._evaluate, window_ms=batch_window_ms, max_batch_size=batch_max_size)
 
     async def predict(self, symbol: str, exchange: str = "NASDAQ", lookback: int | None = None, version: str | None = None) -> dict:
         start = time.perf_counter()
-        model, metadata = self._registry.load_model(version=version)
+        if self._batcher is not None:
+            with stage("batch"):
+                return await self._batcher.submit(InferenceRequest(symbol, exchange, lookback, version, start))
+        with stage("model_load"):
+            model, metadata = self._model_cache.get(version=version)
 
-        market_status = await self._feature_service._market_data_client.get_market_status(exchange=exchange)
-        if not market_status.is_open:
-            raise DataValidationError(error="EXCHANGE_UNAVAILABLE", details="Market is closed", status_code=503)
+        market_data_client = self._feature_service._market_data_client
+        market_status, quote, feature_set = await gather_or_cancel(
+            timed("market_status", market_data_client.get_market_status(exchange=exchange)),
+            timed("quote", market_data_client.get_quote(symbol=symbol, exchange=exchange)),
+            self._feature_service.build_latest_features(
+                symbol=symbol,
+                lookback=lookback or self._default_lookback,
+                exchange=exchange,
+            ),
+        )
+        self._ensure_market_open(market_status)
+        self._ensure_fresh(quote, feature_set)
 
-        quote = await self._feature_service._market_data_client.get_quote(symbol=symbol, exchange=exchange)
-        features_response = await self._feature_service.build_features(
+        feature_dict = feature_set.latest()
+        x = np.array([[feature_dict[col] for col in FEATURE_COLUMNS]])
+        with stage("predict"):
+            raw = float(model.predict(x)[0])
+        return await self._finalize(
             symbol=symbol,
-            lookback=lookback or self._default_lookback,
             exchange=exchange,
+            raw=raw,
+            feature_dict=feature_dict,
+            degraded_input=feature_set.degraded_input,
+            metadata=metadata,
+            start=start,
         )
 
+    async def predict_batch(
+        self,
+        symbols: list[str],
+        exchange: str = "NASDAQ",
+        lookback: int | None = None,
+        version: str | None = None,
+    ) -> list[dict]:
+        start = time.perf_counter()
+        try:
+            with stage("market_status"):
+                market_status = await self._feature_service._market_data_client.get_market_status(exchange=exchange)
+            self._ensure_market_open(market_status)
+        except Exception as exc:
+            return [{"symbol": symbol, "error": self._error_message(exc)} for symbol in symbols]
+
+        requests = [InferenceRequest(symbol, exchange, lookback, version, start, endpoint="predict_batch") for symbol in symbols]
+        results = await self._evaluate(requests, market_statuses={exchange: market_status})
+        return [
+            result if isinstance(result, dict) else {"symbol": request.symbol, "error": self._error_message(result)}
+            for request, result in zip(requests, results)
+        ]
+
+    def batching_stats(self) -> dict[str, Any]:
+        stats: dict[str, Any] = {"enabled": self._batcher is not None, "deduplicated_lookups": self._deduplicated_lookups}
+        if self._batcher is not None:
+            stats.update(self._batcher.snapshot())
+        return stats
+
+    async def _evaluate(
+        self,
+        requests: list[InferenceRequest],
+        market_statuses: dict[str, Any] | None = None,
+    ) -> list[dict | BaseException]:
+        """Score a group of requests: one upstream lookup per distinct input and one model.predict per version."""
+        market_data_client = self._feature_service._market_data_client
+        semaphore = asyncio.Semaphore(self._batch_concurrency)
+
+        async def market_status(exchange: str):
+            if market_statuses is not None and exchange in market_statuses:
+                return market_statuses[exchange]
+            with stage("market_status"):
+                return await market_data_client.get_market_status(exchange=exchange)
+
+        async def load(symbol: str, exchange: str, lookback: int):
+            async with semaphore:
+                quote, feature_set = await gather_or_cancel(
+                    timed("quote", market_data_client.get_quote(symbol=symbol, exchange=exchange)),
+                    self._feature_service.build_latest_features(symbol=symbol, lookback=lookback, exchange=exchange),
+                )
+            self._ensure_fresh(quote, feature_set)
+            return feature_set
+
+        models: dict[str | None, Any] = {}
+        for version in dict.fromkeys(request.version for request in requests):
+            try:
+                with stage("model_load"):
+                    models[version] = self._model_cache.get(version=version)
+            except Exception as exc:
+                models[version] = exc
+
+        exchanges = list(dict.fromkeys(request.exchange for request in requests))
+        input_keys = list(dict.fromkeys(self._input_key(request) for request in requests))
+        self._deduplicated_lookups += len(requests) - len(input_keys)
+        statuses, inputs = await asyncio.gather(
+            asyncio.gather(*(market_status(exchange) for exchange in exchanges), return_exceptions=True),
+            asyncio.gather(*(load(*key) for key in input_keys), return_exceptions=True),
+        )
+        status_by_exchange = dict(zip(exchanges, statuses))
+        input_by_key = dict(zip(input_keys, inputs))
+
+        results: list[dict | BaseException | None] = []
+        ready: dict[str | None, list[int]] = {}
+        for idx, request in enumerate(requests):
+            try:
+                model_entry, status, feature_set = (
+                    models[request.version],
+                    status_by_exchange[request.exchange],
+                    input_by_key[self._input_key(request)],
+                )
+                for dependency in (model_entry, status):
+                    if isinstance(dependency, BaseException):
+                        raise dependency
+                self._ensure_market_open(status)
+                if isinstance(feature_set, BaseException):
+                    raise feature_set
+            except Exception as exc:
+                results.append(exc)
+                continue
+            results.append(None)
+            ready.setdefault(request.version, []).append(idx)
+
+        for version, indices in ready.items():
+            model, metadata = models[version]
+            feature_sets = [input_by_key[self._input_key(requests[idx])] for idx in indices]
+            vectors = [feature_set.latest() for feature_set in feature_sets]
+            x = np.array([[vector[col] for col in FEATURE_COLUMNS] for vector in vectors], dtype=float)
+            with stage("predict"):
+                raw_predictions = model.predict(x)
+            for idx, feature_set, vector, raw in zip(indices, feature_sets, vectors, raw_predictions):
+                results[idx] = await self._finalize(
+                    symbol=requests[idx].symbol,
+                    exchange=requests[idx].exchange,
+                    raw=float(raw),
+                    feature_dict=vector,
+                    degraded_input=feature_set.degraded_input,
+                    metadata=metadata,
+                    start=requests[idx].started_at,
+                    endpoint=requests[idx].endpoint,
+                )
+        return results
+
+    def _input_key(self, request: InferenceRequest) -> tuple[str, str, int]:
+        return request.symbol, request.exchange, request.lookback or self._default_lookback
+
+    @staticmethod
+    def _ensure_market_open(market_status) -> None:
+        if not market_status.is_open:
+            raise DataValidationError(error="EXCHANGE_UNAVAILABLE", details="Market is closed", status_code=503)
+
+    @staticmethod
+    def _ensure_fresh(quote, feature_set) -> None:
         now = datetime.now(timezone.utc)
         if (now - quote.timestamp).total_seconds() > 90:
             raise DataValidationError(error="stale_quote", details="Quote timestamp too old", status_code=422)
-        if (now - features_response.upstream_latest_timestamp).total_seconds() > 600:
+        if (now - feature_set.upstream_latest_timestamp).total_seconds() > 600:
             raise DataValidationError(error="stale_candle", details="Candle timestamp too old", status_code=422)
 
-        latest = features_response.features[-1]
-        feature_dict = {col: float(getattr(latest, col)) for col in FEATURE_COLUMNS}
-        x = np.array([[feature_dict[col] for col in FEATURE_COLUMNS]])
-        raw = float(model.predict(x)[0])
+    @staticmethod
+    def _error_message(exc: BaseException) -> str:
+        if isinstance(exc, ServiceError):
+            return exc.error
+        return str(exc) or exc.__class__.__name__
 
+    async def _finalize(
+        self,
+        *,
+        symbol: str,
+        exchange: str,
+        raw: float,
+        feature_dict: dict[str, float],
+        degraded_input: bool,
+        metadata: dict,
+        start: float,
+        endpoint: str = "predict",
+    ) -> dict:
         probability_up = max(0.0, min(1.0, 0.5 + raw / 2.0))
         probability_down = 1.0 - probability_up
         prediction = "BUY" if probability_up > 0.55 else "SELL" if probability_up < 0.45 else "HOLD"
         confidence = abs(probability_up - 0.5) * 2
-        degraded_input = features_response.degraded_input
         if degraded_input:
             confidence *= 0.7
 
-        risk_score = float(min(1.0, max(0.0, latest.rolling_volatility * 10)))
-        expected_return = float(latest.return_5d / 5.0)
+        risk_score = float(min(1.0, max(0.0, feature_dict["rolling_volatility"] * 10)))
+        expected_return = float(feature_dict["return_5d"] / 5.0)
 
         latency_ms = (time.perf_counter() - start) * 1000
-        self._latency_tracker.record(latency_ms)
+        self._latency_tracker.record(latency_ms, endpoint=endpoint, model_version=metadata["version"])
+        predictions, latency_histogram = self._endpoint_metrics[endpoint]
+        predictions.inc()
+        latency_histogram.observe(latency_ms / 1000)
         self._drift_detector.record(feature_dict)
         self._freshness_tracker.record_upstream_seen()
-        audit_record = self._audit_logger.log_prediction(model_version=metadata["version"], features=feature_dict, prediction=probability_up, latency_ms=latency_ms)
+        with stage("audit"):
+            audit_record = await self._audit_logger.log_prediction_async(
+                model_version=metadata["version"],
+                features=feature_dict,
+                prediction=probability_up,
+                latency_ms=latency_ms,
+                symbol=symbol,
+                exchange=exchange,
+            )
         self._freshness_tracker.record_prediction(audit_record["timestamp"])
 
         return {
@@ -92,6 +287,6 @@ class InferenceEngine:
             "degraded_input": degraded_input,
             "input_data_status": "degraded" if degraded_input else "healthy",
             "inference_latency_ms": latency_ms,
-            "timestamp": datetime.now(timezone.utc).isoformat(),
+            "timestamp": datetime.now(timezone.utc),
             "request_id": audit_record["request_id"],
         }
@@ -0,0 +1,85 @@
+from __future__ import annotations
+
+import threading
+from collections import OrderedDict
+from typing import Any
+
+from app.ml.registry import ModelRegistry
+
+
+class ModelCache:
+    """Keeps unpickled models and their metadata in memory, keyed by resolved version."""
+
+    def __init__(self, registry: ModelRegistry, max_entries: int = 4) -> None:
+        self._registry = registry
+        self._max_entries = max(1, max_entries)
+        self._entries: OrderedDict[str, tuple[Any, dict[str, Any]]] = OrderedDict()
+        self._active_version: str | None = None
+        self._lock = threading.Lock()
+        self._loading: dict[str, threading.Lock] = {}
+        self._hits = 0
+        self._misses = 0
+
+    def get(self, version: str | None = None) -> tuple[Any, dict[str, Any]]:
+        resolved = version or self._resolve_active_version()
+        if not resolved:
+            raise FileNotFoundError("No active model version is registered")
+
+        with self._lock:
+            entry = self._hit(resolved)
+            if entry is not None:
+                return entry
+            loading = self._loading.setdefault(resolved, threading.Lock())
+
+        # Single flight: concurrent misses for one version wait for the first load instead of repeating it.
+        with loading:
+            with self._lock:
+                entry = self._hit(resolved)
+                if entry is not None:
+                    return entry
+                self._misses += 1
+            try:
+                entry = self._registry.load_model(version=resolved)
+                with self._lock:
+                    self._entries[resolved] = entry
+                    self._entries.move_to_end(resolved)
+                    while len(self._entries) > self._max_entries:
+                        self._entries.popitem(last=False)
+            finally:
+                with self._lock:
+                    self._loading.pop(resolved, None)
+        return entry
+
+    def invalidate(self, version: str | None = None) -> None:
+        with self._lock:
+            if version is None:
+                self._entries.clear()
+                self._active_version = None
+            else:
+                self._entries.pop(version, None)
+
+    def snapshot(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "active_version": self._active_version,
+                "cached_versions": list(self._entries.keys()),
+                "max_entries": self._max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+            }
+
+    def _hit(self, version: str) -> tuple[Any, dict[str, Any]] | None:
+        entry = self._entries.get(version)
+        if entry is not None:
+            self._entries.move_to_end(version)
+            self._hits += 1
+        return entry
+
+    def _resolve_active_version(self) -> str | None:
+        active = self._registry.get_active_version()
+        with self._lock:
+            previous = self._active_version
+            if previous is not None and previous != active:
+                self._entries.pop(previous, None)
+            self._active_version = active
+        return active
@@ -10,6 +10,7 @@ import numpy as np
 from app.ml.dataset_builder import DatasetBuilder, FEATURE_COLUMNS
 from app.ml.modeling import LinearRegressor
 from app.ml.registry import ModelRegistry
+from app.monitoring.drift import quantile_histogram
 
 
 @dataclass
@@ -86,6 +87,7 @@ class Trainer:
         feature_stats = {
             col: {"mean": float(dataset[col].mean()), "std": float(dataset[col].std(ddof=0))} for col in FEATURE_COLUMNS
         }
+        feature_histograms = {col: quantile_histogram(dataset[col].to_numpy()) for col in FEATURE_COLUMNS}
         feature_schema_hash = hashlib.sha256(json.dumps(FEATURE_COLUMNS).encode("utf-8")).hexdigest()
         metadata = {
             "version": resolved_version,
@@ -100,6 +102,7 @@ class Trainer:
             "validation_metrics": metrics,
             "dataset_window": build_result.summary,
             "training_feature_stats": feature_stats,
+            "training_feature_histograms": feature_histograms,
             "model_version": resolved_version,
             "feature_schema_hash": feature_schema_hash,
             "forecast_horizon": config.forecast_horizon,
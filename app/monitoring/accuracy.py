@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import pandas as pd
+
+from app.clients.market_data import MarketDataClient
+from app.logging.audit import PredictionAuditLogger
+
+logger = logging.getLogger(__name__)
+
+AUDIT_COLUMNS = ["timestamp", "model_version", "prediction", "symbol", "exchange"]
+CALIBRATION_BINS = np.linspace(0.0, 1.0, 11)
+
+
+def realized_next_returns(prediction_ns: np.ndarray, candle_ns: np.ndarray, closes: np.ndarray) -> np.ndarray:
+    """Return of the candle after the last one at or before each prediction time; NaN when not yet known."""
+    position = np.searchsorted(candle_ns, prediction_ns, side="right") - 1
+    resolved = (position >= 0) & (position + 1 < len(closes))
+    realized = np.full(len(prediction_ns), np.nan)
+    realized[resolved] = closes[position[resolved] + 1] / closes[position[resolved]] - 1.0
+    return realized
+
+
+def summarize_accuracy(frame: pd.DataFrame) -> dict[str, Any]:
+    """Hit rate, RMSE and calibration per model version and per (version, UTC day).
+
+    ``frame`` needs ``timestamp`` (datetime64[ns, UTC]), ``model_version``, ``prediction``
+    (probability_up) and ``realized_return``; rows without a realized return are unresolved.
+    """
+    resolved = frame[frame["realized_return"].notna()]
+    probability_up = resolved["prediction"].to_numpy(dtype=float)
+    realized = resolved["realized_return"].to_numpy(dtype=float)
+    went_up = realized > 0
+    columns = pd.DataFrame(
+        {
+            "model_version": resolved["model_version"].astype(str).to_numpy(),
+            "day": resolved["timestamp"].to_numpy(dtype="datetime64[ns]").astype("datetime64[D]"),
+            "probability_up": probability_up,
+            "went_up": went_up.astype(float),
+            "hit": ((probability_up > 0.5) == went_up).astype(float),
+            # InferenceEngine maps the model's predicted return r to probability_up = 0.5 + r / 2.
+            "squared_error": ((probability_up - 0.5) * 2.0 - realized) ** 2,
+            "brier": (probability_up - went_up) ** 2,
+            "calibration_bin": np.clip(np.digitize(probability_up, CALIBRATION_BINS) - 1, 0, len(CALIBRATION_BINS) - 2),
+        }
+    )
+
+    def aggregate(keys: list[str]) -> pd.DataFrame:
+        grouped = columns.groupby(keys, sort=True).agg(
+            predictions=("hit", "size"),
+            hit_rate=("hit", "mean"),
+            mse=("squared_error", "mean"),
+            brier_score=("brier", "mean"),
+            mean_probability_up=("probability_up", "mean"),
+            realized_up_rate=("went_up", "mean"),
+        )
+        grouped["rmse"] = np.sqrt(grouped.pop("mse"))
+        return grouped.reset_index()
+
+    by_version = aggregate(["model_version"]).to_dict(orient="records")
+    calibration = aggregate(["model_version", "calibration_bin"])
+    for item in by_version:
+        bins = calibration[calibration["model_version"] == item["model_version"]]
+        item["calibration"] = [
+            {
+                "bin_lower": float(CALIBRATION_BINS[row.calibration_bin]),
+                "bin_upper": float(CALIBRATION_BINS[row.calibration_bin + 1]),
+                "predictions": int(row.predictions),
+                "mean_probability_up": float(row.mean_probability_up),
+                "realized_up_rate": float(row.realized_up_rate),
+            }
+            for row in bins.itertuples()
+        ]
+
+    by_day = aggregate(["model_version", "day"])
+    by_day["day"] = by_day["day"].dt.strftime("%Y-%m-%d")
+    return {
+        "predictions": int(len(frame)),
+        "resolved": int(len(resolved)),
+        "by_version": by_version,
+        "by_day": by_day.to_dict(orient="records"),
+    }
+
+
+class LiveAccuracyJob:
+    """Joins audited predictions with realized next-candle returns and persists the summary.
+
+    At most ``concurrency`` upstream candle fetches run at once, however many symbols the audit log holds.
+    """
+
+    def __init__(
+        self,
+        audit_logger: PredictionAuditLogger,
+        market_data_client: MarketDataClient,
+        output_file: str,
+        concurrency: int = 8,
+    ) -> None:
+        self._audit_logger = audit_logger
+        self._market_data_client = market_data_client
+        self._output_file = Path(output_file)
+        self._concurrency = max(1, concurrency)
+
+    async def run(self) -> dict[str, Any]:
+        frame = await asyncio.to_thread(self._audit_logger.read_frame, AUDIT_COLUMNS)
+        frame = frame.dropna(subset=["timestamp", "symbol", "prediction"]).reset_index(drop=True)
+        frame["exchange"] = frame["exchange"].fillna("NASDAQ")
+        frame["timestamp"] = pd.to_datetime(frame["timestamp"], utc=True, format="ISO8601")
+
+        groups = frame.groupby(["symbol", "exchange"], sort=False).indices if len(frame) else {}
+        semaphore = asyncio.Semaphore(self._concurrency)
+        series = await asyncio.gather(
+            *(
+                self._candles(symbol, exchange, frame["timestamp"].iloc[idx].min(), semaphore)
+                for (symbol, exchange), idx in groups.items()
+            )
+        )
+        payload = await asyncio.to_thread(self._compute, frame, groups, series)
+        await asyncio.to_thread(self._persist, payload)
+        return payload
+
+    def load(self) -> dict[str, Any] | None:
+        if not self._output_file.exists():
+            return None
+        return json.loads(self._output_file.read_text(encoding="utf-8"))
+
+    @staticmethod
+    def _compute(
+        frame: pd.DataFrame,
+        groups: dict[tuple[str, str], np.ndarray],
+        series: list[tuple[np.ndarray, np.ndarray] | None],
+    ) -> dict[str, Any]:
+        prediction_ns = frame["timestamp"].to_numpy(dtype="datetime64[ns]").view("int64")
+        realized = np.full(len(frame), np.nan)
+        for idx, candles in zip(groups.values(), series):
+            if candles is not None:
+                realized[idx] = realized_next_returns(prediction_ns[idx], *candles)
+        frame = frame.assign(realized_return=realized)
+        return {"computed_at": datetime.now(timezone.utc).isoformat(), **summarize_accuracy(frame)}
+
+    async def _candles(
+        self, symbol: str, exchange: str, since: pd.Timestamp, semaphore: asyncio.Semaphore
+    ) -> tuple[np.ndarray, np.ndarray] | None:
+        response = self._market_data_client.cached_candles(symbol=symbol, exchange=exchange)
+        if response is None or not response.candles or response.candles[0].timestamp > since:
+            try:
+                async with semaphore:
+                    response = await self._market_data_client.get_historical(
+                        symbol=symbol,
+                        exchange=exchange,
+                        start=since.to_pydatetime() - timedelta(days=7),
+                        end=datetime.now(timezone.utc),
+                        interval="1d",
+                    )
+            except Exception:
+                logger.warning("live_accuracy_candles_unavailable", extra={"symbol": symbol, "exchange": exchange})
+                return None
+        candle_ns = pd.to_datetime([candle.timestamp for candle in response.candles], utc=True).to_numpy(dtype="datetime64[ns]")
+        closes = np.array([candle.close for candle in response.candles], dtype=float)
+        return candle_ns.view("int64"), closes
+
+    def _persist(self, payload: dict[str, Any]) -> None:
+        self._output_file.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self._output_file.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(payload, default=str), encoding="utf-8")
+        os.replace(tmp_path, self._output_file)
@@ -1,54 +1,231 @@
 from __future__ import annotations
 
-import math
-from collections import defaultdict, deque
+import threading
+from typing import Any
+
+import numpy as np
+
+HISTOGRAM_BINS = 10
+PSI_EPSILON = 1e-4
+
+
+def quantile_histogram(values: np.ndarray, bins: int = HISTOGRAM_BINS) -> dict[str, list[float] | list[int]]:
+    """Quantile bin edges of ``values`` and the training counts per bin.
+
+    The outer bins are open-ended when live values are assigned, so ``edges[0]`` and
+    ``edges[-1]`` only record the training range.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[np.isfinite(values)]
+    if values.size == 0:
+        return {"edges": [], "counts": []}
+    edges = np.unique(np.quantile(values, np.linspace(0.0, 1.0, bins + 1)))
+    if edges.size < 2:
+        edges = np.array([edges[0], edges[0]])
+    counts = np.bincount(np.searchsorted(edges[1:-1], values, side="right"), minlength=edges.size - 1)
+    return {"edges": edges.tolist(), "counts": counts.tolist()}
+
+
+def population_stability_index(expected: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    """Row-wise PSI between two arrays of bin proportions."""
+    expected = np.maximum(expected, PSI_EPSILON)
+    actual = np.maximum(actual, PSI_EPSILON)
+    return ((actual - expected) * np.log(actual / expected)).sum(axis=-1)
+
+
+def binned_ks_statistic(expected: np.ndarray, actual: np.ndarray) -> np.ndarray:
+    """Row-wise max CDF gap evaluated at bin edges (a lower bound on the exact KS statistic)."""
+    return np.abs(np.cumsum(actual, axis=-1) - np.cumsum(expected, axis=-1)).max(axis=-1)
 
 
 class DriftDetector:
-    def __init__(self, threshold: float, window_size: int = 100) -> None:
+    """Compares a sliding window of live feature values with training baselines.
+
+    Each feature owns one column of a fixed-size ``(window_size, features)`` ring buffer with
+    running shifted sums, so ``record`` and the windowed mean/std are O(1) per feature and
+    ``evaluate`` is vectorized across features. Sums are recomputed from the buffer once per
+    ``window_size`` updates of a column to stop floating-point error from accumulating.
+
+    When ``evaluate`` receives training histograms it also keeps per-feature bin counts of the
+    window, updated on every ``record``, so PSI and a binned KS statistic cost O(bins). The
+    histogram side stores one bin index per sample (uint8 for up to 256 bins) and never re-bins
+    raw values; the float ring buffer is there for the windowed mean/std and is only read again
+    to seed the counts when a different baseline arrives.
+    """
+
+    def __init__(self, threshold: float, window_size: int = 100, psi_threshold: float = 0.2, ks_threshold: float = 0.2) -> None:
         self._threshold = threshold
-        self._window_size = window_size
-        self._recent: dict[str, deque[float]] = defaultdict(lambda: deque(maxlen=self._window_size))
+        self._psi_threshold = psi_threshold
+        self._ks_threshold = ks_threshold
+        self._window_size = max(1, window_size)
+        self._columns: dict[str, int] = {}
+        self._buffer = np.zeros((self._window_size, 0))
+        self._shift = np.zeros(0)
+        self._sum = np.zeros(0)
+        self._sum_sq = np.zeros(0)
+        self._count = np.zeros(0, dtype=np.int64)
+        self._position = np.zeros(0, dtype=np.int64)
+        self._updates = np.zeros(0, dtype=np.int64)
+        self._lock = threading.Lock()
+        self._histogram_key: tuple | None = None
+        self._histogram_features: list[str] = []
+        self._histogram_row = np.zeros(0, dtype=np.int64)
+        self._inner_edges = np.zeros((0, 0))
+        self._expected = np.zeros((0, 0))
+        self._bin_counts = np.zeros((0, 0), dtype=np.int64)
+        self._bin_ring = np.zeros((self._window_size, 0), dtype=np.uint8)
 
     def record(self, features: dict[str, float]) -> None:
-        for key, value in features.items():
-            self._recent[key].append(float(value))
-
-    @staticmethod
-    def _stats(values: list[float]) -> tuple[float, float]:
-        if not values:
-            return 0.0, 0.0
-        mean = sum(values) / len(values)
-        variance = sum((x - mean) ** 2 for x in values) / len(values)
-        return mean, math.sqrt(variance)
-
-    def evaluate(self, baseline_stats: dict[str, dict[str, float]]) -> dict[str, object]:
-        details: dict[str, dict[str, float | bool]] = {}
-        drifted = False
-
-        for feature, baseline in baseline_stats.items():
-            recent_values = list(self._recent.get(feature, []))
-            recent_mean, recent_std = self._stats(recent_values)
-            baseline_mean = float(baseline.get("mean", 0.0))
-            baseline_std = float(baseline.get("std", 0.0))
-
-            mean_delta = abs(recent_mean - baseline_mean)
-            std_delta = abs(recent_std - baseline_std)
-
-            mean_ratio = mean_delta / max(abs(baseline_mean), 1e-9)
-            std_ratio = std_delta / max(abs(baseline_std), 1e-9)
-            feature_drift = mean_ratio > self._threshold or std_ratio > self._threshold
-            drifted = drifted or feature_drift
-
-            details[feature] = {
-                "baseline_mean": baseline_mean,
-                "baseline_std": baseline_std,
-                "recent_mean": recent_mean,
-                "recent_std": recent_std,
-                "mean_deviation_ratio": mean_ratio,
-                "std_deviation_ratio": std_ratio,
-                "drift": feature_drift,
-                "samples": len(recent_values),
+        if not features:
+            return
+        values = np.fromiter((float(value) for value in features.values()), dtype=float, count=len(features))
+        with self._lock:
+            for key, value in zip(features, values):
+                if key not in self._columns:
+                    self._add_column(key, value)
+            columns = np.fromiter((self._columns[key] for key in features), dtype=np.int64, count=len(features))
+
+            shifted = values - self._shift[columns]
+            positions = self._position[columns]
+            full = self._count[columns] == self._window_size
+            evicted = np.where(full, self._buffer[positions, columns], 0.0)
+            if self._histogram_key is not None:
+                rows = self._histogram_row[columns]
+                tracked = rows >= 0
+                rows, slots, evicting = rows[tracked], positions[tracked], full[tracked]
+                np.add.at(self._bin_counts, (rows[evicting], self._bin_ring[slots[evicting], rows[evicting]]), -1)
+                bins = self._bins(rows, values[tracked])
+                np.add.at(self._bin_counts, (rows, bins), 1)
+                self._bin_ring[slots, rows] = bins
+            self._sum[columns] += shifted - evicted
+            self._sum_sq[columns] += shifted * shifted - evicted * evicted
+            self._count[columns] += ~full
+            self._buffer[positions, columns] = shifted
+            self._position[columns] = (positions + 1) % self._window_size
+            self._updates[columns] += 1
+            for column in columns[self._updates[columns] % self._window_size == 0]:
+                window = self._buffer[: self._count[column], column]
+                self._sum[column] = window.sum()
+                self._sum_sq[column] = np.dot(window, window)
+
+    def window_stats(self, features: list[str]) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """(mean, population std, samples) for ``features``; unseen features report zeros."""
+        with self._lock:
+            columns = np.array([self._columns.get(feature, -1) for feature in features], dtype=np.int64)
+            known = columns >= 0
+            count = np.zeros(len(features), dtype=np.int64)
+            shifted_sum = np.zeros(len(features))
+            shifted_sum_sq = np.zeros(len(features))
+            shift = np.zeros(len(features))
+            count[known] = self._count[columns[known]]
+            shifted_sum[known] = self._sum[columns[known]]
+            shifted_sum_sq[known] = self._sum_sq[columns[known]]
+            shift[known] = self._shift[columns[known]]
+
+        safe_count = np.maximum(count, 1)
+        shifted_mean = shifted_sum / safe_count
+        variance = np.maximum(shifted_sum_sq / safe_count - shifted_mean**2, 0.0)
+        mean = np.where(count > 0, shifted_mean + shift, 0.0)
+        std = np.where(count > 0, np.sqrt(variance), 0.0)
+        return mean, std, count
+
+    def evaluate(
+        self,
+        baseline_stats: dict[str, dict[str, float]],
+        histograms: dict[str, dict[str, list[float]]] | None = None,
+    ) -> dict[str, object]:
+        features = list(baseline_stats)
+        recent_mean, recent_std, samples = self.window_stats(features)
+        distribution = self._distribution_drift(histograms) if histograms else {}
+        baseline_mean = np.array([float(baseline_stats[feature].get("mean", 0.0)) for feature in features])
+        baseline_std = np.array([float(baseline_stats[feature].get("std", 0.0)) for feature in features])
+
+        mean_ratio = np.abs(recent_mean - baseline_mean) / np.maximum(np.abs(baseline_mean), 1e-9)
+        std_ratio = np.abs(recent_std - baseline_std) / np.maximum(np.abs(baseline_std), 1e-9)
+        feature_drift = (mean_ratio > self._threshold) | (std_ratio > self._threshold)
+        for idx, feature in enumerate(features):
+            if feature in distribution:
+                psi, ks = distribution[feature]
+                feature_drift[idx] |= psi > self._psi_threshold or ks > self._ks_threshold
+
+        details: dict[str, dict[str, float | bool | None]] = {
+            feature: {
+                "baseline_mean": float(baseline_mean[idx]),
+                "baseline_std": float(baseline_std[idx]),
+                "recent_mean": float(recent_mean[idx]),
+                "recent_std": float(recent_std[idx]),
+                "mean_deviation_ratio": float(mean_ratio[idx]),
+                "std_deviation_ratio": float(std_ratio[idx]),
+                "drift": bool(feature_drift[idx]),
+                "samples": int(samples[idx]),
+                "psi": distribution[feature][0] if feature in distribution else None,
+                "ks_statistic": distribution[feature][1] if feature in distribution else None,
             }
+            for idx, feature in enumerate(features)
+        }
+        return {"status": "drift_detected" if feature_drift.any() else "healthy", "details": details}
+
+    def _add_column(self, key: str, first_value: float) -> int:
+        column = len(self._columns)
+        self._columns[key] = column
+        self._buffer = np.hstack([self._buffer, np.zeros((self._window_size, 1))])
+        # Summing values relative to the first one keeps sum_sq - n * mean^2 well conditioned.
+        self._shift = np.append(self._shift, first_value)
+        self._sum = np.append(self._sum, 0.0)
+        self._sum_sq = np.append(self._sum_sq, 0.0)
+        self._count = np.append(self._count, 0)
+        self._position = np.append(self._position, 0)
+        self._updates = np.append(self._updates, 0)
+        if self._histogram_key is not None:
+            row = self._histogram_features.index(key) if key in self._histogram_features else -1
+            self._histogram_row = np.append(self._histogram_row, row)
+        return column
+
+    def _distribution_drift(self, histograms: dict[str, dict[str, list[float]]]) -> dict[str, tuple[float, float]]:
+        with self._lock:
+            self._configure_histograms(histograms)
+            totals = self._bin_counts.sum(axis=1)
+            observed = self._bin_counts / np.maximum(totals, 1)[:, None]
+            psi = population_stability_index(self._expected, observed)
+            ks = binned_ks_statistic(self._expected, observed)
+            return {
+                feature: (float(psi[row]), float(ks[row]))
+                for row, feature in enumerate(self._histogram_features)
+                if totals[row] > 0
+            }
+
+    def _configure_histograms(self, histograms: dict[str, dict[str, Any]]) -> None:
+        usable = {feature: spec for feature, spec in histograms.items() if len(spec.get("edges", [])) >= 2}
+        key = tuple((feature, tuple(spec["edges"])) for feature, spec in sorted(usable.items()))
+        if key == self._histogram_key:
+            return
+
+        self._histogram_key = key
+        self._histogram_features = [feature for feature, _ in key]
+        width = max((len(usable[feature]["counts"]) for feature in self._histogram_features), default=1)
+        self._inner_edges = np.full((len(key), max(width - 1, 0)), np.inf)
+        self._expected = np.zeros((len(key), width))
+        for row, feature in enumerate(self._histogram_features):
+            inner = np.asarray(usable[feature]["edges"][1:-1], dtype=float)
+            counts = np.asarray(usable[feature]["counts"], dtype=float)
+            self._inner_edges[row, : inner.size] = inner
+            self._expected[row, : counts.size] = counts / max(counts.sum(), 1.0)
+
+        # Seed the counts from the values already in the window so a new baseline is usable at once.
+        self._bin_counts = np.zeros((len(key), width), dtype=np.int64)
+        self._bin_ring = np.zeros((self._window_size, len(key)), dtype=np.uint8 if width <= 256 else np.uint16)
+        self._histogram_row = np.full(len(self._columns), -1, dtype=np.int64)
+        for row, feature in enumerate(self._histogram_features):
+            column = self._columns.get(feature)
+            if column is None:
+                continue
+            self._histogram_row[column] = row
+            count = self._count[column]
+            bins = self._bins(np.full(count, row), self._buffer[:count, column] + self._shift[column])
+            np.add.at(self._bin_counts, (np.full(count, row), bins), 1)
+            self._bin_ring[:count, row] = bins
 
-        return {"status": "drift_detected" if drifted else "healthy", "details": details}
+    def _bins(self, rows: np.ndarray, values: np.ndarray) -> np.ndarray:
+        if rows.size == 0:
+            return np.zeros(0, dtype=np.int64)
+        return (values[:, None] >= self._inner_edges[rows]).sum(axis=1)
@@ -1,17 +1,129 @@
 from __future__ import annotations
 
-from collections import deque
+import math
+import threading
+import time
+from collections import OrderedDict, deque
+from typing import Any
+
+QUANTILES = {"p50_ms": 0.5, "p95_ms": 0.95, "p99_ms": 0.99}
+_MIN_TRACKABLE_MS = 1e-3
+
+
+class LatencyHistogram:
+    """Mergeable log-bucketed histogram (HDR/DDSketch style).
+
+    Bucket ``i`` covers ``(gamma^(i-1), gamma^i]`` with ``gamma = (1 + a) / (1 - a)``, so every
+    quantile is reported within relative error ``a``; memory is bounded by the number of
+    buckets spanned by the observed range, not by the number of samples.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.01) -> None:
+        self._relative_accuracy = relative_accuracy
+        self._gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+        self._buckets: dict[int, int] = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, value_ms: float) -> None:
+        index = math.ceil(math.log(max(value_ms, _MIN_TRACKABLE_MS)) / self._log_gamma)
+        self._buckets[index] = self._buckets.get(index, 0) + 1
+        self.count += 1
+        self.total += value_ms
+        if value_ms > self.max:
+            self.max = value_ms
+
+    def merge(self, other: LatencyHistogram) -> LatencyHistogram:
+        for index, count in other._buckets.items():
+            self._buckets[index] = self._buckets.get(index, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            return 0.0
+        rank = q * (self.count - 1)
+        seen = 0
+        for index in sorted(self._buckets):
+            seen += self._buckets[index]
+            if seen > rank:
+                # Midpoint of the bucket in relative terms, capped by the exact observed max.
+                return min(2 * self._gamma**index / (self._gamma + 1), self.max)
+        return self.max
+
+    def summary(self) -> dict[str, float | int]:
+        return {
+            "count": self.count,
+            "avg_ms": round(self.total / self.count, 4) if self.count else 0.0,
+            **{name: round(self.quantile(q), 4) for name, q in QUANTILES.items()},
+            "max_ms": round(self.max, 4),
+        }
+
+    def new_empty(self) -> LatencyHistogram:
+        return LatencyHistogram(relative_accuracy=self._relative_accuracy)
 
 
 class LatencyTracker:
-    def __init__(self, max_samples: int = 200) -> None:
-        self._samples: deque[float] = deque(maxlen=max_samples)
+    """Per-minute latency histograms per (endpoint, model_version), kept for ``retention_minutes``."""
+
+    def __init__(self, retention_minutes: int = 60, max_series: int = 64, relative_accuracy: float = 0.01) -> None:
+        self._retention_minutes = max(1, retention_minutes)
+        self._max_series = max(1, max_series)
+        self._relative_accuracy = relative_accuracy
+        self._series: OrderedDict[tuple[str, str | None], deque[tuple[int, LatencyHistogram]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float, endpoint: str = "predict", model_version: str | None = None) -> None:
+        minute = int(time.time() // 60)
+        key = (endpoint, model_version)
+        with self._lock:
+            rollups = self._series.get(key)
+            if rollups is None:
+                if len(self._series) >= self._max_series:
+                    key = ("other", None)
+                    rollups = self._series.get(key)
+                if rollups is None:
+                    rollups = self._series.setdefault(key, deque())
+            if not rollups or rollups[-1][0] != minute:
+                rollups.append((minute, LatencyHistogram(self._relative_accuracy)))
+                self._prune(rollups, minute)
+            rollups[-1][1].record(latency_ms)
+
+    def snapshot(self) -> dict[str, Any]:
+        minute = int(time.time() // 60)
+        overall = LatencyHistogram(self._relative_accuracy)
+        per_minute: dict[int, LatencyHistogram] = {}
+        breakdown = []
+        with self._lock:
+            for key in [key for key, rollups in self._series.items() if rollups and rollups[-1][0] <= minute - self._retention_minutes]:
+                del self._series[key]
+            for (endpoint, model_version), rollups in self._series.items():
+                self._prune(rollups, minute)
+                series = LatencyHistogram(self._relative_accuracy)
+                for rollup_minute, histogram in rollups:
+                    series.merge(histogram)
+                    per_minute.setdefault(rollup_minute, histogram.new_empty()).merge(histogram)
+                if series.count:
+                    breakdown.append({"endpoint": endpoint, "model_version": model_version, **series.summary()})
+                overall.merge(series)
 
-    def record(self, latency_ms: float) -> None:
-        self._samples.append(latency_ms)
+        summary = overall.summary()
+        return {
+            "avg_latency_ms": summary["avg_ms"],
+            "recent_calls": summary["count"],
+            **{name: summary[name] for name in [*QUANTILES, "max_ms"]},
+            "retention_minutes": self._retention_minutes,
+            "history": [
+                {"minute": time.strftime("%Y-%m-%dT%H:%M:00Z", time.gmtime(rollup_minute * 60)), **per_minute[rollup_minute].summary()}
+                for rollup_minute in sorted(per_minute)
+            ],
+            "breakdown": breakdown,
+        }
 
-    def snapshot(self) -> dict[str, float | int]:
-        if not self._samples:
-            return {"avg_latency_ms": 0.0, "recent_calls": 0}
-        avg = sum(self._samples) / len(self._samples)
-        return {"avg_latency_ms": round(avg, 4), "recent_calls": len(self._samples)}
+    def _prune(self, rollups: deque[tuple[int, LatencyHistogram]], minute: int) -> None:
+        while rollups and rollups[0][0] <= minute - self._retention_minutes:
+            rollups.popleft()
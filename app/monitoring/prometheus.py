@@ -0,0 +1,277 @@
+from __future__ import annotations
+
+import bisect
+import math
+import threading
+from collections.abc import Callable, Sequence
+from typing import Any
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+OVERFLOW_LABEL = "other"
+LATENCY_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+TRAINING_BUCKETS = (1.0, 5.0, 15.0, 30.0, 60.0, 120.0, 300.0, 600.0, 1800.0, 3600.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _label_text(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _CounterChild:
+    __slots__ = ("_value", "_lock", "_function")
+
+    def __init__(self) -> None:
+        self._value = 0.0
+        self._lock = threading.Lock()
+        self._function: Callable[[], float] | None = None
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Read the value from ``function`` at scrape time, for totals another component already keeps."""
+        self._function = function
+
+    def value(self) -> float:
+        return float(self._function()) if self._function is not None else self._value
+
+
+class _GaugeChild(_CounterChild):
+    __slots__ = ()
+
+    def set(self, value: float) -> None:
+        self._value = float(value)
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+
+class _HistogramChild:
+    __slots__ = ("_bounds", "_counts", "_sum", "_lock")
+
+    def __init__(self, bounds: tuple[float, ...]) -> None:
+        self._bounds = bounds
+        self._counts = [0] * (len(bounds) + 1)
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        index = bisect.bisect_left(self._bounds, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+
+    def state(self) -> tuple[list[int], float]:
+        with self._lock:
+            return list(self._counts), self._sum
+
+
+class _Metric:
+    """A named metric family; ``labels`` binds a child once so hot-path updates skip label handling.
+
+    Each family keeps at most ``max_series`` children; further label combinations share a single
+    child whose labels are all ``"other"``, so a misbehaving label source cannot grow memory.
+    """
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (), max_series: int = 64) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._max_series = max(1, max_series)
+        self._children: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if not self.labelnames:
+            self._default = self.labels()
+
+    def labels(self, *values: str) -> Any:
+        key = tuple(str(value) for value in values)
+        child = self._children.get(key)
+        if child is not None:
+            return child
+        if len(key) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {key}")
+        with self._lock:
+            if key not in self._children and len(self._children) >= self._max_series:
+                key = (OVERFLOW_LABEL,) * len(self.labelnames)
+            return self._children.setdefault(key, self._new_child())
+
+    def _new_child(self) -> Any:
+        raise NotImplementedError
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {_escape(self.documentation)}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            children = list(self._children.items())
+        for values, child in children:
+            lines.extend(self._render_child(values, child))
+        return lines
+
+    def _render_child(self, values: tuple[str, ...], child: Any) -> list[str]:
+        return [f"{self.name}{_label_text(self.labelnames, values)} {_format_value(child.value())}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self) -> _CounterChild:
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0) -> None:
+        self._default.inc(amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default.set_function(function)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self) -> _GaugeChild:
+        return _GaugeChild()
+
+    def set(self, value: float) -> None:
+        self._default.set(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        self._default.set_function(function)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+        max_series: int = 64,
+    ) -> None:
+        self._bounds = tuple(sorted(float(bound) for bound in buckets if not math.isinf(bound)))
+        super().__init__(name, documentation, labelnames, max_series)
+
+    def _new_child(self) -> _HistogramChild:
+        return _HistogramChild(self._bounds)
+
+    def observe(self, value: float) -> None:
+        self._default.observe(value)
+
+    def _render_child(self, values: tuple[str, ...], child: _HistogramChild) -> list[str]:
+        counts, total = child.state()
+        lines = []
+        cumulative = 0
+        for bound, count in zip([*self._bounds, math.inf], counts):
+            cumulative += count
+            le = 'le="' + _format_value(bound) + '"'
+            lines.append(f"{self.name}_bucket{_label_text(self.labelnames, values, le)} {cumulative}")
+        labels = _label_text(self.labelnames, values)
+        lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+        lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Process-wide metric families rendered in the Prometheus text exposition format (0.0.4)."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs: Any) -> Counter:
+        return self._register(Counter, name, documentation, labelnames, **kwargs)
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs: Any) -> Gauge:
+        return self._register(Gauge, name, documentation, labelnames, **kwargs)
+
+    def histogram(self, name: str, documentation: str, labelnames: Sequence[str] = (), **kwargs: Any) -> Histogram:
+        return self._register(Histogram, name, documentation, labelnames, **kwargs)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: list[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def _register(self, cls: type, name: str, documentation: str, labelnames: Sequence[str], **kwargs: Any) -> Any:
+        with self._lock:
+            existing = self._metrics.get(name)
+            if existing is not None:
+                if not isinstance(existing, cls) or existing.labelnames != tuple(labelnames):
+                    raise ValueError(f"metric {name} is already registered with a different type or labels")
+                return existing
+            metric = cls(name, documentation, labelnames, **kwargs)
+            self._metrics[name] = metric
+            return metric
+
+
+REGISTRY = MetricsRegistry()
+
+PREDICTIONS = REGISTRY.counter("ml_engine_predictions_total", "Predictions served.", ["endpoint"])
+INFERENCE_LATENCY = REGISTRY.histogram(
+    "ml_engine_inference_latency_seconds", "End-to-end inference latency per prediction.", ["endpoint"]
+)
+STAGE_LATENCY = REGISTRY.histogram("ml_engine_stage_seconds", "Time spent per request stage.", ["stage"])
+SERVICE_ERRORS = REGISTRY.counter("ml_engine_service_errors_total", "Service errors returned to clients.", ["error"])
+
+UPSTREAM_REQUESTS = REGISTRY.counter(
+    "ml_engine_upstream_requests_total", "Market-data HTTP attempts by endpoint and outcome.", ["path", "outcome"]
+)
+UPSTREAM_LATENCY = REGISTRY.histogram("ml_engine_upstream_request_seconds", "Market-data HTTP attempt latency.", ["path"])
+UPSTREAM_RETRIES = REGISTRY.counter("ml_engine_upstream_retries_total", "Market-data attempts that were retried.", ["path"])
+UPSTREAM_ERRORS = REGISTRY.counter(
+    "ml_engine_upstream_errors_total", "Failed market-data attempts by error code.", ["path", "code"]
+)
+
+AUDIT_WRITTEN = REGISTRY.counter("ml_engine_audit_records_written_total", "Audit records written to disk.")
+AUDIT_DROPPED = REGISTRY.counter("ml_engine_audit_records_dropped_total", "Audit records dropped on a full queue.")
+AUDIT_WRITE_ERRORS = REGISTRY.counter("ml_engine_audit_write_errors_total", "Audit batches that failed to write.")
+AUDIT_WRITE_LATENCY = REGISTRY.histogram("ml_engine_audit_write_seconds", "Audit batch write (and fsync) time.")
+AUDIT_QUEUE_DEPTH = REGISTRY.gauge("ml_engine_audit_queue_depth", "Audit records waiting for the writer thread.")
+
+TRAINING_RUNS = REGISTRY.counter("ml_engine_training_runs_total", "Training runs by outcome.", ["outcome"])
+TRAINING_DURATION = REGISTRY.histogram(
+    "ml_engine_training_duration_seconds", "Training run duration.", buckets=TRAINING_BUCKETS
+)
+TRAINING_LAST_SUCCESS = REGISTRY.gauge(
+    "ml_engine_training_last_success_timestamp_seconds", "Unix time of the last successful training run."
+)
+
+RATE_LIMIT_DECISIONS = REGISTRY.counter(
+    "ml_engine_rate_limit_decisions_total", "Rate limiter decisions by route class.", ["route_class", "decision"]
+)
+RATE_LIMIT_DECISION_SECONDS = REGISTRY.counter(
+    "ml_engine_rate_limit_decision_seconds_total", "Time spent making rate-limit decisions."
+)
+RATE_LIMIT_KEYS = REGISTRY.gauge("ml_engine_rate_limit_keys", "Client buckets held per route class.", ["route_class"])
+RATE_LIMIT_EVICTIONS = REGISTRY.counter("ml_engine_rate_limit_evictions_total", "Client buckets evicted.")
+RATE_LIMIT_STATE_BYTES = REGISTRY.gauge("ml_engine_rate_limit_state_bytes", "Approximate memory held by limiter state.")
+
+CACHE_ENTRIES = REGISTRY.gauge("ml_engine_cache_entries", "Entries held per cache.", ["cache"])
+CACHE_HITS = REGISTRY.counter("ml_engine_cache_hits_total", "Cache hits.", ["cache"])
+CACHE_MISSES = REGISTRY.counter("ml_engine_cache_misses_total", "Cache misses.", ["cache"])
+CANDLE_FETCHES = REGISTRY.counter(
+    "ml_engine_candle_fetches_total", "Candle series fetched upstream, in full or as a delta past the cached tail.", ["kind"]
+)
+
+LOG_RECORDS_DROPPED = REGISTRY.counter(
+    "ml_engine_log_records_dropped_total", "Log records dropped by the rate limiter or a full log queue.", ["reason"]
+)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import time
+from collections.abc import Awaitable
+from contextvars import ContextVar, Token
+from typing import Any, TypeVar
+
+from app.monitoring.metrics import LatencyTracker
+from app.monitoring.prometheus import STAGE_LATENCY
+
+T = TypeVar("T")
+
+_current: ContextVar[StageTimings | None] = ContextVar("stage_timings", default=None)
+
+
+class StageTimings:
+    """Wall-clock milliseconds per named stage for one request; repeated stages accumulate."""
+
+    __slots__ = ("stages",)
+
+    def __init__(self) -> None:
+        self.stages: dict[str, float] = {}
+
+    def add(self, name: str, elapsed_ms: float) -> None:
+        self.stages[name] = self.stages.get(name, 0.0) + elapsed_ms
+
+    def merge(self, other: StageTimings) -> None:
+        for name, elapsed_ms in other.stages.items():
+            self.add(name, elapsed_ms)
+
+    def server_timing_header(self) -> str:
+        return ", ".join(f"{name};dur={elapsed_ms:.3f}" for name, elapsed_ms in self.stages.items())
+
+
+class _Stage:
+    __slots__ = ("_timings", "_name", "_start")
+
+    def __init__(self, timings: StageTimings, name: str) -> None:
+        self._timings = timings
+        self._name = name
+        self._start = 0
+
+    def __enter__(self) -> _Stage:
+        self._start = time.perf_counter_ns()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._timings.add(self._name, (time.perf_counter_ns() - self._start) / 1e6)
+
+
+class _NoopStage:
+    __slots__ = ()
+
+    def __enter__(self) -> _NoopStage:
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        return None
+
+
+_NOOP_STAGE = _NoopStage()
+
+
+def stage(name: str) -> _Stage | _NoopStage:
+    """Context manager timing ``name`` into the current request; a shared no-op when timing is off."""
+    timings = _current.get()
+    return _NOOP_STAGE if timings is None else _Stage(timings, name)
+
+
+def timed(name: str, awaitable: Awaitable[T]) -> Awaitable[T]:
+    """Time an awaitable that is handed to gather(); returned unchanged when timing is off."""
+    if _current.get() is None:
+        return awaitable
+    return _timed(name, awaitable)
+
+
+async def _timed(name: str, awaitable: Awaitable[T]) -> T:
+    with stage(name):
+        return await awaitable
+
+
+def current_timings() -> StageTimings | None:
+    return _current.get()
+
+
+def begin_request() -> tuple[StageTimings, Token]:
+    timings = StageTimings()
+    return timings, _current.set(timings)
+
+
+def end_request(token: Token) -> None:
+    _current.reset(token)
+
+
+class StageTimingTracker:
+    """Per-stage latency histograms, rolled up per minute like LatencyTracker."""
+
+    def __init__(self, retention_minutes: int = 60) -> None:
+        self._tracker = LatencyTracker(retention_minutes=retention_minutes)
+
+    def record(self, timings: StageTimings) -> None:
+        for name, elapsed_ms in timings.stages.items():
+            self._tracker.record(elapsed_ms, endpoint=name)
+            STAGE_LATENCY.labels(name).observe(elapsed_ms / 1000)
+
+    def snapshot(self) -> dict[str, Any]:
+        snapshot = self._tracker.snapshot()
+        return {
+            "retention_minutes": snapshot["retention_minutes"],
+            "stages": {item.pop("endpoint"): {key: value for key, value in item.items() if key != "model_version"} for item in snapshot["breakdown"]},
+        }
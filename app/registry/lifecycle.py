@@ -1,11 +1,28 @@
 from __future__ import annotations
 
+import copy
 import json
 import pickle
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import Any
 
+# Files modified this recently may change again without a visible mtime change
+# (coarse filesystem timestamps), so their snapshots are not trusted yet.
+_RACY_WINDOW_NS = 2_000_000_000
+
+BASELINE_FILE = "feature_baseline.json"
+
+
+def feature_baseline(metadata: dict[str, Any]) -> dict[str, Any]:
+    """Drift baselines split out of the model metadata so monitoring never needs the model binary."""
+    return {
+        "version": metadata.get("version"),
+        "training_feature_stats": metadata.get("training_feature_stats", {}),
+        "training_feature_histograms": metadata.get("training_feature_histograms", {}),
+    }
+
 
 class ModelLifecycleRegistry:
     def __init__(self, root_dir: str) -> None:
@@ -13,28 +30,64 @@ class ModelLifecycleRegistry:
         self.root_dir.mkdir(parents=True, exist_ok=True)
         self._registry_file = self.root_dir / "registry.json"
         self._history_file = self.root_dir / "training_history.json"
+        self._json_cache: dict[Path, tuple[tuple[int, int, int], Any]] = {}
+        self._versions_cache: tuple[tuple[int, int, int], list[str]] | None = None
+        self._baselines: dict[str, dict[str, Any]] = {}
+
+    @staticmethod
+    def _file_signature(path: Path) -> tuple[int, int, int] | None:
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    @staticmethod
+    def _is_settled(signature: tuple[int, int, int] | None) -> bool:
+        return signature is not None and time.time_ns() - signature[0] > _RACY_WINDOW_NS
+
+    def _read_json(self, path: Path, default: Any) -> Any:
+        signature = self._file_signature(path)
+        if signature is None:
+            self._json_cache.pop(path, None)
+            return default
+        cached = self._json_cache.get(path)
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        payload = json.loads(path.read_text())
+        if self._is_settled(signature):
+            self._json_cache[path] = (signature, payload)
+        return payload
+
+    def _write_json(self, path: Path, payload: Any) -> None:
+        path.write_text(json.dumps(payload, indent=2, default=str))
+        self._json_cache.pop(path, None)
 
     def _read_registry(self) -> dict[str, Any]:
-        if not self._registry_file.exists():
+        payload = self._read_json(self._registry_file, None)
+        if payload is None:
             return {"active_version": None, "models": {}}
-        payload = json.loads(self._registry_file.read_text())
         payload.setdefault("active_version", None)
         payload.setdefault("models", {})
         return payload
 
     def _write_registry(self, payload: dict[str, Any]) -> None:
-        self._registry_file.write_text(json.dumps(payload, indent=2, default=str))
+        self._write_json(self._registry_file, payload)
 
     def _read_history(self) -> list[dict[str, Any]]:
-        if not self._history_file.exists():
-            return []
-        return json.loads(self._history_file.read_text())
+        return self._read_json(self._history_file, [])
 
     def _write_history(self, history: list[dict[str, Any]]) -> None:
-        self._history_file.write_text(json.dumps(history, indent=2, default=str))
+        self._write_json(self._history_file, history)
 
     def list_versions(self) -> list[str]:
-        return sorted([p.name for p in self.root_dir.iterdir() if p.is_dir() and p.name.startswith("v")])
+        signature = self._file_signature(self.root_dir)
+        if self._versions_cache is not None and self._versions_cache[0] == signature:
+            return list(self._versions_cache[1])
+        versions = sorted([p.name for p in self.root_dir.iterdir() if p.is_dir() and p.name.startswith("v")])
+        if self._is_settled(signature):
+            self._versions_cache = (signature, versions)
+        return list(versions)
 
     def list_models(self) -> list[dict[str, Any]]:
         registry = self._read_registry()
@@ -60,7 +113,7 @@ class ModelLifecycleRegistry:
     def activate_version(self, version: str) -> None:
         if not (self.root_dir / version).exists():
             raise FileNotFoundError(f"Model version {version} not found")
-        registry = self._read_registry()
+        registry = copy.deepcopy(self._read_registry())
         if version not in registry["models"]:
             raise FileNotFoundError(f"Model metadata for version {version} not found")
         registry["active_version"] = version
@@ -98,13 +151,14 @@ class ModelLifecycleRegistry:
         (version_dir / "metrics.json").write_text(json.dumps(metrics, indent=2, default=str))
         (version_dir / "feature_columns.json").write_text(json.dumps(feature_columns, indent=2))
         (version_dir / "dataset_summary.json").write_text(json.dumps(dataset_summary, indent=2, default=str))
+        (version_dir / BASELINE_FILE).write_text(json.dumps(feature_baseline(metadata), default=str))
 
         created_at = metadata.get("trained_at", datetime.now(timezone.utc).isoformat())
         training_metrics = metadata.get("training_metrics", {})
         validation_metrics = metadata.get("validation_metrics", metrics)
         dataset_window = metadata.get("dataset_window", dataset_summary)
 
-        registry = self._read_registry()
+        registry = copy.deepcopy(self._read_registry())
         registry["models"][version] = {
             "created_at": created_at,
             "training_metrics": training_metrics,
@@ -114,7 +168,7 @@ class ModelLifecycleRegistry:
         registry["active_version"] = version
         self._write_registry(registry)
 
-        history = self._read_history()
+        history = list(self._read_history())
         history.append(
             {
                 "version": version,
@@ -162,9 +216,27 @@ class ModelLifecycleRegistry:
     def get_training_history(self) -> list[dict[str, Any]]:
         return self._read_history()
 
+    def get_training_feature_baseline(self, version: str | None = None) -> dict[str, Any]:
+        resolved = version or self.get_active_version()
+        if not resolved:
+            raise FileNotFoundError("No active model version is registered")
+        baseline = self._baselines.get(resolved)
+        if baseline is None:
+            version_dir = self.root_dir / resolved
+            if (version_dir / BASELINE_FILE).exists():
+                baseline = json.loads((version_dir / BASELINE_FILE).read_text())
+            elif (version_dir / "metadata.json").exists():
+                baseline = feature_baseline(json.loads((version_dir / "metadata.json").read_text()))
+            else:
+                raise FileNotFoundError(f"Model version {resolved} not found")
+            self._baselines[resolved] = baseline
+        return baseline
+
     def get_training_feature_stats(self, version: str | None = None) -> dict[str, dict[str, float]]:
-        _, metadata = self.load_model(version=version)
-        return metadata.get("training_feature_stats", {})
+        return self.get_training_feature_baseline(version=version)["training_feature_stats"]
+
+    def get_training_feature_histograms(self, version: str | None = None) -> dict[str, dict[str, list[float]]]:
+        return self.get_training_feature_baseline(version=version)["training_feature_histograms"]
 
 
 def _parse_gs_uri(uri: str) -> tuple[str, str]:
@@ -184,6 +256,9 @@ class GCSModelLifecycleRegistry:
 
         self._client = storage.Client()
         self._bucket = self._client.bucket(self._bucket_name)
+        self._json_cache: dict[str, tuple[int, Any]] = {}
+        self._versions_cache: tuple[int, list[str]] | None = None
+        self._baselines: dict[str, dict[str, Any]] = {}
 
     def _blob_path(self, relative: str) -> str:
         if not self._prefix:
@@ -191,17 +266,31 @@ class GCSModelLifecycleRegistry:
         return f"{self._prefix}/{relative}"
 
     def _read_json(self, relative: str, default: Any) -> Any:
-        blob = self._bucket.blob(self._blob_path(relative))
-        if not blob.exists(self._client):
+        blob = self._bucket.get_blob(self._blob_path(relative), client=self._client)
+        if blob is None:
+            self._json_cache.pop(relative, None)
             return default
-        return json.loads(blob.download_as_text())
+        cached = self._json_cache.get(relative)
+        if cached is not None and cached[0] == blob.generation:
+            return cached[1]
+        payload = json.loads(blob.download_as_text(client=self._client))
+        self._json_cache[relative] = (blob.generation, payload)
+        return payload
 
     def _write_json(self, relative: str, payload: Any) -> None:
         blob = self._bucket.blob(self._blob_path(relative))
         blob.upload_from_string(json.dumps(payload, indent=2, default=str), content_type="application/json")
+        if blob.generation is not None:
+            self._json_cache[relative] = (blob.generation, payload)
+
+    def _registry_generation(self) -> int | None:
+        cached = self._json_cache.get("registry.json")
+        return cached[0] if cached else None
 
     def _read_registry(self) -> dict[str, Any]:
-        payload = self._read_json("registry.json", {"active_version": None, "models": {}})
+        payload = self._read_json("registry.json", None)
+        if payload is None:
+            return {"active_version": None, "models": {}}
         payload.setdefault("active_version", None)
         payload.setdefault("models", {})
         return payload
@@ -220,6 +309,15 @@ class GCSModelLifecycleRegistry:
         return marker.exists(self._client)
 
     def list_versions(self) -> list[str]:
+        self._read_registry()
+        return self._list_versions()
+
+    def _list_versions(self) -> list[str]:
+        # Every new version package also rewrites registry.json, so its generation
+        # is a cheap stand-in for re-listing the bucket prefix.
+        generation = self._registry_generation()
+        if self._versions_cache is not None and generation is not None and self._versions_cache[0] == generation:
+            return list(self._versions_cache[1])
         prefix = self._blob_path("")
         prefixes = set()
         for blob in self._client.list_blobs(self._bucket, prefix=prefix):
@@ -231,13 +329,16 @@ class GCSModelLifecycleRegistry:
             version = relative.split("/", 1)[0]
             if version.startswith("v"):
                 prefixes.add(version)
-        return sorted(prefixes)
+        versions = sorted(prefixes)
+        if generation is not None:
+            self._versions_cache = (generation, versions)
+        return list(versions)
 
     def list_models(self) -> list[dict[str, Any]]:
         registry = self._read_registry()
         active = registry.get("active_version")
         items: list[dict[str, Any]] = []
-        for version in self.list_versions():
+        for version in self._list_versions():
             model_record = registry["models"].get(version, {})
             items.append(
                 {
@@ -257,7 +358,7 @@ class GCSModelLifecycleRegistry:
     def activate_version(self, version: str) -> None:
         if not self._version_exists(version):
             raise FileNotFoundError(f"Model version {version} not found")
-        registry = self._read_registry()
+        registry = copy.deepcopy(self._read_registry())
         if version not in registry["models"]:
             raise FileNotFoundError(f"Model metadata for version {version} not found")
         registry["active_version"] = version
@@ -295,13 +396,14 @@ class GCSModelLifecycleRegistry:
         self._write_json(f"{version}/metrics.json", metrics)
         self._write_json(f"{version}/feature_columns.json", feature_columns)
         self._write_json(f"{version}/dataset_summary.json", dataset_summary)
+        self._write_json(f"{version}/{BASELINE_FILE}", feature_baseline(metadata))
 
         created_at = metadata.get("trained_at", datetime.now(timezone.utc).isoformat())
         training_metrics = metadata.get("training_metrics", {})
         validation_metrics = metadata.get("validation_metrics", metrics)
         dataset_window = metadata.get("dataset_window", dataset_summary)
 
-        registry = self._read_registry()
+        registry = copy.deepcopy(self._read_registry())
         registry["models"][version] = {
             "created_at": created_at,
             "training_metrics": training_metrics,
@@ -311,7 +413,7 @@ class GCSModelLifecycleRegistry:
         registry["active_version"] = version
         self._write_registry(registry)
 
-        history = self._read_history()
+        history = list(self._read_history())
         history.append(
             {
                 "version": version,
@@ -359,6 +461,23 @@ class GCSModelLifecycleRegistry:
     def get_training_history(self) -> list[dict[str, Any]]:
         return self._read_history()
 
+    def get_training_feature_baseline(self, version: str | None = None) -> dict[str, Any]:
+        resolved = version or self.get_active_version()
+        if not resolved:
+            raise FileNotFoundError("No active model version is registered")
+        baseline = self._baselines.get(resolved)
+        if baseline is None:
+            baseline = self._read_json(f"{resolved}/{BASELINE_FILE}", None)
+            if baseline is None:
+                metadata = self._read_json(f"{resolved}/metadata.json", None)
+                if metadata is None:
+                    raise FileNotFoundError(f"Model version {resolved} not found")
+                baseline = feature_baseline(metadata)
+            self._baselines[resolved] = baseline
+        return baseline
+
     def get_training_feature_stats(self, version: str | None = None) -> dict[str, dict[str, float]]:
-        _, metadata = self.load_model(version=version)
-        return metadata.get("training_feature_stats", {})
+        return self.get_training_feature_baseline(version=version)["training_feature_stats"]
+
+    def get_training_feature_histograms(self, version: str | None = None) -> dict[str, dict[str, list[float]]]:
+        return self.get_training_feature_baseline(version=version)["training_feature_histograms"]
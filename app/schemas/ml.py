@@ -75,9 +75,83 @@ class FreshnessResponse(BaseModel):
     last_prediction_time: str | None
 
 
+class LatencyPoint(BaseModel):
+    count: int
+    avg_ms: float
+    p50_ms: float
+    p95_ms: float
+    p99_ms: float
+    max_ms: float
+
+
+class LatencyMinute(LatencyPoint):
+    minute: str
+
+
+class LatencySeries(LatencyPoint):
+    model_config = ConfigDict(protected_namespaces=())
+
+    endpoint: str
+    model_version: str | None = None
+
+
 class LatencyResponse(BaseModel):
     avg_latency_ms: float
     recent_calls: int
+    p50_ms: float = 0.0
+    p95_ms: float = 0.0
+    p99_ms: float = 0.0
+    max_ms: float = 0.0
+    retention_minutes: int | None = None
+    history: list[LatencyMinute] = Field(default_factory=list)
+    breakdown: list[LatencySeries] = Field(default_factory=list)
+
+
+class StageTimingResponse(BaseModel):
+    retention_minutes: int
+    stages: dict[str, LatencyPoint] = Field(default_factory=dict)
+
+
+class CacheStatsResponse(BaseModel):
+    caches: dict[str, dict[str, Any]]
+
+
+class LiveAccuracyResponse(BaseModel):
+    computed_at: str | None = None
+    predictions: int = 0
+    resolved: int = 0
+    by_version: list[dict[str, Any]] = Field(default_factory=list)
+    by_day: list[dict[str, Any]] = Field(default_factory=list)
+
+
+class AuditWriterStatsResponse(BaseModel):
+    buffered: bool
+    closed: bool
+    queued: int
+    queue_capacity: int
+    written: int
+    dropped: int
+    batches: int
+    write_errors: int
+    fsync: str
+    overflow: str
+    segments: dict[str, Any]
+
+
+class BatchingStatsResponse(BaseModel):
+    enabled: bool
+    deduplicated_lookups: int
+    window_ms: float | None = None
+    max_batch_size: int | None = None
+    queued: int = 0
+    in_flight_batches: int = 0
+    batches: int = 0
+    requests: int = 0
+    avg_batch_size: float = 0.0
+    largest_batch: int = 0
+    size_triggered_flushes: int = 0
+    avg_queue_wait_ms: float = 0.0
+    max_queue_wait_ms: float = 0.0
 
 
 class BatchPredictRequest(BaseModel):
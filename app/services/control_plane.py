@@ -2,11 +2,13 @@ from __future__ import annotations
 
 import asyncio
 import logging
+import time
 from datetime import datetime, timezone
 from typing import Any
 
 from app.core.config import Settings
 from app.ml.trainer import Trainer, TrainingConfig
+from app.monitoring.prometheus import TRAINING_DURATION, TRAINING_LAST_SUCCESS, TRAINING_RUNS
 
 logger = logging.getLogger(__name__)
 
@@ -49,8 +51,11 @@ class AsyncTrainingManager:
             cv_folds=self._settings.train_cv_folds,
             model_params={"fit_intercept": True, "l2_alpha": 1e-6},
         )
+        started = time.perf_counter()
         try:
             result = await self._trainer.train(config=config)
+            TRAINING_RUNS.labels("succeeded").inc()
+            TRAINING_LAST_SUCCESS.set(time.time())
             self._status.update(
                 {
                     "state": "succeeded",
@@ -61,6 +66,7 @@ class AsyncTrainingManager:
             )
             logger.info("training_succeeded", extra={"version": result["version"], "metrics": result["metrics"]})
         except Exception as exc:
+            TRAINING_RUNS.labels("failed").inc()
             self._status.update(
                 {
                     "state": "failed",
@@ -69,6 +75,8 @@ class AsyncTrainingManager:
                 }
             )
             logger.exception("training_failed")
+        finally:
+            TRAINING_DURATION.observe(time.perf_counter() - started)
 
     def status(self) -> dict[str, Any]:
         return dict(self._status)
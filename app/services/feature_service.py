@@ -1,16 +1,107 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any
+
+import pandas as pd
+
 from app.clients.market_data import MarketDataClient
+from app.core.cache import AsyncTTLCache
+from app.core.concurrency import gather_or_cancel
 from app.core.config import Settings
 from app.exceptions import DataValidationError
-from app.features.engineering import compute_features
+from app.features.engineering import FEATURE_COLUMNS, ZSCORE_WINDOW, compute_feature_frame, compute_latest_features, feature_records, feature_rows, fundamental_features
+from app.features.streaming import StreamingFeatureEngine
+from app.monitoring.timing import stage, timed
 from app.schemas.features import FeaturesResponse
+from app.schemas.p1 import FundamentalsResponse
+
+
+@dataclass
+class FeatureSet:
+    symbol: str
+    window_used: int
+    upstream_latest_timestamp: datetime
+    degraded_input: bool
+    frame: pd.DataFrame | None = None
+    latest_values: dict[str, float] | None = None
+
+    def latest(self) -> dict[str, float]:
+        if self.latest_values is not None:
+            return dict(self.latest_values)
+        values = self.frame[FEATURE_COLUMNS].to_numpy(dtype=float)[-1]
+        return dict(zip(FEATURE_COLUMNS, values.tolist()))
+
+    def to_response(self) -> FeaturesResponse:
+        if self.frame is None:
+            raise ValueError("FeatureSet was built in tail-only mode and has no feature rows")
+        return FeaturesResponse(
+            symbol=self.symbol,
+            window_used=self.window_used,
+            upstream_latest_timestamp=self.upstream_latest_timestamp,
+            degraded_input=self.degraded_input,
+            features=feature_rows(self.frame),
+        )
+
+    def to_payload(self) -> dict[str, Any]:
+        """FeaturesResponse-shaped dict of plain values, for serializing without per-row models."""
+        if self.frame is None:
+            raise ValueError("FeatureSet was built in tail-only mode and has no feature rows")
+        return {
+            "symbol": self.symbol,
+            "window_used": self.window_used,
+            "upstream_latest_timestamp": self.upstream_latest_timestamp,
+            "degraded_input": self.degraded_input,
+            "features": feature_records(self.frame),
+        }
 
 
 class FeatureService:
     def __init__(self, market_data_client: MarketDataClient, settings: Settings) -> None:
         self._market_data_client = market_data_client
         self._settings = settings
+        self._fundamentals_cache: AsyncTTLCache[tuple[str, str], FundamentalsResponse] = AsyncTTLCache(
+            ttl_seconds=settings.fundamentals_cache_ttl_seconds,
+            max_entries=settings.fundamentals_cache_max_entries,
+        )
+        self._streaming: StreamingFeatureEngine | None = None
+        if settings.streaming_features_enabled:
+            self._streaming = StreamingFeatureEngine(
+                ma_window=settings.ma_window,
+                vol_window=settings.vol_window,
+                max_symbols=settings.streaming_features_max_symbols,
+            )
+
+    async def get_fundamentals(self, symbol: str, exchange: str) -> FundamentalsResponse:
+        return await self._fundamentals_cache.get_or_load(
+            (symbol, exchange),
+            lambda: self._market_data_client.get_fundamentals(symbol=symbol, exchange=exchange),
+        )
+
+    def cache_stats(self) -> dict[str, dict]:
+        stats = {
+            "fundamentals": self._fundamentals_cache.snapshot(),
+            "candles": self._market_data_client.candle_cache_stats(),
+        }
+        if self._streaming is not None:
+            stats["streaming_features"] = self._streaming.snapshot()
+        return stats
 
     async def build_features(self, symbol: str, lookback: int | None, exchange: str = "NASDAQ") -> FeaturesResponse:
+        feature_set = await self.build_feature_set(symbol=symbol, lookback=lookback, exchange=exchange)
+        return feature_set.to_response()
+
+    async def build_feature_set(self, symbol: str, lookback: int | None, exchange: str = "NASDAQ") -> FeatureSet:
+        return await self._build(symbol=symbol, lookback=lookback, exchange=exchange, tail_only=False)
+
+    async def build_latest_features(self, symbol: str, lookback: int | None, exchange: str = "NASDAQ") -> FeatureSet:
+        return await self._build(symbol=symbol, lookback=lookback, exchange=exchange, tail_only=True)
+
+    def _can_stream(self, window: int) -> bool:
+        return self._streaming is not None and window > max(self._settings.ma_window, self._settings.vol_window, ZSCORE_WINDOW, 5)
+
+    async def _build(self, symbol: str, lookback: int | None, exchange: str, tail_only: bool) -> FeatureSet:
         window = lookback or self._settings.default_lookback
         if window > self._settings.max_lookback:
             raise DataValidationError(
@@ -19,20 +110,46 @@ class FeatureService:
                 status_code=422,
             )
 
-        candles_response = await self._market_data_client.get_candles(symbol=symbol, lookback=window, exchange=exchange)
-        fundamentals_response = await self._market_data_client.get_fundamentals(symbol=symbol, exchange=exchange)
-        features = compute_features(
-            candles=candles_response.candles,
-            ma_window=self._settings.ma_window,
-            vol_window=self._settings.vol_window,
-            fundamentals=fundamentals_response.fundamentals,
+        candles_response, fundamentals_response = await gather_or_cancel(
+            timed("candles", self._market_data_client.get_candles(symbol=symbol, lookback=window, exchange=exchange)),
+            timed("fundamentals", self.get_fundamentals(symbol=symbol, exchange=exchange)),
         )
+        frame: pd.DataFrame | None = None
+        latest_values: dict[str, float] | None = None
+        with stage("features"):
+            if tail_only and self._can_stream(window):
+                # The newest candle may still be forming, so it is evaluated without being committed.
+                state = self._streaming.ingest(
+                    (symbol, exchange),
+                    candles_response.candles[:-1],
+                    lookback=window,
+                    generation=self._market_data_client.candle_generation(symbol=symbol, exchange=exchange),
+                )
+                latest_values = {
+                    **state.peek(candles_response.candles[-1].close),
+                    **fundamental_features(fundamentals_response.fundamentals),
+                }
+            elif tail_only:
+                latest_values = compute_latest_features(
+                    candles=candles_response.candles,
+                    ma_window=self._settings.ma_window,
+                    vol_window=self._settings.vol_window,
+                    fundamentals=fundamentals_response.fundamentals,
+                )
+            else:
+                frame = compute_feature_frame(
+                    candles=candles_response.candles,
+                    ma_window=self._settings.ma_window,
+                    vol_window=self._settings.vol_window,
+                    fundamentals=fundamentals_response.fundamentals,
+                )
 
         degraded = candles_response.data_source == "cache" or candles_response.exchange_status == "degraded"
-        return FeaturesResponse(
+        return FeatureSet(
             symbol=candles_response.symbol,
             window_used=window,
             upstream_latest_timestamp=candles_response.candles[-1].timestamp,
             degraded_input=degraded,
-            features=features,
+            frame=frame,
+            latest_values=latest_values,
         )
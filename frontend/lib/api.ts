@@ -29,9 +29,9 @@ export const api = {
     return {
       count: res.recent_calls ?? 0,
       average_ms: res.avg_latency_ms ?? 0,
-      p95_ms: res.avg_latency_ms ?? 0,
-      max_ms: res.avg_latency_ms ?? 0,
-      history: Array.from({ length: Math.max(res.recent_calls ?? 0, 1) }).map((_, idx) => Number(res.avg_latency_ms ?? 0) + idx * 0.2)
+      p95_ms: res.p95_ms ?? 0,
+      max_ms: res.max_ms ?? 0,
+      history: (res.history ?? []).map((point: { p95_ms: number }) => Number(point.p95_ms ?? 0))
     }
   },
   freshness: async () => {
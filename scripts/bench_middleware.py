@@ -0,0 +1,177 @@
+"""Requests/sec through the middleware stack, BaseHTTPMiddleware (before) vs pure ASGI (after).
+
+Both stacks mount the real /health and /predict routes behind CORS, rate limiting and request-id
+middleware; /predict runs the real InferenceEngine against an in-process stub upstream. Requests go
+through httpx's ASGI transport, so the numbers exclude sockets and the HTTP parser.
+
+    python scripts/bench_middleware.py --requests 3000 --concurrency 32
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+import uuid
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.middleware.cors import CORSMiddleware
+from starlette.middleware.base import BaseHTTPMiddleware
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+os.environ.setdefault("MARKET_DATA_BASE_URL", "http://upstream.invalid")
+
+from app.api.dependencies import get_inference_engine, get_stage_tracker  # noqa: E402
+from app.api.middleware import (  # noqa: E402
+    DEFAULT_ROUTE_CLASS,
+    RateLimit,
+    RateLimitMiddleware,
+    RequestContextMiddleware,
+    TokenBucketLimiter,
+    route_class,
+)
+from app.api.routes.health import router as health_router  # noqa: E402
+from app.api.routes.predict import router as predict_router  # noqa: E402
+from app.logging.audit import PredictionAuditLogger  # noqa: E402
+from app.ml.dataset_builder import FEATURE_COLUMNS  # noqa: E402
+from app.ml.inference import InferenceEngine  # noqa: E402
+from app.monitoring.drift import DriftDetector  # noqa: E402
+from app.monitoring.freshness import FreshnessTracker  # noqa: E402
+from app.monitoring.metrics import LatencyTracker  # noqa: E402
+from app.monitoring.timing import begin_request, end_request  # noqa: E402
+
+LIMITS = {DEFAULT_ROUTE_CLASS: RateLimit(10**9, 60.0), "predict": RateLimit(10**9, 60.0)}
+
+
+class _Model:
+    def predict(self, x):
+        return [0.1] * len(x)
+
+
+class _Registry:
+    def get_active_version(self):
+        return "bench"
+
+    def load_model(self, version=None):
+        return _Model(), {"version": "bench"}
+
+
+class _FeatureSet:
+    degraded_input = False
+
+    def __init__(self) -> None:
+        self.upstream_latest_timestamp = datetime.now(timezone.utc)
+
+    def latest(self) -> dict[str, float]:
+        return {column: 0.01 for column in FEATURE_COLUMNS}
+
+
+class _StubUpstream:
+    """Stands in for both FeatureService and MarketDataClient."""
+
+    def __init__(self) -> None:
+        self._market_data_client = self
+
+    async def get_market_status(self, exchange):
+        return type("Status", (), {"is_open": True})()
+
+    async def get_quote(self, symbol, exchange):
+        return type("Quote", (), {"timestamp": datetime.now(timezone.utc)})()
+
+    async def build_latest_features(self, symbol, lookback, exchange):
+        return _FeatureSet()
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """The previous BaseHTTPMiddleware shape, with the same token-bucket decision."""
+
+    def __init__(self, app, limits: dict[str, RateLimit]) -> None:
+        super().__init__(app)
+        self._limiter = TokenBucketLimiter(limits)
+        self._limits = limits
+
+    async def dispatch(self, request: Request, call_next):
+        route = route_class(request.url.path)
+        client = request.client.host if request.client else "unknown"
+        self._limiter.allow(route if route in self._limits else DEFAULT_ROUTE_CLASS, client)
+        return await call_next(request)
+
+
+def build_app(engine: InferenceEngine, legacy: bool) -> FastAPI:
+    app = FastAPI()
+    app.include_router(health_router)
+    app.include_router(predict_router)
+    app.dependency_overrides[get_inference_engine] = lambda: engine
+    app.add_middleware(CORSMiddleware, allow_origins=["*"], allow_methods=["*"], allow_headers=["*"])
+    if not legacy:
+        app.add_middleware(RateLimitMiddleware, limits=LIMITS)
+        app.add_middleware(RequestContextMiddleware, stage_tracker=get_stage_tracker)
+        return app
+
+    app.add_middleware(LegacyRateLimitMiddleware, limits=LIMITS)
+
+    @app.middleware("http")
+    async def request_context_middleware(request: Request, call_next):
+        request_id = request.headers.get("X-Request-ID", str(uuid.uuid4()))
+        request.state.request_id = request_id
+        timings, token = begin_request()
+        try:
+            response = await call_next(request)
+        finally:
+            end_request(token)
+        response.headers["X-Request-ID"] = request_id
+        if timings.stages:
+            response.headers["Server-Timing"] = timings.server_timing_header()
+            get_stage_tracker().record(timings)
+        return response
+
+    return app
+
+
+async def run(app: FastAPI, path: str, total: int, concurrency: int) -> float:
+    remaining = iter(range(total))
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        await client.get(path)
+
+        async def worker() -> None:
+            for _ in remaining:
+                response = await client.get(path)
+                response.raise_for_status()
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - started)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=3000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        audit_logger = PredictionAuditLogger(log_file=str(Path(tmp) / "audit.log"), limit=100)
+        engine = InferenceEngine(
+            _StubUpstream(), _Registry(), 120, audit_logger, LatencyTracker(), FreshnessTracker(), DriftDetector(threshold=0.25)
+        )
+        apps = {"before": build_app(engine, legacy=True), "after": build_app(engine, legacy=False)}
+        print(f"{'path':<22}{'before req/s':>14}{'after req/s':>14}{'change':>10}")
+        for path in ["/health", "/predict?symbol=AAPL"]:
+            best = {
+                name: max(asyncio.run(run(app, path, args.requests, args.concurrency)) for _ in range(args.rounds))
+                for name, app in apps.items()
+            }
+            change = best["after"] / best["before"] - 1
+            print(f"{path:<22}{best['before']:>14.0f}{best['after']:>14.0f}{change:>+10.0%}")
+        audit_logger.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,39 +1,36 @@
 import asyncio
 from datetime import datetime, timezone
 
+import pandas as pd
+
 from app.ml.dataset_builder import DatasetBuilder
-from app.schemas.features import FeatureRow, FeaturesResponse
+from app.services.feature_service import FeatureSet
 
 
 class StubFeatureService:
-    async def build_features(self, symbol: str, lookback: int | None):
-        return FeaturesResponse(
+    async def build_feature_set(self, symbol: str, lookback: int | None):
+        timestamps = [datetime(2024, 1, day, tzinfo=timezone.utc) for day in (1, 2, 3)]
+        frame = pd.DataFrame(
+            {
+                "timestamp": timestamps,
+                "close": [100.0, 110.0, 120.0],
+                "simple_return": [0.0, 0.1, 0.0909],
+                "moving_average": [100.0, 105.0, 115.0],
+                "rolling_volatility": [0.0, 0.02, 0.03],
+                "return_5d": [0.0, 0.0, 0.0],
+                "zscore_20": [0.0, 0.0, 0.0],
+                "drawdown": [0.0, 0.0, 0.0],
+                "fund_pe_ratio": [0.0, 0.0, 0.0],
+                "fund_pb_ratio": [0.0, 0.0, 0.0],
+                "fund_market_cap": [0.0, 0.0, 0.0],
+            }
+        )
+        return FeatureSet(
             symbol=symbol,
             window_used=lookback or 3,
-            upstream_latest_timestamp=datetime(2024, 1, 3, tzinfo=timezone.utc),
-            features=[
-                FeatureRow(
-                    timestamp=datetime(2024, 1, 1, tzinfo=timezone.utc),
-                    close=100,
-                    simple_return=0.0,
-                    moving_average=100,
-                    rolling_volatility=0.0,
-                ),
-                FeatureRow(
-                    timestamp=datetime(2024, 1, 2, tzinfo=timezone.utc),
-                    close=110,
-                    simple_return=0.1,
-                    moving_average=105,
-                    rolling_volatility=0.02,
-                ),
-                FeatureRow(
-                    timestamp=datetime(2024, 1, 3, tzinfo=timezone.utc),
-                    close=120,
-                    simple_return=0.0909,
-                    moving_average=115,
-                    rolling_volatility=0.03,
-                ),
-            ],
+            upstream_latest_timestamp=timestamps[-1],
+            degraded_input=False,
+            frame=frame,
         )
 
 
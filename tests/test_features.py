@@ -1,6 +1,16 @@
-from datetime import datetime, timezone
+import json
+import math
+from datetime import datetime, timedelta, timezone
 
-from app.features.engineering import compute_features
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.api import responses
+from app.features.engineering import FEATURE_COLUMNS, compute_feature_frame, compute_features, compute_latest_features
+from app.features.streaming import StreamingFeatureEngine
+from app.schemas.p1 import FundamentalsPayload
+from app.services.feature_service import FeatureSet
 from app.schemas.upstream import Candle
 
 
@@ -16,3 +26,130 @@ def test_compute_features_deterministic_values() -> None:
     assert rows[0].simple_return == 0.0
     assert round(rows[1].simple_return, 6) == 0.1
     assert round(rows[2].moving_average, 4) == 115.5
+
+
+def test_compute_feature_frame_matches_row_view() -> None:
+    candles = [
+        Candle(timestamp=datetime(2024, 1, day, tzinfo=timezone.utc), open=100, high=130, low=90, close=100 + day, volume=10)
+        for day in range(1, 11)
+    ]
+
+    frame = compute_feature_frame(candles, ma_window=3, vol_window=3)
+    rows = compute_features(candles, ma_window=3, vol_window=3)
+
+    assert list(frame.columns) == ["timestamp", *FEATURE_COLUMNS]
+    assert len(frame) == len(rows)
+    for column in FEATURE_COLUMNS:
+        assert frame[column].tolist() == [getattr(row, column) for row in rows]
+
+
+def _pandas_reference_frame(candles: list[Candle], ma_window: int, vol_window: int) -> pd.DataFrame:
+    """The row-wise pandas rolling semantics compute_feature_frame replaced."""
+    close = pd.Series([c.close for c in candles], dtype=float)
+    returns = close.pct_change()
+    running_max = close.cummax().replace(0, 1)
+    return pd.DataFrame(
+        {
+            "close": close,
+            "simple_return": returns.fillna(0.0),
+            "moving_average": close.rolling(window=ma_window, min_periods=1).mean(),
+            "rolling_volatility": returns.rolling(window=vol_window, min_periods=1).std().fillna(0.0),
+            "return_5d": close.pct_change(periods=5).fillna(0.0),
+            "zscore_20": ((close - close.rolling(20, min_periods=1).mean()) / close.rolling(20, min_periods=1).std().replace(0, 1)).fillna(0.0),
+            "drawdown": ((close / running_max) - 1.0).fillna(0.0),
+        }
+    )
+
+
+@pytest.mark.parametrize("length", [7, 60])
+def test_compute_feature_frame_matches_pandas_rolling_reference(length: int) -> None:
+    closes = [100.0, 101.5, 99.25, 102.0, 103.75, 101.0, 104.5, 106.0, 105.25, 107.5] * 6
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    candles = [
+        Candle(timestamp=start + timedelta(days=idx), open=close, high=close + 1, low=close - 1, close=close, volume=10)
+        for idx, close in enumerate(closes[:length])
+    ]
+
+    frame = compute_feature_frame(candles, ma_window=5, vol_window=14)
+    reference = _pandas_reference_frame(candles, ma_window=5, vol_window=14)
+
+    for column in reference.columns:
+        np.testing.assert_allclose(frame[column].to_numpy(), reference[column].to_numpy(), rtol=1e-9, atol=1e-12, err_msg=column)
+
+
+@pytest.mark.parametrize("encoder", ["orjson", "pydantic_core"])
+def test_feature_payload_serializes_like_validated_response(monkeypatch, encoder) -> None:
+    if encoder == "pydantic_core":
+        monkeypatch.setattr(responses, "orjson", None)
+    candles = [
+        Candle(timestamp=datetime(2024, 1, day, 12, 30, 0, 250000, tzinfo=timezone.utc), open=100, high=130, low=90, close=100 + day, volume=10)
+        for day in range(1, 8)
+    ]
+    frame = compute_feature_frame(candles, ma_window=3, vol_window=3)
+    frame.loc[0, "zscore_20"] = float("nan")
+    feature_set = FeatureSet(
+        symbol="AAPL", window_used=7, upstream_latest_timestamp=candles[-1].timestamp, degraded_input=False, frame=frame
+    )
+
+    fast = json.loads(responses.dumps(feature_set.to_payload()))
+    assert fast == json.loads(feature_set.to_response().model_dump_json())
+    assert fast["features"][0]["timestamp"] == "2024-01-01T12:30:00.250000Z"
+    assert fast["features"][0]["zscore_20"] is None
+
+
+def _random_walk_candles(length: int, seed: int, flat_tail: bool = False) -> list[Candle]:
+    rng = np.random.default_rng(seed)
+    closes = 100 * np.exp(np.cumsum(rng.normal(0, 0.02, length)))
+    if flat_tail:
+        closes[length // 2:] = closes[length // 2]
+    start = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    return [
+        Candle(timestamp=start + timedelta(days=idx), open=close, high=close, low=close, close=close, volume=1)
+        for idx, close in enumerate(closes)
+    ]
+
+
+@pytest.mark.parametrize("length", [1, 2, 5, 6, 19, 20, 21, 120, 1000])
+@pytest.mark.parametrize("ma_window,vol_window", [(1, 1), (2, 3), (14, 14), (50, 7)])
+@pytest.mark.parametrize("flat_tail", [False, True])
+def test_latest_features_match_last_row_of_full_frame(length: int, ma_window: int, vol_window: int, flat_tail: bool) -> None:
+    candles = _random_walk_candles(length, seed=length * 31 + ma_window, flat_tail=flat_tail)
+    fundamentals = FundamentalsPayload(
+        market_cap=1e12, pe_ratio=25.0, pb_ratio=None, forward_pe=22.0, eps=5.0, revenue=1e9, revenue_growth=0.1,
+        ebitda=1e8, net_income=5e7, debt_to_equity=0.4, roe=0.2, sector="Tech", industry="Software", country="US", currency="USD",
+    )
+
+    full = compute_feature_frame(candles, ma_window=ma_window, vol_window=vol_window, fundamentals=fundamentals)
+    latest = compute_latest_features(candles, ma_window=ma_window, vol_window=vol_window, fundamentals=fundamentals)
+
+    expected = full.iloc[-1]
+    for column in FEATURE_COLUMNS:
+        assert math.isclose(latest[column], float(expected[column]), rel_tol=1e-12, abs_tol=1e-12), column
+
+
+@pytest.mark.parametrize("flat_tail", [False, True])
+def test_streaming_state_tracks_tail_features(flat_tail: bool) -> None:
+    lookback = 60
+    candles = _random_walk_candles(400, seed=7, flat_tail=flat_tail)
+    engine = StreamingFeatureEngine(ma_window=14, vol_window=10, max_symbols=4)
+
+    state = engine.ingest("AAPL", candles[:lookback], lookback=lookback)
+    for end in range(lookback + 1, len(candles) + 1):
+        window = candles[end - lookback:end]
+        expected = compute_latest_features(window, ma_window=14, vol_window=10)
+        peeked = state.peek(window[-1].close)
+        pushed = engine.ingest("AAPL", window[-2:], lookback=lookback).latest()
+        for column, value in peeked.items():
+            assert math.isclose(value, expected[column], rel_tol=1e-9, abs_tol=1e-12), (end, column)
+            assert pushed[column] == value
+
+    assert engine.snapshot()["updates"] == len(candles)
+    state = engine.ingest("AAPL", candles[-lookback:], lookback=lookback)
+    assert state.last_timestamp == candles[-1].timestamp
+    assert engine.snapshot()["reseeds"] == 0
+
+    # A full refetch of the candle history (new generation) rebuilds the state from the given bars.
+    revised = [candle.model_copy(update={"close": candle.close / 2}) for candle in candles[-lookback:]]
+    state = engine.ingest("AAPL", revised, lookback=lookback, generation=2)
+    assert engine.snapshot()["reseeds"] == 1
+    assert math.isclose(state.latest()["close"], candles[-1].close / 2)
@@ -1,9 +1,12 @@
+import asyncio
 from datetime import datetime, timezone
 
 from fastapi.testclient import TestClient
 
-from app.api.dependencies import get_inference_engine
+from app.api.dependencies import get_inference_engine, get_stage_tracker
 from app.main import app
+from app.monitoring.timing import stage
+from app.schemas.ml import PredictResponse
 
 
 class StubInferenceEngine:
@@ -43,3 +46,63 @@ def test_predict_response_schema() -> None:
     assert "timestamp" in body
     assert "request_id" in body
     assert "latency_ms" in body
+
+
+class TimedStubInferenceEngine(StubInferenceEngine):
+    async def predict(self, symbol: str, lookback: int | None = None, version: str | None = None):
+        with stage("model_load"):
+            pass
+        with stage("predict"):
+            return await super().predict(symbol, lookback, version)
+
+
+def test_predict_stage_timings_reach_header_and_monitoring() -> None:
+    get_stage_tracker.cache_clear()
+    app.dependency_overrides[get_inference_engine] = lambda: TimedStubInferenceEngine()
+    try:
+        client = TestClient(app)
+        response = client.get("/predict", params={"symbol": "AAPL"})
+        stages = client.get("/monitoring/stages").json()
+    finally:
+        app.dependency_overrides.clear()
+        get_stage_tracker.cache_clear()
+
+    entries = [item.strip().split(";dur=") for item in response.headers["Server-Timing"].split(",")]
+    assert [name for name, _ in entries] == ["model_load", "predict"]
+    assert all(float(duration) >= 0 for _, duration in entries)
+    assert set(stages["stages"]) == {"model_load", "predict"}
+    assert stages["stages"]["predict"]["count"] == 1
+
+
+class CurrentStubInferenceEngine:
+    async def predict(self, symbol: str, exchange: str = "NASDAQ", lookback: int | None = None, version: str | None = None):
+        return {
+            "exchange": exchange,
+            "symbol": symbol,
+            "prediction": "BUY",
+            "confidence": 0.4,
+            "probability_up": 0.7,
+            "probability_down": 0.3,
+            "risk_score": 0.2,
+            "expected_return": 0.004,
+            "forecast_horizon": "5d",
+            "model_version": "v3",
+            "degraded_input": False,
+            "input_data_status": "healthy",
+            "inference_latency_ms": 1.5,
+            "timestamp": datetime(2024, 1, 1, tzinfo=timezone.utc),
+            "request_id": "req-456",
+        }
+
+
+def test_predict_fast_path_matches_validated_response() -> None:
+    app.dependency_overrides[get_inference_engine] = lambda: CurrentStubInferenceEngine()
+    try:
+        response = TestClient(app).get("/predict", params={"symbol": "aapl"})
+    finally:
+        app.dependency_overrides.clear()
+
+    assert response.status_code == 200
+    expected = PredictResponse.model_validate(asyncio.run(CurrentStubInferenceEngine().predict("AAPL"))).model_dump(mode="json")
+    assert response.json() == expected
+    assert response.json()["timestamp"] == "2024-01-01T00:00:00Z"
@@ -1,9 +1,12 @@
 import asyncio
+from datetime import datetime, timedelta, timezone
 
+import httpx
 import pytest
 
 from app.clients.market_data import MarketDataClient
 from app.core.config import Settings
+from app.monitoring.prometheus import UPSTREAM_ERRORS, UPSTREAM_REQUESTS, UPSTREAM_RETRIES
 
 
 def test_get_candles_raises_for_insufficient_data(monkeypatch) -> None:
@@ -38,3 +41,147 @@ def test_get_candles_raises_for_insufficient_data(monkeypatch) -> None:
     with pytest.raises(Exception) as exc:
         asyncio.run(client.get_candles(symbol="AAPL", lookback=10))
     assert getattr(exc.value, "error", None) == "insufficient_upstream_data"
+
+
+def test_upstream_calls_share_one_pooled_http_client(monkeypatch) -> None:
+    settings = Settings(MARKET_DATA_BASE_URL="https://example.com", MARKET_DATA_RETRY_ATTEMPTS=1)
+    client = MarketDataClient(settings=settings)
+    seen_paths: list[str] = []
+    built: list[httpx.AsyncClient] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        seen_paths.append(request.url.path)
+        return httpx.Response(200, json={"ok": True})
+
+    def build_http_client() -> httpx.AsyncClient:
+        built.append(httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        return built[-1]
+
+    monkeypatch.setattr(client, "_build_http_client", build_http_client)
+
+    async def scenario() -> httpx.AsyncClient:
+        async with client:
+            pooled = client._client()
+            await client._get_with_retry("/quote", {"symbol": "AAPL"})
+            await client._get_with_retry("/market-status", {"exchange": "NASDAQ"})
+            assert client._client() is pooled
+        return pooled
+
+    pooled = asyncio.run(scenario())
+    assert built == [pooled]
+    assert seen_paths == ["/quote", "/market-status"]
+    assert pooled.is_closed
+
+
+def test_get_candles_fetches_only_delta_after_first_call(monkeypatch) -> None:
+    settings = Settings(MARKET_DATA_BASE_URL="https://example.com", MARKET_DATA_RETRY_ATTEMPTS=1)
+    client = MarketDataClient(settings=settings)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    history = [now - timedelta(days=offset) for offset in range(5, 0, -1)]
+    requested_starts: list[str] = []
+
+    def candle(ts: datetime, close: float) -> dict:
+        return {"timestamp": ts.isoformat(), "open": close, "high": close + 1, "low": close - 1, "close": close, "volume": 10}
+
+    async def fake_get_with_retry(path, params):
+        requested_starts.append(params["start"])
+        start = datetime.fromisoformat(params["start"])
+        candles = [candle(ts, 100.0 + idx) for idx, ts in enumerate(history) if ts >= start]
+        return {"schema_version": "1.1", "status": "ok", "exchange": "NASDAQ", "symbol": "AAPL", "interval": "1d", "candles": candles}
+
+    monkeypatch.setattr(client, "_get_with_retry", fake_get_with_retry)
+
+    first = asyncio.run(client.get_candles(symbol="AAPL", lookback=3))
+    history.append(now)
+    second = asyncio.run(client.get_candles(symbol="AAPL", lookback=3))
+
+    assert [c.timestamp for c in first.candles] == history[2:5]
+    assert [c.timestamp for c in second.candles] == history[3:6]
+    assert datetime.fromisoformat(requested_starts[1]) == history[4]
+    stats = client.candle_cache_stats()
+    assert stats["full_fetches"] == 1
+    assert stats["delta_fetches"] == 1
+    assert stats["candles"] == 6
+
+
+def test_get_candles_refetches_when_overlapping_bar_is_adjusted(monkeypatch) -> None:
+    settings = Settings(MARKET_DATA_BASE_URL="https://example.com", MARKET_DATA_RETRY_ATTEMPTS=1)
+    client = MarketDataClient(settings=settings)
+    now = datetime.now(timezone.utc).replace(microsecond=0)
+    history = [now - timedelta(days=offset) for offset in range(5, 0, -1)]
+    ratio = {"value": 1.0}
+    requested_starts: list[str] = []
+
+    async def fake_get_with_retry(path, params):
+        requested_starts.append(params["start"])
+        start = datetime.fromisoformat(params["start"])
+        candles = [
+            {"timestamp": ts.isoformat(), "open": price, "high": price, "low": price, "close": price, "volume": 10}
+            for ts, price in ((ts, (100.0 + idx) * ratio["value"]) for idx, ts in enumerate(history))
+            if ts >= start
+        ]
+        return {"schema_version": "1.1", "status": "ok", "exchange": "NASDAQ", "symbol": "AAPL", "interval": "1d", "candles": candles}
+
+    monkeypatch.setattr(client, "_get_with_retry", fake_get_with_retry)
+
+    asyncio.run(client.get_candles(symbol="AAPL", lookback=3))
+    generation = client.candle_generation("AAPL")
+    # A 2:1 split rescales every bar upstream, including the one the delta restates.
+    ratio["value"] = 0.5
+    history.append(now)
+    adjusted = asyncio.run(client.get_candles(symbol="AAPL", lookback=3))
+
+    assert [c.close for c in adjusted.candles] == [51.5, 52.0, 52.5]
+    assert len(requested_starts) == 3
+    stats = client.candle_cache_stats()
+    assert (stats["full_fetches"], stats["delta_fetches"], stats["resets"]) == (2, 1, 1)
+    assert client.candle_generation("AAPL") != generation
+
+
+def test_upstream_retries_and_error_codes_are_counted(monkeypatch) -> None:
+    settings = Settings(MARKET_DATA_BASE_URL="https://example.com", MARKET_DATA_RETRY_ATTEMPTS=2, MARKET_DATA_RETRY_BACKOFF_SECONDS=0)
+    client = MarketDataClient(settings=settings)
+    responses = [
+        httpx.Response(
+            429,
+            json={"schema_version": "1.1", "status": "error", "error_code": "RATE_LIMITED", "message": "slow down", "exchange": "NASDAQ"},
+        ),
+        httpx.Response(200, json={"ok": True}),
+    ]
+    monkeypatch.setattr(
+        client, "_build_http_client", lambda: httpx.AsyncClient(transport=httpx.MockTransport(lambda request: responses.pop(0)))
+    )
+    retries, errors, ok = UPSTREAM_RETRIES.labels("/quote"), UPSTREAM_ERRORS.labels("/quote", "RATE_LIMITED"), UPSTREAM_REQUESTS.labels("/quote", "ok")
+    before = retries.value(), errors.value(), ok.value()
+
+    async def scenario() -> None:
+        async with client:
+            await client._get_with_retry("/quote", {"symbol": "AAPL"})
+
+    asyncio.run(scenario())
+    assert (retries.value(), errors.value(), ok.value()) == (before[0] + 1, before[1] + 1, before[2] + 1)
+
+
+def test_aclose_when_idle_waits_for_in_flight_calls() -> None:
+    settings = Settings(MARKET_DATA_BASE_URL="https://example.com", MARKET_DATA_RETRY_ATTEMPTS=1)
+    release = asyncio.Event()
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await release.wait()
+        return httpx.Response(200, json={"ok": True})
+
+    async def scenario() -> dict:
+        client = MarketDataClient(settings=settings, http_client=httpx.AsyncClient(transport=httpx.MockTransport(handler)))
+        client._owns_http_client = True
+        in_flight = asyncio.create_task(client._get_with_retry("/quote", {"symbol": "AAPL"}))
+        await asyncio.sleep(0)
+        closing = asyncio.create_task(client.aclose_when_idle(timeout=5.0))
+        await asyncio.sleep(0.1)
+        assert not closing.done()
+        release.set()
+        payload = await in_flight
+        await closing
+        assert client._http_client is None
+        return payload
+
+    assert asyncio.run(scenario()) == {"ok": True}
@@ -5,8 +5,11 @@ import pytest
 
 from app.clients.market_data import MarketDataClient
 from app.core.config import Settings
-from app.exceptions import DataValidationError
+from app.exceptions import DataValidationError, ServiceError
+from app.features.engineering import FEATURE_COLUMNS
+from app.ml.batching import MicroBatcher
 from app.ml.inference import InferenceEngine
+from app.monitoring.timing import begin_request, end_request, stage
 from app.schemas.p1 import SCHEMA_VERSION
 
 
@@ -94,6 +97,9 @@ def test_degraded_flag_propagation(monkeypatch):
 
 def test_inference_latency_field_present(monkeypatch):
     class DummyRegistry:
+        def get_active_version(self):
+            return "v1"
+
         def load_model(self, version=None):
             class M:
                 def predict(self, x):
@@ -111,8 +117,8 @@ def test_inference_latency_field_present(monkeypatch):
         async def get_quote(self, symbol, exchange):
             return type("Q", (), {"timestamp": datetime.now(timezone.utc)})()
 
-        async def build_features(self, symbol, lookback, exchange):
-            row = type("F", (), {
+        async def build_latest_features(self, symbol, lookback, exchange):
+            latest = {
                 "close": 1.0,
                 "simple_return": 0.1,
                 "moving_average": 1.0,
@@ -123,8 +129,8 @@ def test_inference_latency_field_present(monkeypatch):
                 "fund_pe_ratio": 10.0,
                 "fund_pb_ratio": 1.0,
                 "fund_market_cap": 100.0,
-            })()
-            return type("R", (), {"features": [row], "degraded_input": True, "upstream_latest_timestamp": datetime.now(timezone.utc)})()
+            }
+            return type("R", (), {"latest": lambda self: latest, "degraded_input": True, "upstream_latest_timestamp": datetime.now(timezone.utc)})()
 
     class Dummy:
         def record(self, *args, **kwargs):
@@ -137,10 +143,250 @@ def test_inference_latency_field_present(monkeypatch):
             return None
 
     class DummyAudit:
-        def log_prediction(self, **kwargs):
+        async def log_prediction_async(self, **kwargs):
             return {"request_id": "r1", "timestamp": datetime.now(timezone.utc).isoformat()}
 
     engine = InferenceEngine(DummyFeatureService(), DummyRegistry(), 10, DummyAudit(), Dummy(), Dummy(), Dummy())
     payload = asyncio.run(engine.predict("AAPL"))
     assert "inference_latency_ms" in payload
     assert payload["degraded_input"] is True
+
+    async def timed_predict():
+        timings, token = begin_request()
+        try:
+            await engine.predict("AAPL")
+        finally:
+            end_request(token)
+        return timings
+
+    timings = asyncio.run(timed_predict())
+    assert set(timings.stages) == {"model_load", "market_status", "quote", "predict", "audit"}
+    # Outside a timed request every stage is the same shared no-op.
+    assert stage("predict") is stage("audit")
+
+
+def test_feature_fan_out_is_concurrent_and_cancels_on_failure(monkeypatch):
+    client = MarketDataClient(_settings())
+    cancelled: list[str] = []
+
+    async def fake_get(path, params):
+        if path == "/historical":
+            await asyncio.sleep(0)
+            raise DataValidationError(error="upstream_schema_mismatch", details="bad candles", status_code=422)
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(path)
+            raise
+        raise AssertionError("fundamentals call should have been cancelled")
+
+    monkeypatch.setattr(client, "_get_with_retry", fake_get)
+
+    from app.services.feature_service import FeatureService
+
+    svc = FeatureService(client, _settings())
+    with pytest.raises(DataValidationError) as exc:
+        asyncio.run(svc.build_features("AAPL", lookback=2))
+    assert exc.value.error == "upstream_schema_mismatch"
+    assert cancelled == ["/fundamentals"]
+
+
+def test_batch_inference_scores_symbols_in_one_model_call():
+    calls = {"market_status": 0, "predict_rows": []}
+
+    class BatchModel:
+        def predict(self, x):
+            calls["predict_rows"].append(len(x))
+            return [0.4] * len(x)
+
+    class DummyRegistry:
+        def get_active_version(self):
+            return "v1"
+
+        def load_model(self, version=None):
+            if version == "v404":
+                raise FileNotFoundError("Model version not found: v404")
+            return BatchModel(), {"version": "v1"}
+
+    class DummyFeatureService:
+        def __init__(self):
+            self._market_data_client = self
+
+        async def get_market_status(self, exchange):
+            calls["market_status"] += 1
+            return type("S", (), {"is_open": True})()
+
+        async def get_quote(self, symbol, exchange):
+            if symbol == "MSFT":
+                raise DataValidationError(error="stale_quote", details="too old", status_code=422)
+            return type("Q", (), {"timestamp": datetime.now(timezone.utc)})()
+
+        async def build_latest_features(self, symbol, lookback, exchange):
+            latest = {col: 0.01 for col in FEATURE_COLUMNS}
+            return type("R", (), {"latest": lambda self: latest, "degraded_input": False, "upstream_latest_timestamp": datetime.now(timezone.utc)})()
+
+    class Dummy:
+        def record(self, *args, **kwargs):
+            return None
+
+        def record_upstream_seen(self, *args, **kwargs):
+            return None
+
+        def record_prediction(self, *args, **kwargs):
+            return None
+
+    class DummyAudit:
+        async def log_prediction_async(self, **kwargs):
+            return {"request_id": "r1", "timestamp": datetime.now(timezone.utc).isoformat()}
+
+    engine = InferenceEngine(DummyFeatureService(), DummyRegistry(), 10, DummyAudit(), Dummy(), Dummy(), Dummy(), batch_concurrency=2)
+    results = asyncio.run(engine.predict_batch(["AAPL", "MSFT", "GOOGL"]))
+
+    assert [item["symbol"] for item in results] == ["AAPL", "MSFT", "GOOGL"]
+    assert results[1] == {"symbol": "MSFT", "error": "stale_quote"}
+    assert results[0]["prediction"] == "BUY"
+    assert calls["market_status"] == 1
+    assert calls["predict_rows"] == [2]
+
+    # An unknown version fails each item with the error message, not the whole batch.
+    missing = asyncio.run(engine.predict_batch(["AAPL", "GOOGL"], version="v404"))
+    assert missing == [{"symbol": symbol, "error": "Model version not found: v404"} for symbol in ["AAPL", "GOOGL"]]
+
+
+def test_concurrent_predicts_are_micro_batched():
+    calls = {"market_status": 0, "quotes": [], "predict_rows": []}
+
+    class BatchModel:
+        def predict(self, x):
+            calls["predict_rows"].append(len(x))
+            return [0.4] * len(x)
+
+    class DummyRegistry:
+        def get_active_version(self):
+            return "v1"
+
+        def load_model(self, version=None):
+            return BatchModel(), {"version": "v1"}
+
+    class DummyFeatureService:
+        def __init__(self):
+            self._market_data_client = self
+
+        async def get_market_status(self, exchange):
+            calls["market_status"] += 1
+            return type("S", (), {"is_open": True})()
+
+        async def get_quote(self, symbol, exchange):
+            calls["quotes"].append(symbol)
+            if symbol == "MSFT":
+                raise DataValidationError(error="stale_quote", details="too old", status_code=422)
+            return type("Q", (), {"timestamp": datetime.now(timezone.utc)})()
+
+        async def build_latest_features(self, symbol, lookback, exchange):
+            latest = {col: 0.01 for col in FEATURE_COLUMNS}
+            return type("R", (), {"latest": lambda self: latest, "degraded_input": False, "upstream_latest_timestamp": datetime.now(timezone.utc)})()
+
+    class Dummy:
+        def record(self, *args, **kwargs):
+            return None
+
+        def record_upstream_seen(self, *args, **kwargs):
+            return None
+
+        def record_prediction(self, *args, **kwargs):
+            return None
+
+    class DummyAudit:
+        async def log_prediction_async(self, **kwargs):
+            return {"request_id": "r1", "timestamp": datetime.now(timezone.utc).isoformat()}
+
+    engine = InferenceEngine(DummyFeatureService(), DummyRegistry(), 10, DummyAudit(), Dummy(), Dummy(), Dummy(), batch_window_ms=5, batch_max_size=8)
+
+    async def burst():
+        return await asyncio.gather(*(engine.predict(symbol) for symbol in ["AAPL", "AAPL", "MSFT", "GOOGL"]), return_exceptions=True)
+
+    results = asyncio.run(burst())
+
+    assert [item["symbol"] for item in (results[0], results[1], results[3])] == ["AAPL", "AAPL", "GOOGL"]
+    assert isinstance(results[2], DataValidationError) and results[2].error == "stale_quote"
+    assert calls["market_status"] == 1
+    assert sorted(calls["quotes"]) == ["AAPL", "GOOGL", "MSFT"]
+    assert calls["predict_rows"] == [3]
+    stats = engine.batching_stats()
+    assert stats["batches"] == 1 and stats["requests"] == 4 and stats["deduplicated_lookups"] == 1
+
+
+def test_micro_batch_shares_stage_timings_and_fails_callers_when_cancelled():
+    async def handler(items):
+        with stage("predict"):
+            await asyncio.sleep(0.01)
+        return [item * 2 for item in items]
+
+    async def hang(items):
+        await asyncio.sleep(10)
+
+    async def call(batcher, item):
+        timings, token = begin_request()
+        try:
+            return await batcher.submit(item), timings.stages
+        finally:
+            end_request(token)
+
+    async def scenario():
+        batcher = MicroBatcher(handler, window_ms=1, max_batch_size=8)
+        results = await asyncio.gather(call(batcher, 1), call(batcher, 2))
+
+        stuck = MicroBatcher(hang, window_ms=1, max_batch_size=8)
+        waiting = asyncio.gather(stuck.submit(1), stuck.submit(2), return_exceptions=True)
+        await asyncio.sleep(0.01)
+        for task in list(stuck._running):
+            task.cancel()
+        return results, await asyncio.wait_for(waiting, timeout=1)
+
+    results, cancelled = asyncio.run(scenario())
+    assert [value for value, _ in results] == [2, 4]
+    assert all(stages["predict"] >= 5 for _, stages in results)
+    assert all(isinstance(exc, ServiceError) and exc.error == "batch_cancelled" for exc in cancelled)
+
+
+def test_fundamentals_cache_shares_concurrent_misses(monkeypatch):
+    client = MarketDataClient(_settings())
+    fetched: list[str] = []
+    now = datetime.now(timezone.utc)
+
+    async def fake_get(path, params):
+        if path == "/historical":
+            return {
+                "schema_version": SCHEMA_VERSION,
+                "status": "ok",
+                "exchange": "NASDAQ",
+                "symbol": "AAPL",
+                "interval": "1d",
+                "candles": [_candle(now - timedelta(days=2)), _candle(now - timedelta(days=1))],
+            }
+        fetched.append(path)
+        await asyncio.sleep(0.01)
+        return {
+            "schema_version": SCHEMA_VERSION,
+            "status": "ok",
+            "exchange": "NASDAQ",
+            "symbol": "AAPL",
+            "fundamentals": {"market_cap": 1000.0, "pe_ratio": 10.0, "forward_pe": 9.0, "eps": 5.0, "revenue": 100.0, "revenue_growth": 0.1, "ebitda": 20.0, "net_income": 10.0, "debt_to_equity": 0.5, "roe": 0.12, "sector": "Tech", "industry": "Software", "country": "US", "currency": "USD"},
+        }
+
+    monkeypatch.setattr(client, "_get_with_retry", fake_get)
+
+    from app.services.feature_service import FeatureService
+
+    svc = FeatureService(client, _settings())
+
+    async def scenario():
+        await asyncio.gather(*(svc.build_features("AAPL", lookback=2) for _ in range(3)))
+        await svc.build_features("AAPL", lookback=2)
+
+    asyncio.run(scenario())
+    stats = svc.cache_stats()["fundamentals"]
+    assert fetched == ["/fundamentals"]
+    assert stats["misses"] == 1
+    assert stats["coalesced"] == 2
+    assert stats["hits"] == 1
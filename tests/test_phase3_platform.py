@@ -1,8 +1,14 @@
 from __future__ import annotations
 
+import asyncio
+import json
+import time
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
+from types import SimpleNamespace
 
 import numpy as np
+import pytest
 from fastapi.testclient import TestClient
 
 from app.api.dependencies import (
@@ -10,15 +16,20 @@ from app.api.dependencies import (
     get_drift_detector,
     get_freshness_tracker,
     get_latency_tracker,
+    get_model_cache,
     get_model_registry,
+    reset_runtime_state,
 )
 from app.logging.audit import PredictionAuditLogger
+from app.logging.segments import read_tail_lines
 from app.main import app
 from app.ml.modeling import LinearRegressor
 from app.ml.registry import ModelRegistry
-from app.monitoring.drift import DriftDetector
+from app.monitoring.accuracy import LiveAccuracyJob
+from app.monitoring.drift import DriftDetector, quantile_histogram
 from app.monitoring.freshness import FreshnessTracker
 from app.monitoring.metrics import LatencyTracker
+from app.monitoring.prometheus import REGISTRY, MetricsRegistry
 
 
 def _build_registry(tmp_path: Path) -> ModelRegistry:
@@ -77,6 +88,95 @@ def test_drift_detection_thresholds() -> None:
     assert drifted["status"] == "drift_detected"
 
 
+def test_histogram_drift_tracks_window_bin_counts() -> None:
+    rng = np.random.default_rng(11)
+    histograms = {"close": quantile_histogram(rng.normal(5.0, 1.0, 5000))}
+    baseline = {"close": {"mean": 5.0, "std": 1.0}}
+    detector = DriftDetector(threshold=10.0, window_size=400, psi_threshold=0.2)
+
+    for value in rng.normal(5.0, 1.0, 400):
+        detector.record({"close": value})
+    healthy = detector.evaluate(baseline, histograms=histograms)
+    assert healthy["status"] == "healthy"
+    assert healthy["details"]["close"]["psi"] < 0.1
+
+    shifted = rng.normal(6.0, 0.3, 400)
+    for value in shifted:
+        detector.record({"close": value})
+    drifted = detector.evaluate(baseline, histograms=histograms)
+    assert drifted["status"] == "drift_detected"
+    assert drifted["details"]["close"]["psi"] > 0.2 and drifted["details"]["close"]["ks_statistic"] > 0.2
+
+    inner_edges = np.asarray(histograms["close"]["edges"][1:-1])
+    expected_counts = np.bincount(np.searchsorted(inner_edges, shifted, side="right"), minlength=len(inner_edges) + 1)
+    np.testing.assert_array_equal(detector._bin_counts[0], expected_counts)
+    assert detector._bin_ring.dtype == np.uint8
+
+
+def test_drift_window_stats_match_numpy_over_sliding_window() -> None:
+    rng = np.random.default_rng(7)
+    detector = DriftDetector(threshold=0.2, window_size=64)
+    closes = 1000.0 + rng.normal(0.0, 0.5, 1000)
+    returns = rng.normal(0.0, 0.01, 1000)
+    for idx in range(1000):
+        features = {"close": closes[idx]} if idx % 3 else {"close": closes[idx], "simple_return": returns[idx]}
+        detector.record(features)
+
+    mean, std, samples = detector.window_stats(["close", "simple_return", "unseen"])
+    sampled_returns = returns[::3][-64:]
+    assert samples.tolist() == [64, 64, 0]
+    np.testing.assert_allclose(mean[:2], [closes[-64:].mean(), sampled_returns.mean()], rtol=1e-12, atol=1e-15)
+    np.testing.assert_allclose(std[:2], [closes[-64:].std(), sampled_returns.std()], rtol=1e-9)
+    assert mean[2] == std[2] == 0.0
+
+
+def test_latency_tracker_reports_quantiles_history_and_breakdown(monkeypatch) -> None:
+    clock = {"now": 1_700_000_000.0}
+    monkeypatch.setattr("app.monitoring.metrics.time.time", lambda: clock["now"])
+    tracker = LatencyTracker(retention_minutes=2)
+    samples = np.random.default_rng(3).lognormal(mean=2.0, sigma=0.8, size=5000)
+    for value in samples:
+        tracker.record(float(value), endpoint="predict", model_version="v1")
+    clock["now"] += 60
+    tracker.record(250.0, endpoint="features")
+
+    snapshot = tracker.snapshot()
+    assert snapshot["recent_calls"] == 5001
+    assert snapshot["max_ms"] == 250.0
+    for name, q in [("p50_ms", 0.5), ("p95_ms", 0.95), ("p99_ms", 0.99)]:
+        assert snapshot[name] == pytest.approx(np.quantile(np.append(samples, 250.0), q), rel=0.03)
+    assert [point["count"] for point in snapshot["history"]] == [5000, 1]
+    assert {(item["endpoint"], item["model_version"]) for item in snapshot["breakdown"]} == {("predict", "v1"), ("features", None)}
+
+    clock["now"] += 60
+    assert tracker.snapshot()["recent_calls"] == 1
+
+
+def test_metrics_registry_renders_bounded_prometheus_text() -> None:
+    registry = MetricsRegistry()
+    requests = registry.counter("demo_requests_total", "Requests.", ["route"], max_series=2)
+    latency = registry.histogram("demo_latency_seconds", "Latency.", buckets=[0.1, 1.0])
+    queued = registry.gauge("demo_queued", "Queued.")
+    for route in ["/a", "/a", "/b", "/c", "/d"]:
+        requests.labels(route).inc()
+    for value in [0.05, 0.5, 5.0]:
+        latency.observe(value)
+    queued.set_function(lambda: 3)
+
+    text = registry.render()
+    assert registry.counter("demo_requests_total", "Requests.", ["route"]) is requests
+    assert 'demo_requests_total{route="/a"} 2' in text
+    assert 'demo_requests_total{route="other"} 2' in text
+    assert "# TYPE demo_latency_seconds histogram" in text
+    assert 'demo_latency_seconds_bucket{le="0.1"} 1' in text
+    assert 'demo_latency_seconds_bucket{le="1"} 2' in text
+    assert 'demo_latency_seconds_bucket{le="+Inf"} 3' in text
+    assert "demo_latency_seconds_sum 5.55" in text and "demo_latency_seconds_count 3" in text
+    assert "demo_queued 3" in text
+    with pytest.raises(ValueError):
+        registry.gauge("demo_requests_total", "Requests.")
+
+
 def test_prediction_audit_logging(tmp_path: Path) -> None:
     logger = PredictionAuditLogger(log_file=str(tmp_path / "audit.log"), limit=10)
     record = logger.log_prediction(
@@ -89,6 +189,227 @@ def test_prediction_audit_logging(tmp_path: Path) -> None:
     assert logger.get_recent(limit=1)[0]["model_version"] == "v1"
 
 
+def test_buffered_audit_writer_group_commits_and_flushes_on_close(tmp_path: Path) -> None:
+    log_file = tmp_path / "audit.log"
+    logger = PredictionAuditLogger(log_file=str(log_file), limit=10, batch_size=50, flush_interval_seconds=5.0)
+    for idx in range(20):
+        logger.log_prediction(model_version="v1", features={"close": float(idx)}, prediction=0.4, latency_ms=1.0)
+    logger.close()
+
+    lines = log_file.read_text(encoding="utf-8").splitlines()
+    assert [json.loads(line)["features"]["close"] for line in lines] == [float(idx) for idx in range(20)]
+    stats = logger.snapshot()
+    assert stats["written"] == 20 and stats["batches"] == 1 and stats["dropped"] == 0
+
+
+def test_buffered_audit_writer_drops_and_counts_when_full(tmp_path: Path) -> None:
+    logger = PredictionAuditLogger(
+        log_file=str(tmp_path / "audit.log"), limit=10, queue_size=2, flush_interval_seconds=0.0, overflow="drop"
+    )
+    logger._file_lock.acquire()
+    try:
+        logger.log_prediction(model_version="v1", features={"close": 1.0}, prediction=0.4, latency_ms=1.0)
+        while logger.snapshot()["queued"]:
+            time.sleep(0.001)
+        for _ in range(10):
+            logger.log_prediction(model_version="v1", features={"close": 1.0}, prediction=0.4, latency_ms=1.0)
+    finally:
+        logger._file_lock.release()
+    logger.close()
+
+    stats = logger.snapshot()
+    assert stats["dropped"] >= 7
+    assert stats["written"] + stats["dropped"] == 11
+
+
+def test_async_audit_back_pressure_waits_off_the_loop_and_close_refuses_writes(tmp_path: Path) -> None:
+    log_file = tmp_path / "audit.log"
+    logger = PredictionAuditLogger(log_file=str(log_file), limit=10, queue_size=1, flush_interval_seconds=0.0)
+    fields = {"model_version": "v1", "features": {"close": 1.0}, "prediction": 0.4, "latency_ms": 1.0}
+
+    async def scenario() -> int:
+        ticks = 0
+
+        async def ticker() -> None:
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.001)
+
+        ticking = asyncio.create_task(ticker())
+        logger._file_lock.acquire()
+        try:
+            writes = asyncio.gather(*(logger.log_prediction_async(**fields) for _ in range(5)))
+            await asyncio.sleep(0.05)
+            stalled_ticks = ticks
+        finally:
+            logger._file_lock.release()
+        await writes
+        ticking.cancel()
+        return stalled_ticks
+
+    assert asyncio.run(scenario()) > 5
+    logger.close()
+    assert logger.snapshot()["written"] == 5 and logger.snapshot()["dropped"] == 0
+
+    logger.log_prediction(**fields)
+    assert logger._writer is None
+    assert logger.snapshot()["dropped"] == 1
+    assert len(log_file.read_text(encoding="utf-8").splitlines()) == 5
+
+
+def test_recent_predictions_rebuilt_from_file_tail(tmp_path: Path) -> None:
+    log_file = tmp_path / "audit.log"
+    writer = PredictionAuditLogger(log_file=str(log_file), limit=5, buffered=False)
+    for idx in range(50):
+        writer.log_prediction(model_version="v1", features={"close": float(idx)}, prediction=0.4, latency_ms=1.0)
+    assert [entry["features"]["close"] for entry in writer.get_recent(limit=3)] == [47.0, 48.0, 49.0]
+
+    assert read_tail_lines(log_file, 3, block_size=16) == log_file.read_text(encoding="utf-8").splitlines()[-3:]
+    restarted = PredictionAuditLogger(log_file=str(log_file), limit=5)
+    assert [entry["features"]["close"] for entry in restarted.get_recent()] == [45.0, 46.0, 47.0, 48.0, 49.0]
+
+
+def test_audit_segments_rotate_and_answer_indexed_queries(tmp_path: Path) -> None:
+    log_file = tmp_path / "audit.log"
+    logger = PredictionAuditLogger(log_file=str(log_file), limit=5, buffered=False, segment_max_bytes=600, compress_segments=True)
+    records = [
+        logger.log_prediction(model_version=f"v{idx % 2}", features={"close": float(idx)}, prediction=0.4, latency_ms=1.0)
+        for idx in range(12)
+    ]
+
+    sealed = sorted(tmp_path.glob("audit.log.*.gz"))
+    assert len(sealed) >= 2
+    index = json.loads((tmp_path / f"{sealed[0].name[:-3]}.idx.json").read_text(encoding="utf-8"))
+    assert sum(index["model_versions"].values()) == index["records"] == len(index["request_ids"])
+
+    restarted = PredictionAuditLogger(log_file=str(log_file), limit=5, segment_max_bytes=600, compress_segments=True)
+    assert restarted.find(records[0]["request_id"]) == records[0]
+    assert restarted.find(records[-1]["request_id"]) == records[-1]
+    assert restarted.find("missing") is None
+    start, end = records[3]["timestamp"], records[8]["timestamp"]
+    window = restarted.query(start=datetime.fromisoformat(start), end=datetime.fromisoformat(end))
+    assert [entry["request_id"] for entry in window] == [record["request_id"] for record in records if start <= record["timestamp"] <= end]
+    assert [entry["request_id"] for entry in restarted.get_recent()] == [record["request_id"] for record in records[-5:]]
+
+
+def test_audit_segments_recover_missing_indexes_and_seal_legacy_logs(tmp_path: Path) -> None:
+    log_file = tmp_path / "audit.log"
+    legacy = PredictionAuditLogger(log_file=str(log_file), limit=3, buffered=False)
+    records = [legacy.log_prediction(model_version="v1", features={"close": float(idx)}, prediction=0.4, latency_ms=1.0) for idx in range(10)]
+
+    # Larger than the segment size: sealed on startup without being parsed, indexed on first lookup.
+    restarted = PredictionAuditLogger(log_file=str(log_file), limit=3, buffered=False, segment_max_bytes=600)
+    assert (tmp_path / "audit.log.000001").exists() and not (tmp_path / "audit.log.000001.idx.json").exists()
+    assert [entry["request_id"] for entry in restarted.get_recent()] == [record["request_id"] for record in records[-3:]]
+    more = [restarted.log_prediction(model_version="v2", features={"close": 1.0}, prediction=0.4, latency_ms=1.0) for _ in range(8)]
+    assert restarted.find(records[4]["request_id"]) == records[4]
+    assert (tmp_path / "audit.log.000001.idx.json").exists()
+
+    # A crash between sealing a segment and writing its index must not hide the segment.
+    sealed_indexes = sorted(tmp_path.glob("audit.log.*.idx.json"))
+    assert len(sealed_indexes) >= 2
+    sealed_indexes[-1].unlink()
+    recovered = PredictionAuditLogger(log_file=str(log_file), limit=3, buffered=False, segment_max_bytes=600)
+    window = recovered.query()
+    assert [entry["request_id"] for entry in window] == [record["request_id"] for record in records + more]
+
+    loads = []
+    original = recovered._segments._load_index
+    recovered._segments._load_index = lambda segment: loads.append(segment) or original(segment)
+    recovered.find("missing")
+    recovered.find("missing")
+    assert len(loads) == len(set(loads)) == min(len(recovered._segments.snapshot()["sealed"]), 4)
+
+
+def test_audit_segment_offsets_follow_the_file_with_two_writers(tmp_path: Path) -> None:
+    log_file = tmp_path / "audit.log"
+    first = PredictionAuditLogger(log_file=str(log_file), limit=3, buffered=False)
+    second = PredictionAuditLogger(log_file=str(log_file), limit=3, buffered=False)
+    records = [
+        (writer, writer.log_prediction(model_version="v1", features={"close": float(idx)}, prediction=0.4, latency_ms=1.0))
+        for idx in range(6)
+        for writer in (first, second)
+    ]
+    assert all(writer.find(record["request_id"]) == record for writer, record in records)
+
+    # Lines moved by an external tool: the stale offset is detected and the segment rescanned.
+    lines = log_file.read_text(encoding="utf-8").splitlines(keepends=True)
+    log_file.write_text("".join(reversed(lines)), encoding="utf-8")
+    assert all(writer.find(record["request_id"]) == record for writer, record in records)
+
+
+def test_read_frame_keeps_sealed_frames_within_cache_budget(tmp_path: Path) -> None:
+    logger = PredictionAuditLogger(log_file=str(tmp_path / "audit.log"), limit=5, buffered=False, segment_max_bytes=600)
+    for idx in range(12):
+        logger.log_prediction(model_version="v1", features={"close": float(idx)}, prediction=float(idx), latency_ms=1.0)
+    logger.read_frame(["prediction"])
+    budget = 2 * max(size for _, size in logger._sealed_frames.values())
+    logger = PredictionAuditLogger(log_file=str(tmp_path / "audit.log"), limit=5, buffered=False, segment_max_bytes=600, frame_cache_bytes=budget)
+
+    for _ in range(2):
+        frame = logger.read_frame(["prediction"])
+        assert frame["prediction"].tolist() == [float(idx) for idx in range(12)]
+        assert 0 < len(logger._sealed_frames) < len(logger._segments.snapshot()["sealed"])
+        assert logger._sealed_frames_bytes <= budget
+
+
+def test_live_accuracy_job_joins_predictions_with_realized_returns(tmp_path: Path) -> None:
+    audit_logger = PredictionAuditLogger(log_file=str(tmp_path / "audit.log"), limit=10, buffered=False)
+    for symbol, probability_up in [("AAPL", 0.7), ("MSFT", 0.6), ("GOOGL", 0.4)]:
+        audit_logger.log_prediction(
+            model_version="v1", features={}, prediction=probability_up, latency_ms=1.0, symbol=symbol, exchange="NASDAQ"
+        )
+
+    now = datetime.now(timezone.utc)
+    closes = {"AAPL": [100.0, 110.0], "MSFT": [100.0, 95.0]}
+
+    class StubMarketData:
+        def cached_candles(self, symbol, exchange):
+            if symbol not in closes:
+                return None
+            timestamps = [now - timedelta(days=1), now + timedelta(days=1)]
+            return SimpleNamespace(candles=[SimpleNamespace(timestamp=ts, close=close) for ts, close in zip(timestamps, closes[symbol])])
+
+        async def get_historical(self, **kwargs):
+            raise RuntimeError("upstream down")
+
+    job = LiveAccuracyJob(audit_logger, StubMarketData(), output_file=str(tmp_path / "accuracy.json"))
+    payload = asyncio.run(job.run())
+
+    assert payload["predictions"] == 3 and payload["resolved"] == 2
+    version = payload["by_version"][0]
+    assert version["model_version"] == "v1"
+    assert version["hit_rate"] == pytest.approx(0.5)
+    assert version["rmse"] == pytest.approx(np.sqrt(((0.4 - 0.1) ** 2 + (0.2 + 0.05) ** 2) / 2))
+    assert sum(item["predictions"] for item in version["calibration"]) == 2
+    assert payload["by_day"][0]["day"] == now.strftime("%Y-%m-%d")
+    assert job.load() == json.loads(json.dumps(payload))
+
+
+def test_live_accuracy_job_bounds_concurrent_candle_fetches(tmp_path: Path) -> None:
+    audit_logger = PredictionAuditLogger(log_file=str(tmp_path / "audit.log"), limit=10, buffered=False)
+    for idx in range(10):
+        audit_logger.log_prediction(model_version="v1", features={}, prediction=0.6, latency_ms=1.0, symbol=f"SYM{idx}")
+    in_flight = {"now": 0, "peak": 0, "calls": 0}
+
+    class StubMarketData:
+        def cached_candles(self, symbol, exchange):
+            return None
+
+        async def get_historical(self, **kwargs):
+            in_flight["now"] += 1
+            in_flight["calls"] += 1
+            in_flight["peak"] = max(in_flight["peak"], in_flight["now"])
+            await asyncio.sleep(0.01)
+            in_flight["now"] -= 1
+            return SimpleNamespace(candles=[])
+
+    job = LiveAccuracyJob(audit_logger, StubMarketData(), output_file=str(tmp_path / "accuracy.json"), concurrency=3)
+    assert asyncio.run(job.run())["resolved"] == 0
+    assert in_flight["calls"] == 10 and in_flight["peak"] == 3
+
+
 def test_monitoring_endpoints_and_metadata_integrity(tmp_path: Path) -> None:
     registry = _build_registry(tmp_path)
     audit_logger = PredictionAuditLogger(log_file=str(tmp_path / "audit.log"), limit=20)
@@ -132,9 +453,43 @@ def test_monitoring_endpoints_and_metadata_integrity(tmp_path: Path) -> None:
         assert latency_response.status_code == 200
         assert latency_response.json()["recent_calls"] == 3
 
-        audit_logger.log_prediction(model_version="v1", features={"close": 1.0}, prediction=0.1, latency_ms=2.0)
+        record = audit_logger.log_prediction(model_version="v1", features={"close": 1.0}, prediction=0.1, latency_ms=2.0)
         recent_predictions = client.get("/predictions/recent", params={"limit": 1})
         assert recent_predictions.status_code == 200
         assert len(recent_predictions.json()["entries"]) == 1
+
+        by_id = client.get(f"/predictions/{record['request_id']}")
+        assert by_id.status_code == 200
+        assert by_id.json()["entries"] == [record]
+        assert client.get("/predictions/unknown").status_code == 404
+
+        audit_logger.flush()
+        assert client.get("/monitoring/audit").json()["closed"] is False
+        exposition = client.get("/metrics")
+        assert exposition.status_code == 200
+        assert exposition.headers["content-type"].startswith("text/plain; version=0.0.4")
+        assert "# TYPE ml_engine_audit_records_written_total counter" in exposition.text
+        assert 'ml_engine_cache_entries{cache="models"}' in exposition.text
+        assert "ml_engine_audit_queue_depth 0" in exposition.text
+        assert 'ml_engine_candle_fetches_total{kind="delta"}' in exposition.text
+        assert 'ml_engine_cache_hits_total{cache="candles"}' not in exposition.text
+
+        audit_logger.close()
+        assert client.get("/monitoring/audit").json()["closed"] is True
     finally:
         app.dependency_overrides.clear()
+
+
+def test_runtime_metrics_read_the_current_components_without_a_scrape(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("MODEL_REGISTRY_DIR", str(tmp_path / "models"))
+    monkeypatch.setenv("AUDIT_LOG_FILE", str(tmp_path / "audit.log"))
+    reset_runtime_state()
+    try:
+        with pytest.raises(FileNotFoundError):
+            get_model_cache().get("v404")
+        assert 'ml_engine_cache_misses_total{cache="models"} 1' in REGISTRY.render()
+
+        reset_runtime_state()
+        assert 'ml_engine_cache_misses_total{cache="models"} 0' in REGISTRY.render()
+    finally:
+        reset_runtime_state()
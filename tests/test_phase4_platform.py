@@ -1,12 +1,26 @@
 import asyncio
+import json
+import logging
 import os
+import queue
+import threading
 from pathlib import Path
 
 import numpy as np
+import pytest
+from fastapi import FastAPI
 from fastapi.testclient import TestClient
 
-from app.api.dependencies import get_audit_logger, get_inference_engine, get_model_registry, get_training_manager
+from app.api.dependencies import (
+    get_audit_logger,
+    get_inference_engine,
+    get_model_registry,
+    get_training_manager,
+    reset_runtime_state,
+)
+from app.api.middleware import RateLimit, RateLimitMiddleware, RequestContextMiddleware, TokenBucketLimiter, route_class
 from app.core.config import Settings
+from app.core.logging import EventRateLimitFilter, NonBlockingQueueHandler, configure_logging, shutdown_logging, start_logging
 from app.logging.audit import PredictionAuditLogger
 from app.main import app
 from app.ml.modeling import LinearRegressor
@@ -14,15 +28,17 @@ from app.ml.registry import ModelRegistry
 
 
 class StubBatchInferenceEngine:
-    async def predict(self, symbol: str, lookback: int | None = None, version: str | None = None):
-        if symbol == "MSFT":
-            raise RuntimeError("upstream unavailable")
-        return {
-            "symbol": symbol,
-            "prediction": 0.55,
-            "confidence": 0.77,
-            "model_version": version or "v3",
-        }
+    def __init__(self) -> None:
+        self.exchanges: list[str] = []
+
+    async def predict_batch(self, symbols: list[str], exchange: str = "NASDAQ", version: str | None = None):
+        self.exchanges.append(exchange)
+        return [
+            {"symbol": symbol, "error": "upstream unavailable"}
+            if symbol == "MSFT"
+            else {"symbol": symbol, "prediction": 0.55, "confidence": 0.77, "model_version": version or "v3"}
+            for symbol in symbols
+        ]
 
 
 class StubTrainingManager:
@@ -74,6 +90,18 @@ def test_batch_prediction_partial_failures() -> None:
     assert "error" in items[1]
 
 
+def test_batch_prediction_passes_exchange_query() -> None:
+    engine = StubBatchInferenceEngine()
+    app.dependency_overrides[get_inference_engine] = lambda: engine
+    try:
+        client = TestClient(app)
+        client.post("/predict/batch", json={"symbols": ["AAPL"]})
+        client.post("/predict/batch?exchange=nyse", json={"symbols": ["AAPL"]})
+    finally:
+        app.dependency_overrides.clear()
+    assert engine.exchanges == ["NASDAQ", "NYSE"]
+
+
 def test_admin_api_requires_key(tmp_path: Path) -> None:
     manager = StubTrainingManager()
     app.dependency_overrides[get_training_manager] = lambda: manager
@@ -127,3 +155,160 @@ def test_admin_audit_clear(tmp_path: Path) -> None:
 
     assert response.status_code == 200
     assert audit_logger.get_recent() == []
+
+
+def test_reload_keeps_one_audit_logger_while_predictions_are_logged(tmp_path: Path, monkeypatch) -> None:
+    monkeypatch.setenv("AUDIT_LOG_FILE", str(tmp_path / "audit.log"))
+    monkeypatch.setenv("AUDIT_LOG_SEGMENT_MAX_BYTES", "4096")
+    reset_runtime_state()
+    audit_logger = get_audit_logger()
+    request_ids: list[str] = []
+    stop = threading.Event()
+
+    def log_until_stopped() -> None:
+        while not stop.is_set():
+            record = audit_logger.log_prediction(model_version="v1", features={"close": 1.0}, prediction=0.5, latency_ms=1.0)
+            request_ids.append(record["request_id"])
+
+    writer = threading.Thread(target=log_until_stopped)
+    writer.start()
+    try:
+        response = TestClient(app).post("/admin/reload", headers={"X-API-Key": "changeme-admin-key"})
+    finally:
+        stop.set()
+        writer.join()
+    try:
+        assert response.status_code == 200
+        reloaded = get_audit_logger()
+        assert reloaded is audit_logger
+        reloaded.flush()
+        assert request_ids and all(reloaded.find(request_id)["request_id"] == request_id for request_id in request_ids)
+    finally:
+        audit_logger.close()
+        reset_runtime_state()
+
+
+def test_token_bucket_limiter_refills_and_evicts_idle_clients() -> None:
+    limiter = TokenBucketLimiter({"predict": RateLimit(2, 10.0)}, max_keys=3)
+    assert limiter.allow("predict", "a", now=0.0) == (True, 0.0)
+    assert limiter.allow("predict", "a", now=0.0) == (True, 0.0)
+    allowed, retry_after = limiter.allow("predict", "a", now=1.0)
+    assert not allowed and retry_after == 4.0
+    assert limiter.allow("predict", "a", now=5.0)[0]
+
+    for client in ["b", "c", "d"]:
+        limiter.allow("predict", client, now=6.0)
+    assert limiter.keys("predict") == 3 and limiter.evictions == 1
+
+    limiter.allow("predict", "e", now=20.0)
+    assert limiter.keys("predict") == 1 and limiter.evictions == 4
+
+    # Idle buckets of a class that sees no more traffic are swept by requests to other classes.
+    limiter = TokenBucketLimiter({"predict": RateLimit(2, 10.0), "admin": RateLimit(1, 30.0)})
+    limiter.allow("predict", "a", now=0.0)
+    limiter.allow("admin", "a", now=0.0)
+    limiter.allow("admin", "b", now=0.0)
+    limiter.allow("admin", "c", now=25.0)
+    limiter.allow("predict", "a", now=36.0)
+    assert (limiter.keys("predict"), limiter.keys("admin")) == (1, 1)
+
+    assert route_class("/api/v1/predict/batch", "/api/v1") == "batch"
+    assert route_class("/predictions/abc") == "monitoring"
+    assert route_class("/metrics") == "monitoring"
+    assert route_class("/health") == "default"
+    assert Settings(RATE_LIMIT_CLASSES="predict=5/10, admin=1").resolved_rate_limits == {
+        "default": (120, 60.0),
+        "predict": (5, 10.0),
+        "admin": (1, 60.0),
+    }
+    for classes in ("admin=1/0", "admin=0/60", "admin=-1/60"):
+        with pytest.raises(ValueError, match="admin"):
+            Settings(RATE_LIMIT_CLASSES=classes).resolved_rate_limits
+
+
+def test_rate_limit_middleware_limits_per_route_class() -> None:
+    limited_app = FastAPI()
+    limited_app.add_middleware(RateLimitMiddleware, limits={"default": RateLimit(5, 60.0), "admin": RateLimit(1, 60.0)})
+    limited_app.add_middleware(RequestContextMiddleware)
+
+    @limited_app.get("/admin/ping")
+    async def admin_ping() -> dict:
+        return {"ok": True}
+
+    @limited_app.get("/health")
+    async def health() -> dict:
+        return {"ok": True}
+
+    client = TestClient(limited_app)
+    assert client.get("/admin/ping").status_code == 200
+    rejected = client.get("/admin/ping", headers={"X-Request-ID": "req-429"})
+    assert rejected.status_code == 429 and rejected.headers["Retry-After"] == "60"
+    assert rejected.headers["X-Request-ID"] == "req-429" and "Server-Timing" not in rejected.headers
+    assert client.get("/health").status_code == 200
+
+
+def test_prediction_history_polling_does_not_throttle_predictions() -> None:
+    limited_app = FastAPI()
+    limited_app.add_middleware(
+        RateLimitMiddleware,
+        limits={"default": RateLimit(5, 60.0), "predict": RateLimit(1, 60.0), "monitoring": RateLimit(1, 60.0)},
+    )
+
+    @limited_app.get("/predictions/recent")
+    async def recent() -> dict:
+        return {"entries": []}
+
+    @limited_app.get("/predict/{symbol}")
+    async def predict(symbol: str) -> dict:
+        return {"symbol": symbol}
+
+    client = TestClient(limited_app)
+    assert client.get("/predictions/recent").status_code == 200
+    assert client.get("/predictions/recent").status_code == 429
+    assert client.get("/predict/AAPL").status_code == 200
+
+
+def _record(msg: str, created: float, level: int = logging.WARNING) -> logging.LogRecord:
+    record = logging.LogRecord("app.test", level, __file__, 1, msg, None, None)
+    record.created = created
+    return record
+
+
+def test_event_rate_limit_filter_reports_suppressed_records() -> None:
+    log_filter = EventRateLimitFilter(per_second=2)
+    decisions = [log_filter.filter(_record("upstream_request_failed", 100.0 + i * 0.1)) for i in range(5)]
+    assert decisions == [True, True, False, False, False]
+    assert log_filter.filter(_record("other_event", 100.5))
+    assert log_filter.filter(_record("upstream_request_failed", 100.9, logging.ERROR))
+
+    next_window = _record("upstream_request_failed", 101.0)
+    assert log_filter.filter(next_window)
+    assert next_window.suppressed == 3
+
+
+def test_queue_handler_drops_when_full_and_async_logging_writes(capsys) -> None:
+    handler = NonBlockingQueueHandler(queue.Queue(maxsize=1))
+    handler.handle(_record("first %s", 1.0))
+    handler.handle(_record("second", 1.0))
+    assert handler.dropped == 1
+    assert handler.queue.get_nowait().msg == "first %s"
+
+    configure_logging("INFO", async_logging=True, queue_size=100, event_rate_limit=1)
+    try:
+        root = logging.getLogger()
+        assert not any(isinstance(handler, NonBlockingQueueHandler) for handler in root.handlers)
+        start_logging()
+        logger = logging.getLogger("app.test")
+        for attempt in range(3):
+            logger.warning("upstream_request_failed", extra={"attempt": attempt})
+        shutdown_logging()
+        logger.info("after_shutdown")
+        lines = [json.loads(line) for line in capsys.readouterr().err.splitlines()]
+
+        # A later lifespan restarts the listener instead of staying synchronous.
+        start_logging()
+        assert any(isinstance(handler, NonBlockingQueueHandler) for handler in root.handlers)
+        assert sum(len(handler.filters) for handler in root.handlers) == 1
+    finally:
+        configure_logging("INFO")
+    assert [(line["message"], line.get("attempt")) for line in lines] == [("upstream_request_failed", 0), ("after_shutdown", None)]
@@ -1,7 +1,11 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import numpy as np
 
+from app.ml.model_cache import ModelCache
 from app.ml.modeling import LinearRegressor
 from app.ml.registry import ModelRegistry
 
@@ -23,3 +27,116 @@ def test_registry_serialization_round_trip(tmp_path: Path) -> None:
     assert metadata["version"] == "v1"
     pred = float(loaded.predict(np.array([[1.5]]))[0])
     assert pred > 0
+
+
+def test_model_cache_reuses_loaded_model_and_tracks_activation(tmp_path: Path) -> None:
+    registry = ModelRegistry(root_dir=str(tmp_path / "models"))
+    for version in ["v1", "v2", "v3"]:
+        registry.save_model_package(
+            version=version,
+            model=LinearRegressor().fit(np.array([[1.0], [2.0]]), np.array([0.1, 0.2])),
+            metadata={"version": version},
+            metrics={"rmse": 1.0},
+            feature_columns=["f1"],
+            dataset_summary={"rows": 2},
+        )
+    cache = ModelCache(registry=registry, max_entries=2)
+
+    first, metadata = cache.get()
+    second, _ = cache.get()
+    assert metadata["version"] == "v3"
+    assert first is second
+
+    registry.activate_version("v1")
+    _, metadata = cache.get()
+    assert metadata["version"] == "v1"
+    assert "v3" not in cache.snapshot()["cached_versions"]
+
+    cache.get("v2")
+    cache.get("v3")
+    snapshot = cache.snapshot()
+    assert snapshot["cached_versions"] == ["v2", "v3"]
+    assert snapshot["hits"] == 1
+
+
+def test_model_cache_loads_each_version_once_under_concurrent_misses(tmp_path: Path) -> None:
+    registry = ModelRegistry(root_dir=str(tmp_path / "models"))
+    registry.save_model_package(
+        version="v1",
+        model=LinearRegressor().fit(np.array([[1.0], [2.0]]), np.array([0.1, 0.2])),
+        metadata={"version": "v1"},
+        metrics={"rmse": 1.0},
+        feature_columns=["f1"],
+        dataset_summary={"rows": 2},
+    )
+    loads = []
+    load_model = registry.load_model
+
+    def slow_load(version: str | None = None):
+        loads.append(version)
+        time.sleep(0.05)
+        return load_model(version=version)
+
+    registry.load_model = slow_load
+    cache = ModelCache(registry=registry)
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        models = list(pool.map(lambda _: cache.get("v1")[0], range(8)))
+
+    assert loads == ["v1"]
+    assert all(model is models[0] for model in models)
+    assert (cache.snapshot()["hits"], cache.snapshot()["misses"]) == (7, 1)
+
+
+def test_registry_snapshot_revalidates_against_external_writes(tmp_path: Path) -> None:
+    root = str(tmp_path / "models")
+    reader = ModelRegistry(root_dir=root)
+    writer = ModelRegistry(root_dir=root)
+    for version in ["v1", "v2"]:
+        writer.save_model_package(
+            version=version,
+            model=LinearRegressor().fit(np.array([[1.0], [2.0]]), np.array([0.1, 0.2])),
+            metadata={"version": version},
+            metrics={"rmse": 1.0},
+            feature_columns=["f1"],
+            dataset_summary={"rows": 2},
+        )
+
+    settled_ns = time.time_ns() - 10_000_000_000
+    for path in [tmp_path / "models", tmp_path / "models" / "registry.json"]:
+        os.utime(path, ns=(settled_ns, settled_ns))
+
+    assert reader.list_versions() == ["v1", "v2"]
+    assert reader.get_active_version() == "v2"
+    assert reader._read_registry() is reader._read_registry()
+
+    writer.activate_version("v1")
+    assert reader.get_active_version() == "v1"
+
+    reader.activate_version("v2")
+    assert reader.get_active_version() == "v2"
+    assert writer.get_active_version() == "v2"
+
+
+def test_feature_baseline_is_served_without_unpickling_the_model(tmp_path: Path, monkeypatch) -> None:
+    registry = ModelRegistry(root_dir=str(tmp_path / "models"))
+    stats = {"close": {"mean": 10.0, "std": 1.0}}
+    histograms = {"close": {"edges": [8.0, 10.0, 12.0], "counts": [5, 5]}}
+    registry.save_model_package(
+        version="v1",
+        model=LinearRegressor().fit(np.array([[1.0], [2.0]]), np.array([0.1, 0.2])),
+        metadata={"version": "v1", "training_feature_stats": stats, "training_feature_histograms": histograms},
+        metrics={"rmse": 1.0},
+        feature_columns=["close"],
+        dataset_summary={"rows": 2},
+    )
+    assert (tmp_path / "models" / "v1" / "feature_baseline.json").exists()
+
+    def fail_load_model(*args, **kwargs):
+        raise AssertionError("drift baselines must not load the model binary")
+
+    monkeypatch.setattr(registry, "load_model", fail_load_model)
+    assert registry.get_training_feature_stats() == stats
+    assert registry.get_training_feature_histograms("v1") == histograms
+
+    (tmp_path / "models" / "v1" / "feature_baseline.json").unlink()
+    assert registry.get_training_feature_baseline()["training_feature_stats"] == stats
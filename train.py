@@ -34,16 +34,17 @@ async def run(config_path: str, version: str | None = None) -> None:
         model_params=payload.get("model_params", {}),
     )
 
-    feature_service = FeatureService(
-        market_data_client=MarketDataClient(settings=settings),
-        settings=settings,
-    )
-    trainer = Trainer(
-        dataset_builder=DatasetBuilder(feature_service=feature_service),
-        registry=ModelRegistry(root_dir=settings.model_registry_dir),
-    )
-
-    result = await trainer.train(config=config, version=version)
+    async with MarketDataClient(settings=settings) as market_data_client:
+        feature_service = FeatureService(
+            market_data_client=market_data_client,
+            settings=settings,
+        )
+        trainer = Trainer(
+            dataset_builder=DatasetBuilder(feature_service=feature_service),
+            registry=ModelRegistry(root_dir=settings.model_registry_dir),
+        )
+
+        result = await trainer.train(config=config, version=version)
     print(result)
 
 